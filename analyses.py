@@ -0,0 +1,246 @@
+import re
+
+import pandas as pd
+
+# The canned analyses offered under "View Logs" -> "Run Analysis", by menu label.
+# Every query runs against the raw securecheck.logs table; rollups.py answers the same
+# questions from pre-aggregated tables.
+
+QUERY_MAP = {
+    "Top 10 vehicle_Number involved in Drug-Related Stops": """SELECT vehicle_number, COUNT(*) as COUNT
+                                                              FROM securecheck.logs WHERE drugs_related_stop = 1
+                                                              GROUP BY vehicle_number
+                                                              ORDER BY COUNT DESC
+                                                              LIMIT 10""",
+
+    "Most Frequently Searched Vehicles": """SELECT vehicle_number, COUNT(*) AS search_count
+                                           FROM securecheck.logs
+                                           GROUP BY vehicle_number
+                                           ORDER BY vehicle_number DESC LIMIT 10""",
+    
+    "Driver Age Group with Highest Arrest Rate" : """SELECT CASE
+                                                    when driver_age between 18 and 25 then '18-25'
+                                                    when driver_age between 26 and 35 then '26-35'
+                                                    when driver_age between 36 and 45 then '36-45'
+                                                    when driver_age between 45 and 60 then '45-60'
+                                                    else '60+'
+                                                    end AS age_group,COUNT(*) AS total_driver,
+                                                    sum(case when is_arrested=1 then 1 else 0 end) AS total_arrests,
+                                                    round(sum(case when is_arrested=1 then 1 else 0 end)*100.0/count(*),2) AS arrest_rate_percent 
+                                                    from securecheck.logs GROUP BY age_group
+                                                    ORDER BY arrest_rate_percent desc limit 1
+                                                    """,
+                                        
+    "Gender Distribution of Drivers Stopped in each Country" :"""SELECT country_name, driver_gender, COUNT(*) AS total_gender,
+                                                                ROUND(100.0 * COUNT(*) / SUM(COUNT(*)) OVER (PARTITION BY country_name), 2) AS gender_percent
+                                                                FROM securecheck.logs
+                                                                GROUP BY country_name, driver_gender
+                                                                ORDER BY country_name, driver_gender""",
+
+    "Race & Gender Combination with Highest Search Rate" :"""SELECT driver_race, driver_gender, COUNT(*) AS total_stops,
+                                                             SUM(CASE WHEN search_conducted  = 1 THEN 1 ELSE 0 END) AS total_searches,
+                                                             ROUND(SUM(CASE WHEN search_conducted  = 1 THEN 1 ELSE 0 END) * 100.0 / COUNT(*), 2) AS search_percent_rate
+                                                             FROM securecheck.logs
+                                                             WHERE driver_race IS NOT NULL AND driver_gender IS NOT NULL
+                                                             GROUP BY driver_race, driver_gender
+                                                             ORDER BY search_percent_rate DESC LIMIT 1""",
+
+   "Time of Day with Most Traffic Stops" :"""SELECT HOUR(stop_time) AS stop_hour, COUNT(*) AS total_stops
+                                            FROM securecheck.logs
+                                            WHERE stop_time IS NOT NULL
+                                            GROUP BY stop_hour 
+                                            ORDER BY total_stops DESC LIMIT 1""",
+
+   "Average Stop Duration for different Violations" : """SELECT violation,
+                                                        AVG(stop_duration) AS average_stop_duration
+                                                        FROM securecheck.logs
+                                                        WHERE stop_duration IS NOT NULL 
+                                                        GROUP BY violation ORDER BY Average_stop_duration DESC""",
+
+    "Night Stops More Likely to Lead to Arrests" : """SELECT 
+                                                     CASE
+                                                     WHEN HOUR(stop_time) BETWEEN 20 AND 23 OR HOUR(stop_time) BETWEEN 0 AND 5 THEN 'Night'
+                                                     ELSE 'Day'
+                                                     END AS time_of_day,
+                                                     COUNT(*) AS total_stops,
+                                                     SUM(CASE WHEN is_arrested = 1 THEN 1 ELSE 0 END) AS total_arrests,
+                                                     ROUND(SUM(CASE WHEN is_arrested = 1 THEN 1 ELSE 0 END) * 100.0 / COUNT(*), 2) AS arrest_rate_percent
+                                                     FROM securecheck.logs
+                                                     WHERE stop_time IS NOT NULL
+                                                     GROUP BY time_of_day
+                                                     ORDER BY arrest_rate_percent DESC""",
+
+    "Violations Most Associated with Searches or Arrests" :"""SELECT violation,
+                                                             COUNT(*) AS total_stops,
+                                                             SUM(CASE WHEN is_arrested = 1 THEN 1 ELSE 0 END) AS total_arrests, 
+                                                             SUM(CASE WHEN search_conducted = TRUE THEN 1 ELSE 0 END) AS total_searches, 
+                                                             SUM(CASE WHEN is_arrested = 1 OR search_conducted = TRUE THEN 1 ELSE 0 END) AS search_or_arrest_total
+                                                             FROM securecheck.logs
+                                                             GROUP BY violation
+                                                             ORDER BY search_or_arrest_total DESC LIMIT 10""",
+  
+    "Most Common Violations for Young Drivers Under 25" :"""SELECT violation,
+                                                           COUNT(*) AS total_stops
+                                                           FROM securecheck.logs
+                                                           WHERE driver_age < 25
+                                                           GROUP BY violation
+                                                           ORDER BY total_stops DESC LIMIT 10""",
+
+    "Violation Rarely Resulting in Search or Arrest" :"""SELECT violation,
+                                                        COUNT(*) AS total_stops,
+                                                        SUM(CASE WHEN is_arrested = 1 THEN 1 ELSE 0 END) AS total_arrests
+                                                        FROM securecheck.logs
+                                                        GROUP BY violation
+                                                        ORDER BY total_arrests ASC LIMIT 1""",
+                                                           
+    "Countries Report with Highest Drug-Related Stop Rates" :"""SELECT country_name,
+                                                               COUNT(*) AS total_stops,
+                                                               SUM(CASE WHEN drugs_related_stop = 1 THEN 1 ELSE 0 END) AS drug_related_stops,
+                                                               ROUND(SUM(CASE WHEN drugs_related_stop = 1 THEN 1 ELSE 0 END) * 100.0 / COUNT(*), 2) AS drug_stop_rate_percent
+                                                               FROM securecheck.logs
+                                                               GROUP BY country_name
+                                                               ORDER BY drug_stop_rate_percent DESC""",
+
+   "Arrest Rate by Country & Violation" :"""SELECT country_name,
+                                           COUNT(*) AS total_stops,
+                                           violation,
+                                           SUM(CASE WHEN is_arrested = 1 THEN 1 ELSE 0 END) AS total_arrests,
+                                           ROUND(100.0 * SUM(CASE WHEN is_arrested = 1 THEN 1 ELSE 0 END) / COUNT(*), 2) AS total_arrest_percent
+                                           FROM securecheck.logs
+                                           GROUP BY country_name, violation
+                                           ORDER BY country_name""",
+ 
+    "Country has the Most Stops with Search Conducted" :"""select country_name, count(*) as total_stops
+                                                          from securecheck.logs
+                                                          group by country_name
+                                                          order by total_stops
+                                                          desc limit 1""",
+
+    "Yearly Breakdown of Stops and Arrests by Country" :"""SELECT country_name,
+                                                          EXTRACT(YEAR FROM stop_date) AS year,
+                                                          total_stops, total_arrests, 
+                                                          ROUND(100.0 * total_arrests / total_stops, 2) AS arrest_rate_percent,
+                                                          RANK() OVER (PARTITION BY year ORDER BY total_arrests DESC) AS arrest_rank_in_year
+
+                                                          FROM (SELECT country_name, stop_date, 
+                                                          COUNT(*) AS total_stops,
+                                                          SUM(CASE WHEN is_arrested = 1 THEN 1 ELSE 0 END) AS total_arrests
+                                                          FROM securecheck.logs
+                                                          WHERE stop_date IS NOT NULL
+                                                          GROUP BY country_name, EXTRACT(YEAR FROM stop_date)) AS yearly_stats""" , 
+
+    "Driver Violation Trends by Age & Race" :"""WITH age_groups AS (SELECT id,
+                                               CASE
+                                               WHEN driver_age BETWEEN 18 AND 25 THEN '18-25'
+                                               WHEN driver_age BETWEEN 26 AND 35 THEN '26-35'
+                                               WHEN driver_age BETWEEN 36 AND 50 THEN '36-50'
+                                               ELSE '51+'
+                                               END AS age_group,
+                                               driver_race
+                                               FROM securecheck.logs
+                                               WHERE driver_age IS NOT NULL AND driver_race IS NOT NULL)
+
+                                               SELECT 
+                                               ag.age_group, ag.driver_race, l.violation, COUNT(*) AS total_violations
+                                               FROM securecheck.logs l
+                                               JOIN age_groups ag ON l.id = ag.id
+                                               WHERE l.violation IS NOT NULL
+                                               GROUP BY ag.age_group, ag.driver_race, l.violation
+                                               ORDER BY ag.age_group, ag.driver_race, total_violations DESC""",
+
+    "Time Period Analysis of Stops, Number of Stops by Year, Month, Hour of the Day" :"""SELECT
+                                                                                        EXTRACT(YEAR FROM stop_date) AS year,
+                                                                                        EXTRACT(MONTH FROM stop_date) AS month, 
+                                                                                        EXTRACT(HOUR FROM stop_time) AS hour,
+                                                                                        COUNT(*) AS total_stops 
+                                                                                        FROM securecheck.logs
+                                                                                        WHERE stop_date IS NOT NULL AND stop_time IS NOT NULL
+                                                                                        GROUP BY year, month, hour
+                                                                                        ORDER BY year, month, hour""",  
+
+   "Violations with High Search & Arrest Rates" :"""SELECT violation,
+                                                   COUNT(*) AS total_stops,
+                                                   SUM(CASE WHEN search_conducted = 1 THEN 1 ELSE 0 END) AS total_searches,
+                                                   SUM(CASE WHEN is_arrested = 1 THEN 1 ELSE 0 END) AS total_arrests,
+                                                   ROUND(100.0 * SUM(CASE WHEN search_conducted = 1 THEN 1 ELSE 0 END) / COUNT(*), 2) AS search_rate_percent,
+                                                   ROUND(100.0 * SUM(CASE WHEN is_arrested = 1 THEN 1 ELSE 0 END) / COUNT(*), 2) AS arrest_percent_rate,
+                                                   RANK() OVER (ORDER BY SUM(CASE WHEN search_conducted = 1 THEN 1 ELSE 0 END) * 1.0 / COUNT(*) DESC) AS search_rank,
+                                                   RANK() OVER (ORDER BY SUM(CASE WHEN is_arrested = 1 THEN 1 ELSE 0 END) * 1.0 / COUNT(*) DESC) AS arrest_rank
+                                                   FROM securecheck.logs
+                                                   WHERE violation IS NOT NULL
+                                                   GROUP BY violation
+                                                   ORDER BY search_rate_percent DESC, arrest_percent_rate DESC""",
+
+    "Driver Demographics by Country (Age, Gender and Race)" :"""SELECT country_name, driver_gender, driver_race,
+                                                               CASE 
+                                                               WHEN driver_age < 20 THEN '<20'
+                                                               WHEN driver_age BETWEEN 20 AND 29 THEN '20-29'
+                                                               WHEN driver_age BETWEEN 30 AND 39 THEN '30-39'
+                                                               WHEN driver_age BETWEEN 40 AND 49 THEN '40-49'
+                                                               WHEN driver_age BETWEEN 50 AND 59 THEN '50-59'
+                                                               ELSE '60+'
+                                                               END AS age_group,
+                                                               COUNT(*) AS total_drivers
+                                                               FROM securecheck.logs
+                                                               WHERE driver_age IS NOT NULL 
+                                                               AND driver_gender IS NOT NULL 
+                                                               AND driver_race IS NOT NULL
+                                                               GROUP BY country_name, driver_gender, driver_race, age_group
+                                                               ORDER BY country_name, driver_gender, driver_race, age_group""",      
+
+    "Top 5 Violations with Highest Arrest Rates" :"""SELECT violation,
+                                                    COUNT(*) AS total_stops,
+                                                    SUM(CASE WHEN is_arrested = 1 THEN 1 ELSE 0 END) AS total_arrests,
+                                                    ROUND(100.0 * SUM(CASE WHEN is_arrested = 1 THEN 1 ELSE 0 END) / NULLIF(COUNT(*), 0), 2) AS arrest_rate_percent
+                                                    FROM securecheck.logs
+                                                    WHERE is_arrested IS NOT NULL AND violation IS NOT NULL
+                                                    GROUP BY violation
+                                                    
+                                                    ORDER BY arrest_rate_percent DESC LIMIT 5"""
+
+}
+
+# For analyses cut off with LIMIT, rows tied on the sort column may legitimately come
+# back in a different order (or a different tied row may make the cut); compare_results
+# then only compares the sort column.
+TIE_KEYS = {
+    "Top 10 vehicle_Number involved in Drug-Related Stops": "COUNT",
+    "Driver Age Group with Highest Arrest Rate": "arrest_rate_percent",
+    "Race & Gender Combination with Highest Search Rate": "search_percent_rate",
+    "Time of Day with Most Traffic Stops": "total_stops",
+    "Violations Most Associated with Searches or Arrests": "search_or_arrest_total",
+    "Most Common Violations for Young Drivers Under 25": "total_stops",
+    "Violation Rarely Resulting in Search or Arrest": "total_arrests",
+    "Country has the Most Stops with Search Conducted": "total_stops",
+    "Top 5 Violations with Highest Arrest Rates": "arrest_rate_percent",
+}
+
+
+def _normalize(df):
+    df = df.copy()
+    for col in df.columns:
+        numeric = pd.to_numeric(df[col], errors="coerce")
+        if numeric.notna().sum() == df[col].notna().sum():
+            df[col] = numeric.astype(float).round(4)
+        else:
+            df[col] = df[col].astype(object).where(df[col].notna(), None).map(lambda v: v if v is None else str(v))
+    return df
+
+
+# "match", "match (ties)" or "MISMATCH" for two answers to the same analysis.
+# Row order is ignored, numbers are compared to 4 decimal places.
+def compare_results(name, a, b):
+    a, b = _normalize(a), _normalize(b)
+    if list(a.columns) != list(b.columns):
+        return "MISMATCH"
+    key = lambda df: sorted(map(repr, df.itertuples(index=False, name=None)))
+    if len(a) == len(b) and key(a) == key(b):
+        return "match"
+    if name in TIE_KEYS and sorted(a[TIE_KEYS[name]]) == sorted(b[TIE_KEYS[name]]):
+        return "match (ties)"
+    return "MISMATCH"
+
+
+# The same analysis against another copy of the logs table (benchmarks, scratch tables)
+def for_table(query, table):
+    return re.sub(r"securecheck\.logs\b", table, query, flags=re.IGNORECASE)
@@ -0,0 +1,297 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from urllib.parse import quote
+
+import pandas as pd
+import pymysql
+
+import db
+import instrument
+import partitions
+import rollups
+from analyses import QUERY_MAP
+from schema import LOGS_TABLE, LOG_COLUMNS
+
+# Pluggable backend for the dashboard's analytical reads.
+#
+#   mysql   (default) queries go to SECURECHECK.logs through db.fetch_data
+#   duckdb  queries run in an embedded DuckDB over a Parquet copy of logs, so heavy
+#           scans don't compete with check posts writing to MySQL
+#
+# The Parquet copy is partitioned by year and country (p_year=2024/p_country=India/...)
+# and grows incrementally: each export writes only the rows past the last exported id.
+# Ids are not committed in order, so like the rollups (rollups.py) the export keeps the
+# holes it read past as gaps in its state file, exports whatever has filled them on each
+# run, and forgets a gap after rollups.COMMIT_LAG seconds.
+# Pick the backend with SECURECHECK_BACKEND; with SECURECHECK_EXPORT_INTERVAL > 0 the app
+# re-exports in the background every that many seconds.
+#
+#   python analytics.py export                 copy new rows to Parquet
+#   python analytics.py query "SELECT ..."     run SQL in DuckDB over the export
+
+BACKEND = os.environ.get("SECURECHECK_BACKEND", "mysql")
+PARQUET_DIR = os.environ.get("SECURECHECK_PARQUET_DIR", os.path.join("data", "logs_parquet"))
+EXPORT_INTERVAL = float(os.environ.get("SECURECHECK_EXPORT_INTERVAL", "0"))
+CHUNK_SIZE = 200_000
+
+# What a failed analytical read can raise, whichever backend served it
+QUERY_ERRORS = (pymysql.MySQLError, db.PoolTimeout)
+if BACKEND == "duckdb":
+    # Only imported when it is the backend; otherwise it just slows every cold start
+    import duckdb
+    QUERY_ERRORS += (duckdb.Error,)
+
+# Analyses that lean on MySQL leniency get a DuckDB spelling:
+# - MySQL averages the VARCHAR stop_duration by its leading number ('16-30 Min' -> 16),
+#   DuckDB won't average text
+# - the yearly breakdown selects stop_date without grouping by it, which DuckDB rejects
+DUCKDB_QUERIES = {
+    "Average Stop Duration for different Violations": """SELECT violation,
+        AVG(COALESCE(TRY_CAST(regexp_extract(stop_duration, '^\\s*[-+]?[0-9]*\\.?[0-9]+') AS DOUBLE), 0))
+        AS average_stop_duration
+        FROM securecheck.logs
+        WHERE stop_duration IS NOT NULL
+        GROUP BY violation ORDER BY average_stop_duration DESC""",
+
+    "Yearly Breakdown of Stops and Arrests by Country": """SELECT country_name, year,
+        total_stops, total_arrests,
+        ROUND(100.0 * total_arrests / total_stops, 2) AS arrest_rate_percent,
+        RANK() OVER (PARTITION BY year ORDER BY total_arrests DESC) AS arrest_rank_in_year
+        FROM (SELECT country_name, EXTRACT(YEAR FROM stop_date) AS year,
+        COUNT(*) AS total_stops,
+        SUM(CASE WHEN is_arrested = 1 THEN 1 ELSE 0 END) AS total_arrests
+        FROM securecheck.logs
+        WHERE stop_date IS NOT NULL
+        GROUP BY country_name, EXTRACT(YEAR FROM stop_date)) AS yearly_stats""",
+}
+
+
+def _state_path(out_dir):
+    return os.path.join(out_dir, "_export_state.json")
+
+
+def _partition_value(value):
+    return "__null__" if value is None or pd.isna(value) else quote(str(value), safe="")
+
+
+# Parquet-friendly column types for the given logs columns (default: all of them);
+# booleans stay TINYINT-style ints as in MySQL
+def to_arrow(df, columns=None):
+    import pyarrow as pa
+
+    columns = columns or ["id"] + LOG_COLUMNS
+    df = df.copy()
+    if "stop_date" in columns:
+        df["stop_date"] = pd.to_datetime(df["stop_date"], errors="coerce").dt.date
+    if "stop_time" in columns:
+        seconds = pd.to_timedelta(df["stop_time"], errors="coerce").dt.total_seconds()
+        df["stop_time"] = pd.to_datetime(seconds, unit="s", errors="coerce").dt.time
+    fields = pa.schema([
+        ("id", pa.int64()), ("stop_date", pa.date32()), ("stop_time", pa.time64("us")),
+        ("country_name", pa.string()), ("driver_gender", pa.string()), ("driver_age", pa.int32()),
+        ("driver_race", pa.string()), ("violation_raw", pa.string()), ("violation", pa.string()),
+        ("search_conducted", pa.int8()), ("search_type", pa.string()), ("stop_outcome", pa.string()),
+        ("is_arrested", pa.int8()), ("stop_duration", pa.string()), ("drugs_related_stop", pa.int8()),
+        ("vehicle_number", pa.string()),
+    ])
+    schema = pa.schema([fields.field(c) for c in columns])
+    df = df[columns].astype(object).where(df[columns].notna(), None)
+    return pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+
+
+# Write rows of logs into their year/country partitions, one file per partition
+def _write_chunk(chunk, out_dir):
+    import pyarrow.parquet as pq
+
+    first, last = int(chunk["id"].iloc[0]), int(chunk["id"].iloc[-1])
+    years = pd.to_datetime(chunk["stop_date"], errors="coerce").dt.year
+    for (year, country), part in chunk.groupby([years, chunk["country_name"]], dropna=False):
+        part_dir = os.path.join(out_dir, f"p_year={_partition_value(year if pd.isna(year) else int(year))}",
+                                f"p_country={_partition_value(country)}")
+        os.makedirs(part_dir, exist_ok=True)
+        path = os.path.join(part_dir, f"part-{first:010d}-{last:010d}.parquet")
+        # Write then rename, so a reader never sees half a file
+        pq.write_table(to_arrow(part), path + ".tmp")
+        os.replace(path + ".tmp", path)
+
+
+def _save_state(state_file, last_id, gaps):
+    with open(state_file + ".tmp", "w") as f:
+        json.dump({"last_id": last_id, "gaps": gaps, "exported_at": time.time()}, f)
+    os.replace(state_file + ".tmp", state_file)
+
+
+# Copy logs rows past the last exported id, and any that filled an earlier gap, into
+# year/country partitions
+def export_parquet(table=LOGS_TABLE, out_dir=PARQUET_DIR):
+    os.makedirs(out_dir, exist_ok=True)
+    state_file = _state_path(out_dir)
+    last_id, gaps = 0, []  # gaps: [[first id, last id, time.time() found]]
+    if os.path.exists(state_file):
+        with open(state_file) as f:
+            state = json.load(f)
+        last_id, gaps = state["last_id"], state.get("gaps", [])
+
+    exported = 0
+    columns = ", ".join(["id"] + LOG_COLUMNS)
+    query = f"SELECT {columns} FROM {table} WHERE id BETWEEN %s AND %s ORDER BY id"
+
+    # Holes left by earlier exports: export the runs of ids that have arrived in them
+    now = time.time()
+    stored, gaps = len(gaps), [g for g in gaps if now - g[2] < rollups.COMMIT_LAG]
+    if len(gaps) < stored:
+        _save_state(state_file, last_id, gaps)
+    if gaps:
+        with db.pool.connection() as conn:
+            with conn.cursor() as cursor:
+                found = [(g, rollups.find_islands(cursor, table, g[0], g[1])) for g in gaps]
+        gaps = []
+        for i, ((_, _, found_at), (islands, holes)) in enumerate(found):
+            for a, b in islands:
+                chunk = db.run_query(query, (a, b))
+                _write_chunk(chunk, out_dir)
+                exported += len(chunk)
+            gaps += [[a, b, found_at] for a, b in holes]
+            if islands:
+                _save_state(state_file, last_id, gaps + [g for g, _ in found[i + 1:]])
+
+    while True:
+        chunk = db.run_query(f"SELECT {columns} FROM {table} WHERE id > %s ORDER BY id LIMIT %s",
+                             (last_id, CHUNK_SIZE))
+        if chunk.empty:
+            break
+        _write_chunk(chunk, out_dir)
+        # Ids this chunk skipped may still be committed by a slower writer
+        ids = chunk["id"].astype("int64")
+        previous = ids.shift(fill_value=last_id)
+        skipped = ids - previous > 1
+        now = time.time()
+        gaps += [[int(a) + 1, int(b) - 1, now] for a, b in zip(previous[skipped], ids[skipped])]
+        last_id = int(ids.iloc[-1])
+        exported += len(chunk)
+        # Recorded per chunk so an interrupted export resumes where it stopped
+        _save_state(state_file, last_id, gaps)
+        if len(chunk) < CHUNK_SIZE:
+            break
+    return exported
+
+
+class MySQLBackend:
+    name = "mysql"
+
+    def fetch(self, query, params=None):
+        return db.fetch_data(query, params)
+
+    def analysis_sql(self, name):
+        return QUERY_MAP[name]
+
+
+class DuckDBBackend:
+    name = "duckdb"
+
+    def __init__(self, parquet_dir=PARQUET_DIR):
+        import duckdb
+
+        self.parquet_dir = parquet_dir
+        self.cache = db.QueryCache()
+        self._con = duckdb.connect()
+        self._con.execute("CREATE SCHEMA IF NOT EXISTS securecheck")
+        self._view_ready = False
+
+    def _ensure_view(self):
+        if self._view_ready:
+            return
+        pattern = os.path.join(self.parquet_dir, "**", "*.parquet").replace("'", "''")
+        self._con.execute(f"""CREATE OR REPLACE VIEW securecheck.logs AS
+                              SELECT * FROM read_parquet('{pattern}', hive_partitioning = true)""")
+        self._view_ready = True
+
+    def fetch(self, query, params=None):
+        key = self.cache.make_key(query, params)
+        df = self.cache.get(key)
+        if df is None:
+            self._ensure_view()
+            # Each thread gets its own cursor on the shared in-process database
+            cursor = self._con.cursor()
+            start = time.perf_counter()
+            try:
+                df = cursor.execute(query.replace("%s", "?"), list(params or [])).df()
+            finally:
+                cursor.close()
+            # In-process, so there are no bytes on the wire to report
+            instrument.record_query(query, time.perf_counter() - start, len(df), 0, 0.0)
+            self.cache.put(key, df)
+        return df.copy()
+
+    def analysis_sql(self, name):
+        return DUCKDB_QUERIES.get(name, QUERY_MAP[name])
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def _export_loop(interval):
+    while True:
+        try:
+            if export_parquet():
+                _backend.cache.clear()
+        except (pymysql.MySQLError, db.PoolTimeout, OSError):
+            pass  # Try again next round; the last export stays readable
+        time.sleep(interval)
+
+
+# The configured backend, created once per process
+def get_backend():
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            if BACKEND == "duckdb":
+                _backend = DuckDBBackend()
+                if EXPORT_INTERVAL > 0:
+                    threading.Thread(target=_export_loop, args=(EXPORT_INTERVAL,), daemon=True).start()
+            else:
+                _backend = MySQLBackend()
+        return _backend
+
+
+# Answer a canned analysis: from its rollup on MySQL (falling back to the raw query),
+# straight from the Parquet copy on DuckDB. With a date_range the raw query reads only
+# those days (rollups hold all-time totals). Errors are raised, not displayed.
+def run_analysis(name, date_range=None):
+    with instrument.label(name):
+        backend = get_backend()
+        if backend.name == "mysql" and name in rollups.ROLLUP_QUERIES and not date_range:
+            try:
+                return rollups.fetch(name)
+            except (pymysql.MySQLError, db.PoolTimeout):
+                pass  # Rollups not built or not reachable; the raw query still works
+        return backend.fetch(partitions.restrict(backend.analysis_sql(name), date_range))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parquet export and DuckDB queries for analytics")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("export")
+    p.add_argument("--table", default=LOGS_TABLE)
+    p.add_argument("--out", default=PARQUET_DIR)
+    p = sub.add_parser("query")
+    p.add_argument("sql")
+    p.add_argument("--dir", default=PARQUET_DIR)
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        start = time.perf_counter()
+        rows = export_parquet(args.table, args.out)
+        print(f"Exported {rows} new rows to {args.out} in {time.perf_counter() - start:.1f}s")
+    else:
+        print(DuckDBBackend(args.dir).fetch(args.sql).to_string())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
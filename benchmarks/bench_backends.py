@@ -0,0 +1,57 @@
+import argparse
+import statistics
+import tempfile
+import time
+
+import analyses
+import analytics
+import db
+from benchmarks.synthetic import load_table
+
+# The canned analyses on MySQL vs. embedded DuckDB over the Parquet export of the same rows.
+# Each analysis is timed cold (caches cleared) and the two answers are compared.
+#
+#   python -m benchmarks.bench_backends --rows 1000000
+
+BENCH_TABLE = "SECURECHECK.logs_bench"
+
+
+def timed(fn, repeats, clear):
+    timings = []
+    for _ in range(repeats):
+        clear()
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return result, statistics.median(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the analyses on MySQL vs. DuckDB over Parquet")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--table", default=BENCH_TABLE, help="scratch table to fill with synthetic rows")
+    args = parser.parse_args(argv)
+
+    load_table(args.table, args.rows)
+    out_dir = tempfile.mkdtemp(prefix="logs_parquet_")
+    start = time.perf_counter()
+    exported = analytics.export_parquet(args.table, out_dir)
+    print(f"Exported {exported} rows to {out_dir} in {time.perf_counter() - start:.1f}s\n")
+    duck = analytics.DuckDBBackend(out_dir)
+
+    print(f"{'analysis':<72}{'mysql ms':>10}{'duckdb ms':>11}  result")
+    totals = [0.0, 0.0]
+    for name, sql in analyses.QUERY_MAP.items():
+        mysql_df, mysql_s = timed(lambda: db.run_query(analyses.for_table(sql, args.table)),
+                                  args.repeats, lambda: None)
+        duck_df, duck_s = timed(lambda: duck.fetch(duck.analysis_sql(name)), args.repeats, duck.cache.clear)
+        totals[0] += mysql_s
+        totals[1] += duck_s
+        status = analyses.compare_results(name, mysql_df, duck_df)
+        print(f"{name[:70]:<72}{mysql_s * 1000:>10.1f}{duck_s * 1000:>11.1f}  {status}")
+    print(f"{'total':<72}{totals[0] * 1000:>10.1f}{totals[1] * 1000:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
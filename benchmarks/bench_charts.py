@@ -0,0 +1,42 @@
+import argparse
+import time
+
+import pandas as pd
+import plotly.express as px
+
+import charts
+from benchmarks.synthetic import make_stops
+
+# Figure JSON size and build time with and without charts.py on synthetic stops:
+# a high-cardinality category chart (stops per plate) and a time series over all years.
+#
+#   python -m benchmarks.bench_charts --rows 1000000
+
+def measure(label, build):
+    start = time.perf_counter()
+    fig = build()
+    size = charts.payload_bytes(fig)
+    print(f"{label:<40}{size / 1024:>12,.1f}{(time.perf_counter() - start) * 1000:>12.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark chart payload sizes")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args(argv)
+
+    stops = make_stops(args.rows)
+    plates = stops.groupby("vehicle_number", as_index=False).size()
+    when = pd.to_datetime(stops["stop_date"] + " " + stops["stop_time"])
+    hourly = when.dt.floor("h").value_counts().sort_index().rename_axis("when").reset_index(name="stops")
+
+    print(f"{'chart':<40}{'KiB':>12}{'ms':>12}")
+    measure("plates bar, every row", lambda: px.bar(plates, x="vehicle_number", y="size"))
+    measure("plates bar, top categories", lambda: charts.category_figure(
+        lambda d: px.bar(d, x="vehicle_number", y="size"), plates, "vehicle_number", "size")[0])
+    measure("stops per hour, every row", lambda: px.line(hourly, x="when", y="stops"))
+    measure("stops over time, bucketed", lambda: charts.time_figure(
+        lambda d: px.line(d, x="when", y="stops"), hourly, "when", ["stops"])[0])
+
+
+if __name__ == "__main__":
+    main()
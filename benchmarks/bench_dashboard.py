@@ -0,0 +1,64 @@
+import argparse
+import statistics
+import time
+
+import db
+import metrics
+import parallel
+from benchmarks.synthetic import load_table
+
+# "Data Analytics & Visuals" page queries: one after another vs. concurrently through
+# parallel.run. Concurrent page time should approach the slowest single query.
+#
+#   python -m benchmarks.bench_dashboard --rows 1000000
+
+BENCH_TABLE = "SECURECHECK.logs_bench"
+
+TAB_QUERIES = {
+    "violations": "SELECT violation, COUNT(violation) AS counts FROM {table} GROUP BY violation",
+    "genders": "select driver_gender, count(*) as count from {table} group by driver_gender",
+    "drugs": "SELECT country_name, drugs_related_stop, count(*) as count from {table} "
+             "group by country_name, drugs_related_stop",
+}
+
+
+def page_queries(table):
+    tasks = {"kpis": lambda: metrics.scan_kpis(table)}
+    for name, sql in TAB_QUERIES.items():
+        tasks[name] = lambda sql=sql: db.run_query(sql.format(table=table))
+    return tasks
+
+
+def timed(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        db.cache.clear()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark sequential vs. concurrent dashboard queries")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--table", default=BENCH_TABLE, help="scratch table to fill with synthetic rows")
+    args = parser.parse_args(argv)
+
+    load_table(args.table, args.rows)
+    tasks = page_queries(args.table)
+
+    print(f"{'query':<28}{'median ms':>12}")
+    singles = {}
+    for name, fn in tasks.items():
+        singles[name] = timed(fn, args.repeats)
+        print(f"{name:<28}{singles[name]:>12.1f}")
+    sequential = timed(lambda: [fn() for fn in tasks.values()], args.repeats)
+    concurrent = timed(lambda: list(parallel.run(tasks)), args.repeats)
+    print(f"{'page, sequential':<28}{sequential:>12.1f}")
+    print(f"{'page, concurrent':<28}{concurrent:>12.1f}   (slowest query {max(singles.values()):.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import db
+import export
+import paging
+from benchmarks.synthetic import load_table
+
+# Exporting every logs row: fetchall() into one DataFrame and write it (what scrolling
+# st.dataframe relied on) vs. the streaming export (unbuffered cursor, chunked writes).
+# Each variant runs in a fresh interpreter so its peak memory is its own.
+#
+#   python -m benchmarks.bench_export --rows 10000000
+
+BENCH_TABLE = "SECURECHECK.logs_bench"
+
+
+def legacy_export(table, path, fmt):
+    df = db.run_query(f"SELECT {', '.join(paging.ALL_COLUMNS)} FROM {table}")
+    if fmt == "csv":
+        export.csv_frame(df).to_csv(path, index=False)
+    else:
+        df.to_parquet(path, index=False)
+    return len(df)
+
+
+def streaming_export(table, path, fmt):
+    return export.export(path, fmt, paging.ALL_COLUMNS, table=table)
+
+
+# Runs in the child process; prints one JSON line
+def child(variant, table, fmt):
+    path = os.path.join(tempfile.mkdtemp(prefix="securecheck_bench_export_"), f"logs.{fmt}")
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    rows = (legacy_export if variant == "fetchall" else streaming_export)(table, path, fmt)
+    seconds = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    size = os.path.getsize(path)
+    os.remove(path)
+    # ru_maxrss is in KiB on Linux
+    print(json.dumps({"rows": rows, "seconds": seconds, "growth_mib": (peak - before) / 1024,
+                      "peak_mib": peak / 1024, "file_mib": size / 2**20}))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark memory and speed of exporting all logs")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--table", default=BENCH_TABLE, help="scratch table to fill with synthetic rows")
+    parser.add_argument("--format", choices=export.FORMATS, default="csv")
+    parser.add_argument("--child", choices=["fetchall", "stream"], help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        child(args.child, args.table, args.format)
+        return
+
+    load_table(args.table, args.rows)
+    print(f"{'variant':<12}{'rows':>12}{'seconds':>10}{'rows/s':>12}{'RSS growth MiB':>16}{'peak MiB':>10}{'file MiB':>10}")
+    for variant in ["stream", "fetchall"]:
+        done = subprocess.run([sys.executable, "-m", "benchmarks.bench_export", "--child", variant,
+                               "--table", args.table, "--format", args.format], capture_output=True, text=True)
+        if done.returncode:
+            print(f"{variant:<12}failed: {done.stderr.strip().splitlines()[-1]}")
+            continue
+        r = json.loads(done.stdout.strip().splitlines()[-1])
+        print(f"{variant:<12}{r['rows']:>12}{r['seconds']:>10.1f}{r['rows'] / r['seconds']:>12.0f}"
+              f"{r['growth_mib']:>16.0f}{r['peak_mib']:>10.0f}{r['file_mib']:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import argparse
+import time
+
+import pandas as pd
+import pymysql
+
+import db
+import ingest
+from schema import create_schema
+from benchmarks.synthetic import synthetic_csv
+
+# Compare the notebook's iterrows() INSERT loop with ingest.py on a generated file.
+# Both write to scratch tables so SECURECHECK.logs is never touched.
+#
+#   python -m benchmarks.bench_ingest --rows 1000000 --legacy-rows 20000
+
+LEGACY_TABLE = "SECURECHECK.logs_bench_legacy"
+BULK_TABLE = "SECURECHECK.logs_bench_bulk"
+
+
+# The loop from securecheck.ipynb, unchanged apart from the target table
+def legacy_load(df, table):
+    sp = pymysql.connect(**dict(db.DB_CONFIG, cursorclass=pymysql.cursors.Cursor))
+    cursor = sp.cursor()
+    try:
+        for _, row in df.iterrows():
+            cursor.execute(f"""
+                INSERT INTO {table} (
+                    stop_date, stop_time, country_name, driver_gender, driver_age,
+                    driver_race, violation_raw, violation, search_conducted, search_type,
+                    stop_outcome, is_arrested, stop_duration, drugs_related_stop, vehicle_number
+                ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """, (
+                row['stop_date'], row['stop_time'], row['country_name'], row['driver_gender'], row['driver_age'],
+                row['driver_race'], row['violation_raw'], row['violation'], row['search_conducted'],
+                row['search_type'], row['stop_outcome'], row['is_arrested'], row['stop_duration'],
+                row['drugs_related_stop'], row['vehicle_number']
+            ))
+        sp.commit()
+    finally:
+        cursor.close()
+        sp.close()
+
+
+def reset_tables():
+    sp = pymysql.connect(**dict(db.DB_CONFIG, cursorclass=pymysql.cursors.Cursor))
+    try:
+        with sp.cursor() as cursor:
+            for table in (LEGACY_TABLE, BULK_TABLE):
+                cursor.execute(f"DROP TABLE IF EXISTS {table}")
+                create_schema(cursor, table)
+        sp.commit()
+    finally:
+        sp.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark iterrows loading against ingest.py")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--legacy-rows", type=int, default=20_000,
+                        help="rows for the iterrows loop; its full-size time is extrapolated")
+    parser.add_argument("--batch-size", type=int, default=ingest.BATCH_SIZE)
+    parser.add_argument("--method", choices=["executemany", "load-data"], default="executemany")
+    args = parser.parse_args(argv)
+
+    reset_tables()
+    path = synthetic_csv(args.rows)
+
+    # The notebook reads and cleans the whole file up front, so that cost is not timed
+    legacy_rows = min(args.legacy_rows, args.rows)
+    df = ingest.clean_chunk(pd.read_csv(path, nrows=legacy_rows))
+    df = df.astype(object).where(df.notna(), None)
+    start = time.perf_counter()
+    legacy_load(df, LEGACY_TABLE)
+    legacy = time.perf_counter() - start
+    legacy_rate = legacy_rows / legacy
+
+    bulk = ingest.ingest(path, BULK_TABLE, batch_size=args.batch_size, method=args.method,
+                         restart=True, quiet=True)
+
+    print(f"{'loader':<24}{'rows':>12}{'seconds':>12}{'rows/sec':>14}")
+    print(f"{'iterrows (measured)':<24}{legacy_rows:>12}{legacy:>12.1f}{legacy_rate:>14,.0f}")
+    print(f"{'iterrows (projected)':<24}{args.rows:>12}{args.rows / legacy_rate:>12.1f}{legacy_rate:>14,.0f}")
+    print(f"{'ingest.py ' + args.method:<24}{bulk['rows']:>12}{bulk['seconds']:>12.1f}{bulk['rows_per_sec']:>14,.0f}")
+    print(f"Speedup: {bulk['rows_per_sec'] / legacy_rate:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import argparse
+import statistics
+import time
+import tracemalloc
+
+import db
+import metrics
+from schema import LOGS_TABLE
+from benchmarks.synthetic import load_table
+
+# Quick-metrics tiles: old "load every row, count in pandas" vs. the single aggregate query
+# (and the rollup_outcome counters when run against the live logs table).
+#
+#   python -m benchmarks.bench_kpis --rows 1000000
+
+BENCH_TABLE = "SECURECHECK.logs_bench"
+
+
+# What the Data Analytics page used to do
+def legacy_kpis(table):
+    data = db.run_query(f"select * from {table}")
+    return {
+        "total_stops": data.shape[0],
+        "arrests": data[data["stop_outcome"].str.contains("arrest", case=False, na=False)].shape[0],
+        "warnings": data[data["stop_outcome"].str.contains("Warning", case=False, na=False)].shape[0],
+        "drug_stops": data[data["drugs_related_stop"] == 1].shape[0],
+    }
+
+
+def measure(fn, repeats):
+    timings = []
+    peak = 0
+    for _ in range(repeats):
+        db.cache.clear()
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return result, statistics.median(timings), peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the quick-metrics tiles")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--table", default=BENCH_TABLE,
+                        help=f"scratch table to fill with synthetic rows; pass {LOGS_TABLE} to also time the rollup")
+    args = parser.parse_args(argv)
+
+    if args.table != LOGS_TABLE:
+        load_table(args.table, args.rows)
+
+    variants = [
+        ("load all rows + pandas", lambda: legacy_kpis(args.table)),
+        ("single aggregate query", lambda: metrics.scan_kpis(args.table)),
+    ]
+    if args.table == LOGS_TABLE:
+        variants.append(("rollup_outcome counters", metrics.kpis))
+
+    print(f"{'variant':<28}{'median ms':>12}{'peak MiB':>12}  result")
+    baseline = None
+    for label, fn in variants:
+        result, seconds, peak = measure(fn, args.repeats)
+        baseline = baseline or result
+        flag = "" if result == baseline else "  <-- differs"
+        print(f"{label:<28}{seconds * 1000:>12.1f}{peak / 2**20:>12.1f}  {result}{flag}")
+
+
+if __name__ == "__main__":
+    main()
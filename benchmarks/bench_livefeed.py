@@ -0,0 +1,79 @@
+import argparse
+import statistics
+import time
+
+import db
+import ingest
+import livefeed
+import metrics
+from benchmarks.synthetic import load_table, make_stops
+from schema import insert_sql
+
+# Cost of one live refresh as stops arrive: reloading the table the way the pages used
+# to (select *), one aggregate pass over it (the KPI query without rollups), and a poll
+# of the live feed, which reads only the new stops. The reloads grow with the table;
+# the poll grows with the number of new stops.
+#
+#   python -m benchmarks.bench_livefeed --rows 1000000 --new 0 10 100 1000 10000
+
+BENCH_TABLE = "SECURECHECK.logs_bench_live"
+
+
+def append(table, n, seed):
+    rows = ingest.to_rows(ingest.clean_chunk(make_stops(n, seed)))
+    with db.pool.connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.executemany(insert_sql(table), rows)
+
+
+def median_ms(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        db.cache.clear()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark live refreshes: full reloads vs. polling new stops")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--new", type=int, nargs="+", default=[0, 10, 100, 1000, 10000],
+                        help="new stops logged before each refresh")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--skip-select-all", action="store_true", help="leave out the select * reload")
+    args = parser.parse_args(argv)
+
+    load_table(BENCH_TABLE, args.rows)
+    reloads = {"aggregate scan": lambda: metrics.scan_kpis(BENCH_TABLE)}
+    if not args.skip_select_all:
+        reloads["select *"] = lambda: db.run_query(f"SELECT * FROM {BENCH_TABLE}")
+    print(f"{'refresh':<20}{'table rows':>12}{'median ms':>12}")
+    for name, fn in reloads.items():
+        print(f"{name:<20}{args.rows:>12}{median_ms(fn, args.repeats):>12.1f}")
+
+    feed = livefeed.LiveFeed(BENCH_TABLE)
+    start = time.perf_counter()
+    feed.poll()
+    print(f"{'feed start (once)':<20}{args.rows:>12}{(time.perf_counter() - start) * 1000:>12.1f}")
+
+    print(f"\n{'new stops':<12}{'poll ms':>10}{'µs/stop':>10}{'counters':>10}")
+    for i, n in enumerate(args.new):
+        timings = []
+        for r in range(args.repeats):
+            if n:
+                append(BENCH_TABLE, n, seed=1000 + i * args.repeats + r)
+            start = time.perf_counter()
+            read = feed.poll()
+            timings.append(time.perf_counter() - start)
+            assert read == n, f"polled {read} stops, expected {n}"
+        ms = statistics.median(timings) * 1000
+        # The counters must still match a full recount after every batch
+        db.cache.clear()
+        ok = "ok" if feed.kpis() == metrics.scan_kpis(BENCH_TABLE) else "DIFFER"
+        print(f"{n:<12}{ms:>10.2f}{(ms * 1000 / n if n else 0):>10.1f}{ok:>10}")
+
+
+if __name__ == "__main__":
+    main()
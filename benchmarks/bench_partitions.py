@@ -0,0 +1,114 @@
+import argparse
+import statistics
+import time
+from datetime import timedelta
+
+import pandas as pd
+
+import analyses
+import db
+import metrics
+import paging
+import partitions
+from schema import create_schema, migrate
+from benchmarks.synthetic import load_table
+
+# Date-bounded queries on the same multi-year synthetic stops (2020-2024), stored once as
+# a plain table and once partitioned by month (partitions.partition_table, after the
+# load). Both tables have every migration, so the difference is the partition pruning
+# alone (and the partitioned table losing its FULLTEXT index, which these don't use).
+#
+#   python -m benchmarks.bench_partitions --rows 10000000
+
+FLAT_TABLE = "SECURECHECK.logs_bench_flat"
+PARTITIONED_TABLE = "SECURECHECK.logs_bench_part"
+TIMED_ANALYSES = [
+    "Yearly Breakdown of Stops and Arrests by Country",
+    "Time Period Analysis of Stops, Number of Stops by Year, Month, Hour of the Day",
+    "Time of Day with Most Traffic Stops",
+]
+
+
+def timed(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        db.cache.clear()
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return result, statistics.median(timings)
+
+
+def prepare(table, rows, seed, partition=False):
+    load_table(table, rows, seed)
+    with db.pool.connection() as conn:
+        with conn.cursor() as cursor:
+            create_schema(cursor, table)
+            start = time.perf_counter()
+            applied = migrate(cursor, table)
+            if partition and not partitions.is_partitioned(table):
+                partitions.partition_table(cursor, table)
+                applied.append("monthly partitions")
+    if applied:
+        print(f"{table}: applied {', '.join(applied)} in {time.perf_counter() - start:.1f}s")
+
+
+def queries(table, date_range):
+    conditions, params = partitions.date_filter(date_range)
+    found = {
+        "count (View Logs)": lambda: paging.count_rows(conditions, params, table),
+        "first page (View Logs)": lambda: paging.fetch_page(paging.DEFAULT_COLUMNS, conditions, params,
+                                                            table=table),
+        "quick metrics": lambda: metrics.scan_kpis(partitions.source(date_range, table)),
+    }
+    for name in TIMED_ANALYSES:
+        found[name] = lambda name=name: db.run_query(partitions.restrict(analyses.QUERY_MAP[name], date_range, table))
+    return found
+
+
+def _same(name, a, b):
+    if isinstance(a, pd.DataFrame):
+        return analyses.compare_results(name, a, b) != "MISMATCH"
+    return a == b
+
+
+# Partitions the count query reads, as "read/total"
+def partitions_read(table, date_range):
+    conditions, params = partitions.date_filter(date_range)
+    plan = db.run_query(f"EXPLAIN SELECT COUNT(*) FROM {table} WHERE {' AND '.join(conditions)}", params)
+    total = len(partitions.list_partitions(table))
+    read = str(plan["partitions"].iloc[0] or "")
+    return f"{len(read.split(',')) if read else 0}/{total}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark date-range queries with and without monthly partitions")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    prepare(FLAT_TABLE, args.rows, args.seed)
+    prepare(PARTITIONED_TABLE, args.rows, args.seed, partition=True)
+
+    first, last = partitions.date_bounds(PARTITIONED_TABLE)
+    ranges = [("1 month", (last - timedelta(days=30), last)),
+              ("1 quarter", (last - timedelta(days=91), last)),
+              ("1 year", (last - timedelta(days=365), last)),
+              ("all dates", (first, last))]
+
+    print(f"\n{'range':<11}{'query':<50}{'flat ms':>10}{'part. ms':>10}{'speedup':>9}  partitions")
+    for label, date_range in ranges:
+        read = partitions_read(PARTITIONED_TABLE, date_range)
+        flat = queries(FLAT_TABLE, date_range)
+        partitioned = queries(PARTITIONED_TABLE, date_range)
+        for name in flat:
+            a, flat_s = timed(flat[name], args.repeats)
+            b, part_s = timed(partitioned[name], args.repeats)
+            flag = "" if _same(name, a, b) else "  <-- results differ"
+            print(f"{label:<11}{name[:48]:<50}{flat_s * 1000:>10.1f}{part_s * 1000:>10.1f}"
+                  f"{flat_s / part_s:>8.1f}x  {read}{flag}")
+
+
+if __name__ == "__main__":
+    main()
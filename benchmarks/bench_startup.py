@@ -0,0 +1,69 @@
+import argparse
+import ast
+import statistics
+import subprocess
+import sys
+
+import startup
+
+# Cold import cost of the Streamlit app, each measurement in a fresh interpreter: what
+# main.py imports at the top (read from main.py, so the list stays current), the same
+# plus the modules it no longer loads up front (what a cold start used to pay), and
+# each of those on its own.
+#
+#   python -m benchmarks.bench_startup --repeats 5
+
+DEFERRED = [
+    "matplotlib.pyplot",  # imported by main.py but never used; dropped
+    "plotly.express",     # now imported when a chart is first drawn (startup.plotly)
+    "duckdb",             # now only imported with SECURECHECK_BACKEND=duckdb
+]
+
+
+def main_imports(path="main.py"):
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    names = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            names.append(node.module)
+    return names
+
+
+# Median seconds to import modules in a new interpreter, or (None, error)
+def cold_import(modules, repeats):
+    code = ("import time; start = time.perf_counter(); "
+            + "; ".join(f"import {m}" for m in modules)
+            + "; print(time.perf_counter() - start)")
+    timings = []
+    for _ in range(repeats):
+        done = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+        if done.returncode:
+            return None, done.stderr.strip().splitlines()[-1]
+        timings.append(float(done.stdout.split()[-1]))
+    return statistics.median(timings), None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the app's cold import time")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    imports = main_imports()
+    variants = [("main.py imports", imports),
+                ("main.py imports + deferred modules (before)", imports + DEFERRED)]
+    variants += [(f"  {name} alone", [name]) for name in DEFERRED]
+
+    print(f"{'imports':<50}{'median ms':>12}")
+    for label, modules in variants:
+        seconds, error = cold_import(modules, args.repeats)
+        result = f"{seconds * 1000:>12.0f}" if error is None else f"  failed: {error}"
+        print(f"{label:<50}{result}")
+    print(f"\nFirst-render budget: {startup.STARTUP_BUDGET_MS:.0f} ms "
+          "(python startup.py report checks the last real start)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import argparse
+import threading
+import time
+
+import numpy as np
+
+import db
+import ingest
+import writer
+from schema import LOG_COLUMNS, create_schema, insert_sql
+from benchmarks.synthetic import make_stops
+
+# Load test for the stop-logging write path: many check posts submitting at once.
+#
+# --clients threads each submit their share of --rows stops as fast as the queue lets
+# them. Reports the sustained insert rate (submit of the first stop to commit of the
+# last), enqueue latency percentiles and how often backpressure kicked in. For
+# reference, the notebook's one-INSERT-and-commit-per-row loop is timed on --legacy-rows.
+#
+#   python -m benchmarks.bench_writer --rows 200000 --clients 32
+
+BENCH_TABLE = "SECURECHECK.logs_bench_writes"
+
+
+def legacy_inserts(table, stops):
+    query = insert_sql(table)
+    start = time.perf_counter()
+    for row in ingest.to_rows(ingest.clean_chunk(stops)):
+        db.execute(query, row)
+    return time.perf_counter() - start
+
+
+def client(stop_writer, stops, latencies, futures, rejected):
+    for stop in stops:
+        # Measured from the first attempt, so time lost to backpressure counts
+        start = time.perf_counter()
+        while True:
+            try:
+                futures.append(stop_writer.submit(stop))
+                latencies.append(time.perf_counter() - start)
+                break
+            except writer.QueueFull:
+                # What a check post does on a 503: back off briefly and resend
+                rejected.append(1)
+                time.sleep(0.01)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the queued stop writer")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--batch-size", type=int, default=writer.BATCH_SIZE)
+    parser.add_argument("--flush-interval", type=float, default=writer.FLUSH_INTERVAL)
+    parser.add_argument("--max-queue", type=int, default=writer.MAX_QUEUE)
+    parser.add_argument("--legacy-rows", type=int, default=2_000)
+    parser.add_argument("--table", default=BENCH_TABLE, help="scratch table, emptied first")
+    args = parser.parse_args(argv)
+
+    with db.pool.connection() as conn:
+        with conn.cursor() as cursor:
+            create_schema(cursor, args.table)
+            cursor.execute(f"TRUNCATE TABLE {args.table}")
+
+    stops = make_stops(args.rows)
+    legacy_seconds = legacy_inserts(args.table, stops.head(args.legacy_rows))
+    db.execute(f"TRUNCATE TABLE {args.table}")
+
+    records = stops[LOG_COLUMNS].to_dict("records")
+    shares = [records[i::args.clients] for i in range(args.clients)]
+    latencies, futures, rejected = [], [], []
+    stop_writer = writer.StopWriter(args.table, args.max_queue, args.batch_size, args.flush_interval)
+    threads = [threading.Thread(target=client, args=(stop_writer, share, latencies, futures, rejected))
+               for share in shares]
+
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    failed = 0
+    for future in futures:
+        if future.exception() is not None:
+            failed += 1
+    seconds = time.perf_counter() - start
+    stop_writer.close()
+
+    stats = stop_writer.snapshot()
+    written = db.run_query(f"SELECT COUNT(*) AS n FROM {args.table}")["n"].iloc[0]
+    ms = np.array(latencies) * 1000
+    print(f"notebook per-row INSERT   {args.legacy_rows / legacy_seconds:>12,.0f} rows/sec")
+    print(f"queued batched writer     {stats['written'] / seconds:>12,.0f} rows/sec "
+          f"({args.clients} clients, {stats['batches']} batches, avg {stats['written'] / max(stats['batches'], 1):.0f} rows)")
+    print(f"enqueue latency ms        p50 {np.percentile(ms, 50):.3f}  p99 {np.percentile(ms, 99):.3f}  "
+          f"max {ms.max():.3f}")
+    print(f"backpressure              {len(rejected)} QueueFull retries")
+    print(f"rows in table             {written} of {args.rows} ({failed} failed)")
+
+
+if __name__ == "__main__":
+    main()
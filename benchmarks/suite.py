@@ -0,0 +1,184 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+
+import analyses
+import db
+import ingest
+import metrics
+import model
+import predictor
+import snapshot
+from schema import create_schema
+from benchmarks.synthetic import parse_rows, synthetic_csv
+
+# Reproducible benchmark run over synthetic data: ingestion, every canned analysis, the
+# quick-metrics tiles and the Predict Logs path, all against a scratch table. Results
+# are saved as JSON so two runs (before/after a change) can be compared.
+#
+#   python -m benchmarks.suite run --rows 1m
+#   python -m benchmarks.suite compare benchmarks/results/old.json benchmarks/results/new.json
+
+BENCH_TABLE = "SECURECHECK.logs_suite"
+RESULTS_DIR = os.path.join("benchmarks", "results")
+PREDICT_SAMPLES = 500
+REGRESSION = 1.10  # compare flags anything this much slower
+
+
+def timed(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        db.cache.clear()
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return result, {"median_ms": statistics.median(timings) * 1000, "min_ms": min(timings) * 1000}
+
+
+def bench_ingest(table, rows, seed):
+    path = synthetic_csv(rows, seed)
+    with db.pool.connection() as conn:
+        with conn.cursor() as cursor:
+            create_schema(cursor, table)
+            cursor.execute(f"TRUNCATE TABLE {table}")
+    result = ingest.ingest(path, table, restart=True, quiet=True)
+    return {"seconds": result["seconds"], "rows_per_sec": result["rows_per_sec"]}
+
+
+def bench_analyses(table, repeats):
+    results = {}
+    for name, sql in analyses.QUERY_MAP.items():
+        df, timing = timed(lambda: db.run_query(analyses.for_table(sql, table)), repeats)
+        results[name] = dict(timing, rows=len(df))
+    return results
+
+
+def bench_kpis(table, repeats):
+    counts, timing = timed(lambda: metrics.scan_kpis(table), repeats)
+    return dict(timing, **counts)
+
+
+def bench_predict(table, repeats):
+    source = snapshot.LogsSnapshot(table)
+    start = time.perf_counter()
+    source.refresh()
+    snapshot_seconds = time.perf_counter() - start
+
+    index = predictor.Predictor(source)
+    start = time.perf_counter()
+    index.refresh()
+    index_seconds = time.perf_counter() - start
+
+    sample = source.frame.sample(min(PREDICT_SAMPLES, len(source.frame)), random_state=0)
+    stops = list(sample[predictor.FEATURES].itertuples(index=False))
+    start = time.perf_counter()
+    for stop in stops:
+        index.predict(*stop)
+    lookup_ms = (time.perf_counter() - start) / max(len(stops), 1) * 1000
+
+    start = time.perf_counter()
+    trained = model.train(table)
+    train_seconds = time.perf_counter() - start
+    _, batch = timed(lambda: trained.predict(sample), repeats)
+    return {"snapshot_load_s": snapshot_seconds, "index_build_s": index_seconds,
+            "lookup_predict_ms": lookup_ms, "model_train_s": train_seconds,
+            "model_batch_ms_per_1k": batch["median_ms"] / max(len(sample), 1) * 1000,
+            "snapshot_mib": source.memory_report()["bytes"] / 2**20}
+
+
+def _meta(args):
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+    version = db.run_query("SELECT VERSION() AS v")["v"].iloc[0]
+    return {"rows": args.rows, "seed": args.seed, "table": args.table, "repeats": args.repeats,
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"), "git_commit": commit,
+            "python": platform.python_version(), "pandas": pd.__version__, "mysql": version,
+            "host": platform.node()}
+
+
+def run(args):
+    results = {"meta": _meta(args)}
+    steps = [
+        ("ingest", lambda: bench_ingest(args.table, args.rows, args.seed) if not args.skip_ingest else None),
+        ("analyses", lambda: bench_analyses(args.table, args.repeats)),
+        ("kpis", lambda: bench_kpis(args.table, args.repeats)),
+        ("predict", lambda: bench_predict(args.table, args.repeats)),
+    ]
+    for name, step in steps:
+        start = time.perf_counter()
+        results[name] = step()
+        print(f"{name:<10}{time.perf_counter() - start:>8.1f}s")
+
+    out = args.out or os.path.join(RESULTS_DIR, f"suite-{args.rows}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(results, f, indent=1, default=str)
+    print(f"Results -> {out}")
+
+
+# Flatten {"analyses": {"X": {"median_ms": 1}}} to {"analyses / X / median_ms": 1}
+def _timings(results, prefix=""):
+    flat = {}
+    for key, value in results.items():
+        if key == "meta":
+            continue
+        if isinstance(value, dict):
+            flat.update(_timings(value, f"{prefix}{key} / "))
+        elif key.endswith(("_ms", "_s", "seconds", "_ms_per_1k")):
+            flat[prefix + key] = value
+    return flat
+
+
+def compare(old_path, new_path):
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    for label, data in (("old", old), ("new", new)):
+        meta = data["meta"]
+        print(f"{label}: {meta['git_commit']} {meta['rows']} rows, seed {meta['seed']}, {meta['started_at']}")
+    if (old["meta"]["rows"], old["meta"]["seed"]) != (new["meta"]["rows"], new["meta"]["seed"]):
+        print("warning: the runs used different data")
+    old_t, new_t = _timings(old), _timings(new)
+    print(f"\n{'measurement':<90}{'old':>12}{'new':>12}{'ratio':>8}")
+    for key in [k for k in old_t if k in new_t]:
+        a, b = old_t[key], new_t[key]
+        ratio = b / a if a else float("nan")
+        flag = "  slower" if ratio > REGRESSION else ""
+        print(f"{key[:88]:<90}{a:>12.2f}{b:>12.2f}{ratio:>8.2f}{flag}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark suite over synthetic traffic stops")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("run")
+    p.add_argument("--rows", type=parse_rows, default="1m", help="10k, 1m, 10m or a number")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--repeats", type=int, default=3)
+    p.add_argument("--table", default=BENCH_TABLE, help="scratch table, emptied and refilled")
+    p.add_argument("--skip-ingest", action="store_true", help="reuse the rows already in --table")
+    p.add_argument("-o", "--out", help=f"results file (default: {RESULTS_DIR}/suite-<rows>-<time>.json)")
+    p = sub.add_parser("compare")
+    p.add_argument("old")
+    p.add_argument("new")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        run(args)
+    else:
+        compare(args.old, args.new)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import db
+import ingest
+from schema import LOG_COLUMNS, create_schema
+
+# Synthetic traffic stops in the same shape as the traffic_stops.xlsx source file.
+#
+# The marginals follow a typical state traffic-stop dataset (mostly male drivers,
+# speeding the most common violation, citations the most common outcome) and the
+# columns depend on each other the way they do in the real data: DUI stops are
+# searched and end in arrest far more often, drugs are found almost only when a search
+# was made, searches and arrests make stops longer, night stops lean towards arrests,
+# and a small set of plates is stopped again and again.
+#
+# Rows are generated in chunks, each from its own seed derived from (seed, chunk
+# number), so the output is identical for a given seed however it is consumed and
+# 10M rows never have to fit in memory at once.
+#
+#   python -m benchmarks.synthetic --rows 1m --format parquet -o stops_1m.parquet
+#   python -m benchmarks.synthetic --rows 10k --format sqlite -o stops.db
+#   python -m benchmarks.synthetic --rows 10m --format mysql --table SECURECHECK.logs_10m
+
+SIZES = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+CHUNK_SIZE = 500_000
+
+COUNTRIES = ["USA", "Canada", "India"]
+COUNTRY_WEIGHTS = [0.5, 0.3, 0.2]
+GENDERS = ["M", "F"]
+GENDER_WEIGHTS = [0.68, 0.32]
+RACES = ["White", "Black", "Hispanic", "Asian", "Other"]
+RACE_WEIGHTS = [0.71, 0.14, 0.11, 0.03, 0.01]
+
+# violation -> (share of stops, raw label, search probability, arrest probability)
+VIOLATIONS = {
+    "Speeding": (0.55, "Speeding", 0.02, 0.01),
+    "Moving violation": (0.19, "Other Traffic Violation", 0.06, 0.04),
+    "Equipment": (0.13, "Equipment/Inspection Violation", 0.05, 0.02),
+    "Other": (0.06, "Registration/plates", 0.05, 0.06),
+    "Seatbelt": (0.04, "Seatbelt Violation", 0.02, 0.01),
+    "DUI": (0.03, "Call for Service", 0.35, 0.45),
+}
+NON_ARREST_OUTCOMES = ["Citation", "Ticket", "Warning"]
+NON_ARREST_WEIGHTS = [0.72, 0.18, 0.10]
+SEARCH_TYPES = ["Vehicle Search", "Frisk"]
+DURATIONS = ["0-15 Min", "16-30 Min", "30+ Min"]
+
+# Relative stop volume by hour of day: morning and evening commutes, quiet small hours
+HOUR_WEIGHTS = np.array([3, 2, 2, 1, 1, 2, 4, 7, 8, 7, 6, 6, 6, 6, 7, 8, 9, 9, 7, 6, 5, 5, 4, 4], dtype=float)
+START_DATE = np.datetime64("2020-01-01")
+DAYS = 5 * 365
+
+PLATES = 1_000_000
+REPEAT_PLATES = 2_000     # plates that keep getting stopped
+REPEAT_SHARE = 0.08       # share of stops involving one of them
+
+
+def _chunk(rng, n):
+    violation_names = list(VIOLATIONS)
+    shares, raw, search_p, arrest_p = (np.array([v[i] for v in VIOLATIONS.values()]) for i in range(4))
+    violation = rng.choice(len(violation_names), n, p=shares / shares.sum())
+
+    gender = rng.choice(GENDERS, n, p=GENDER_WEIGHTS)
+    age = np.clip(16 + rng.gamma(2.2, 9.0, n), 16, 90).astype(int)
+    young_male = (gender == "M") & (age < 30)
+
+    days = rng.integers(0, DAYS, n)
+    hour = rng.choice(24, n, p=HOUR_WEIGHTS / HOUR_WEIGHTS.sum())
+    seconds = hour * 3600 + rng.integers(0, 3600, n)
+    night = (hour >= 22) | (hour < 5)
+
+    searched = rng.random(n) < search_p[violation] * np.where(young_male, 1.8, 1.0)
+    drugs = searched & (rng.random(n) < 0.25) | (rng.random(n) < 0.001)
+    arrest_chance = arrest_p[violation] * np.where(searched, 4.0, 1.0) * np.where(night, 1.5, 1.0)
+    arrested = rng.random(n) < np.minimum(arrest_chance, 0.95)
+    outcome = np.where(arrested, "Arrest", rng.choice(NON_ARREST_OUTCOMES, n, p=NON_ARREST_WEIGHTS))
+
+    # Searches and arrests push stops into the longer brackets
+    longer = searched.astype(int) + arrested.astype(int)
+    duration_p = np.array([[0.80, 0.16, 0.04], [0.45, 0.40, 0.15], [0.15, 0.45, 0.40]])[longer]
+    duration = (rng.random((n, 1)) > duration_p.cumsum(axis=1)).sum(axis=1)
+
+    # Repeat offenders are skewed too: the lowest plate numbers come up most often
+    repeat = (REPEAT_PLATES * rng.random(n) ** 2).astype(int)
+    plates = np.where(rng.random(n) < REPEAT_SHARE, repeat, rng.integers(REPEAT_PLATES, PLATES, n))
+
+    return pd.DataFrame({
+        "stop_date": pd.Series(START_DATE + days.astype("timedelta64[D]")).dt.strftime("%Y-%m-%d"),
+        "stop_time": [f"{s // 3600:02d}:{s % 3600 // 60:02d}:{s % 60:02d}" for s in seconds],
+        "country_name": rng.choice(COUNTRIES, n, p=COUNTRY_WEIGHTS),
+        "driver_gender": gender,
+        "driver_age_raw": age,
+        "driver_age": age,
+        "driver_race": rng.choice(RACES, n, p=RACE_WEIGHTS),
+        "violation_raw": raw[violation],
+        "violation": np.array(violation_names)[violation],
+        "search_conducted": searched,
+        "search_type": np.where(searched, rng.choice(SEARCH_TYPES, n, p=[0.6, 0.4]), None),
+        "stop_outcome": outcome,
+        "is_arrested": arrested,
+        "stop_duration": np.array(DURATIONS)[np.minimum(duration, 2)],
+        "drugs_related_stop": drugs,
+        "vehicle_number": [f"VH{p:06d}" for p in plates],
+    })
+
+
+# n stops as DataFrames of at most chunk_size rows; the same seed gives the same rows
+def iter_stops(n, seed=0, chunk_size=CHUNK_SIZE):
+    for i, start in enumerate(range(0, n, chunk_size)):
+        yield _chunk(np.random.default_rng([seed, i]), min(chunk_size, n - start))
+
+
+def make_stops(n, seed=0):
+    return pd.concat(iter_stops(n, seed), ignore_index=True)
+
+
+def write_csv(path, n, seed=0):
+    for i, chunk in enumerate(iter_stops(n, seed)):
+        chunk.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+
+
+def write_parquet(path, n, seed=0):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for chunk in iter_stops(n, seed):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                # search_type could come out all-null in a tiny chunk; pin it to string
+                schema = table.schema.set(table.schema.get_field_index("search_type"),
+                                          pa.field("search_type", pa.string()))
+                writer = pq.ParquetWriter(path, schema)
+            writer.write_table(table.cast(schema))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+# A SQLite file with a logs table, for trying queries without a MySQL server
+def load_sqlite(path, n, seed=0):
+    columns = ", ".join(LOG_COLUMNS)
+    placeholders = ", ".join(["?"] * len(LOG_COLUMNS))
+    con = sqlite3.connect(path)
+    try:
+        con.execute("DROP TABLE IF EXISTS logs")
+        con.execute(f"CREATE TABLE logs (id INTEGER PRIMARY KEY AUTOINCREMENT, {columns})")
+        for chunk in iter_stops(n, seed):
+            df = ingest.clean_chunk(chunk)
+            # SQLite has no DATE/TIME types; store ISO strings
+            df["stop_date"] = df["stop_date"].astype(str)
+            df["stop_time"] = df["stop_time"].astype(str)
+            con.executemany(f"INSERT INTO logs ({columns}) VALUES ({placeholders})", ingest.to_rows(df))
+        con.commit()
+    finally:
+        con.close()
+
+
+# Write n synthetic stops to a CSV in the temp dir (reused across runs) and return its path
+def synthetic_csv(n, seed=0):
+    path = os.path.join(tempfile.gettempdir(), f"securecheck_synthetic_v2_{n}_{seed}.csv")
+    if not os.path.exists(path):
+        write_csv(path + ".tmp", n, seed)
+        os.replace(path + ".tmp", path)
+    return path
+
+
+# (Re)create a scratch logs table holding n synthetic stops, unless it already has them
+def load_table(table, n, seed=0):
+    with db.pool.connection() as conn:
+        with conn.cursor() as cursor:
+            create_schema(cursor, table)
+            cursor.execute(f"SELECT COUNT(*) AS n FROM {table}")
+            if cursor.fetchone()["n"] == n:
+                return
+            cursor.execute(f"TRUNCATE TABLE {table}")
+    ingest.ingest(synthetic_csv(n, seed), table, restart=True, quiet=True)
+
+
+# "10k", "1m", "10m" or a plain number
+def parse_rows(value):
+    return SIZES.get(value.lower()) or int(value.replace("_", ""))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic traffic stops")
+    parser.add_argument("--rows", type=parse_rows, default="10k", help="10k, 1m, 10m or a number")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--format", choices=["csv", "parquet", "sqlite", "mysql"], default="csv")
+    parser.add_argument("-o", "--out", help="output file (csv, parquet, sqlite)")
+    parser.add_argument("--table", default="SECURECHECK.logs_synthetic", help="target table (mysql)")
+    args = parser.parse_args(argv)
+
+    if args.format != "mysql" and not args.out:
+        parser.error(f"--out is required for --format {args.format}")
+    start = time.perf_counter()
+    if args.format == "csv":
+        write_csv(args.out, args.rows, args.seed)
+    elif args.format == "parquet":
+        write_parquet(args.out, args.rows, args.seed)
+    elif args.format == "sqlite":
+        load_sqlite(args.out, args.rows, args.seed)
+    else:
+        load_table(args.table, args.rows, args.seed)
+    print(f"Wrote {args.rows} stops ({args.format}) in {time.perf_counter() - start:.1f}s "
+          f"-> {args.table if args.format == 'mysql' else args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+import os
+
+import pandas as pd
+
+# Server-side preparation of chart data, so no Plotly figure ships more to the browser
+# than it can usefully draw.
+#
+# - category charts (pies, bars) keep the largest MAX_CATEGORIES - 1 categories and
+#   fold the rest into one "All others" slice
+# - time series are bucketed at the finest resolution (hour, day, week, month, quarter,
+#   year) that keeps the selected range under MAX_POINTS points
+# - numbers are rounded and downcast before the figure is built
+# - if the figure JSON still exceeds PAYLOAD_BUDGET bytes, the data is cut in half again
+#   (fewer categories, coarser buckets) until it fits
+
+MAX_CATEGORIES = int(os.environ.get("SECURECHECK_CHART_MAX_CATEGORIES", "10"))
+MAX_POINTS = int(os.environ.get("SECURECHECK_CHART_MAX_POINTS", "400"))
+PAYLOAD_BUDGET = int(os.environ.get("SECURECHECK_CHART_BUDGET", "100000"))  # bytes of figure JSON
+MIN_ROWS = 2
+
+# Not "Other": that is already a real violation category
+OTHER = "All others"
+
+# (name, pandas frequency, approximate seconds per bucket), finest first
+RESOLUTIONS = [
+    ("hour", "h", 3600),
+    ("day", "D", 86400),
+    ("week", "W-MON", 7 * 86400),
+    ("month", "MS", 30.44 * 86400),
+    ("quarter", "QS", 91.31 * 86400),
+    ("year", "YS", 365.25 * 86400),
+]
+
+
+# Totals per category (and per `by` series, for stacked charts), largest first; beyond
+# n categories the smallest are summed into OTHER, which always comes last
+def top_categories(df, category, value, n=MAX_CATEGORIES, by=None):
+    df = df.copy()
+    df[category] = df[category].astype(object).where(df[category].notna(), "Unknown")
+    totals = df.groupby(category, sort=False)[value].sum().sort_values(ascending=False)
+    order = list(totals.index)
+    if len(totals) > n:
+        order = order[:max(n - 1, 1)]
+        df[category] = df[category].where(df[category].isin(order), OTHER)
+        order.append(OTHER)
+    keys = [category] + ([by] if by else [])
+    out = df.groupby(keys, sort=False, dropna=False)[value].sum().reset_index()
+    rank = {c: i for i, c in enumerate(order)}
+    return out.sort_values(category, key=lambda s: s.map(rank), kind="stable").reset_index(drop=True)
+
+
+# Finest resolution (no finer than `finest`) that covers start..end in at most max_points buckets
+def resolution_for(start, end, max_points=MAX_POINTS, finest="hour"):
+    span = max((pd.Timestamp(end) - pd.Timestamp(start)).total_seconds(), 0)
+    names = [name for name, _, _ in RESOLUTIONS]
+    for name, freq, seconds in RESOLUTIONS[names.index(finest):]:
+        if span / seconds + 1 <= max_points:
+            return name, freq
+    return RESOLUTIONS[-1][:2]
+
+
+# Sum value_cols into time buckets; the resolution chosen is left in out.attrs["resolution"]
+def bucket_time(df, time_col, value_cols, start=None, end=None, max_points=MAX_POINTS, finest="hour"):
+    times = pd.to_datetime(df[time_col])
+    start = pd.Timestamp(start) if start is not None else times.min()
+    end = pd.Timestamp(end) if end is not None else times.max()
+    df = df.assign(**{time_col: times})
+    df = df[(df[time_col] >= start) & (df[time_col] <= end)]
+    name, freq = resolution_for(start, end, max_points, finest)
+    out = df.groupby(pd.Grouper(key=time_col, freq=freq))[value_cols].sum().reset_index()
+    out.attrs["resolution"] = name
+    return out
+
+
+# Rows from the "Time Period Analysis" query (year, month, hour) as a monthly time column
+def time_period_frame(df):
+    period = pd.to_datetime(pd.DataFrame({"year": df["year"], "month": df["month"], "day": 1}), errors="coerce")
+    return df.assign(period=period).dropna(subset=["period"])
+
+
+# Rounded floats (short JSON numbers) and the smallest integer types (Plotly packs
+# integer arrays by dtype)
+def compact(df):
+    df = df.copy()
+    for col in df.columns:
+        if pd.api.types.is_bool_dtype(df[col]):
+            continue
+        if pd.api.types.is_integer_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], downcast="integer")
+        elif pd.api.types.is_float_dtype(df[col]):
+            df[col] = df[col].round(3)
+    return df
+
+
+def payload_bytes(fig):
+    return len(fig.to_json())
+
+
+# Build the figure from prepare(n); while it is over budget, halve n and try again.
+# Returns (figure, payload bytes).
+def fit_budget(make_fig, prepare, n, budget=PAYLOAD_BUDGET):
+    while True:
+        fig = make_fig(compact(prepare(n)))
+        size = payload_bytes(fig)
+        if size <= budget or n <= MIN_ROWS:
+            return fig, size
+        n = max(MIN_ROWS, n // 2)
+
+
+def category_figure(make_fig, df, category, value, by=None, n=MAX_CATEGORIES, budget=PAYLOAD_BUDGET):
+    return fit_budget(make_fig, lambda k: top_categories(df, category, value, k, by), n, budget)
+
+
+def time_figure(make_fig, df, time_col, value_cols, start=None, end=None, finest="hour",
+                max_points=MAX_POINTS, budget=PAYLOAD_BUDGET):
+    return fit_budget(make_fig, lambda k: bucket_time(df, time_col, value_cols, start, end, k, finest),
+                      max_points, budget)
@@ -0,0 +1,275 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import pymysql
+import pandas as pd
+
+import instrument
+
+# Shared data-access layer for SecureCheck.
+# One bounded connection pool and one query-result cache live at module level,
+# so every Streamlit session in the same server process reuses them.
+
+# Seconds before giving up on the server. Without them a half-open TCP connection blocks
+# whoever reads from it for as long as the OS keeps the socket. The read timeout also
+# bounds the longest single statement, so raise it for rollup rebuilds of huge tables.
+TIMEOUTS = {
+    "connect_timeout": int(os.environ.get("SECURECHECK_DB_CONNECT_TIMEOUT", "10")),
+    "read_timeout": int(os.environ.get("SECURECHECK_DB_READ_TIMEOUT", "900")),
+    "write_timeout": int(os.environ.get("SECURECHECK_DB_WRITE_TIMEOUT", "60")),
+}
+
+DB_CONFIG = {
+    "host": os.environ.get("SECURECHECK_DB_HOST", "localhost"),
+    "user": os.environ.get("SECURECHECK_DB_USER", "root"),
+    "password": os.environ.get("SECURECHECK_DB_PASSWORD", ""),
+    "database": os.environ.get("SECURECHECK_DB_NAME", "SECURECHECK"),
+    "cursorclass": pymysql.cursors.DictCursor,  # So we get column names
+    # Pooled connections live a long time; without autocommit a reused connection would
+    # keep reading from the snapshot of its first query. Writers call begin() explicitly.
+    "autocommit": True,
+    **TIMEOUTS,
+}
+
+POOL_SIZE = int(os.environ.get("SECURECHECK_POOL_SIZE", "8"))
+POOL_TIMEOUT = float(os.environ.get("SECURECHECK_POOL_TIMEOUT", "10"))
+CACHE_TTL = float(os.environ.get("SECURECHECK_CACHE_TTL", "60"))
+CACHE_MAX_ENTRIES = int(os.environ.get("SECURECHECK_CACHE_MAX_ENTRIES", "256"))
+
+# Connections idle for longer than this are pinged before they are handed out
+HEALTH_CHECK_AFTER = 30.0
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+# A pymysql connection that counts the bytes it reads, for the query instrumentation
+class CountingConnection(pymysql.connections.Connection):
+    bytes_received = 0
+
+    def _read_bytes(self, num_bytes):
+        data = super()._read_bytes(num_bytes)
+        self.bytes_received += len(data)
+        return data
+
+
+class ConnectionPool:
+
+    def __init__(self, max_size=POOL_SIZE, timeout=POOL_TIMEOUT, **config):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.config = config or dict(DB_CONFIG)
+        self._idle = []  # (connection, last_used) pairs, most recently used last
+        self._in_use = 0
+        self._cond = threading.Condition()
+        self.stats = {"hits": 0, "misses": 0, "discarded": 0, "waits": 0, "wait_time": 0.0}
+
+    def _connect(self):
+        return CountingConnection(**dict(TIMEOUTS, **self.config))
+
+    def _healthy(self, conn, last_used):
+        if time.monotonic() - last_used < HEALTH_CHECK_AFTER:
+            return True
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except pymysql.MySQLError:
+            return False
+
+    def acquire(self):
+        start = time.monotonic()
+        waited = False
+        while True:
+            with self._cond:
+                while not self._idle and self._in_use >= self.max_size:
+                    remaining = self.timeout - (time.monotonic() - start)
+                    if remaining <= 0:
+                        raise PoolTimeout(f"No database connection free after {self.timeout}s")
+                    waited = True
+                    self._cond.wait(remaining)
+                # Reserve the slot now; ping or connect outside the lock, so one slow or
+                # dead server connection can't stall every other borrower
+                self._in_use += 1
+                idle = self._idle.pop() if self._idle else None
+            if idle is None:
+                break
+            conn, last_used = idle
+            if self._healthy(conn, last_used):
+                with self._cond:
+                    self.stats["hits"] += 1
+                    self._record_wait(start, waited)
+                return conn
+            _close_quietly(conn)
+            with self._cond:
+                self.stats["discarded"] += 1
+                self._in_use -= 1
+                self._cond.notify()
+        with self._cond:
+            self.stats["misses"] += 1
+            self._record_wait(start, waited)
+        try:
+            return self._connect()
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+    def _record_wait(self, start, waited):
+        if waited:
+            self.stats["waits"] += 1
+        self.stats["wait_time"] += time.monotonic() - start
+
+    def release(self, conn, broken=False):
+        with self._cond:
+            self._in_use -= 1
+            if broken or not conn.open:
+                self.stats["discarded"] += 1
+                _close_quietly(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        broken = False
+        try:
+            yield conn
+        except pymysql.err.OperationalError:
+            broken = True
+            raise
+        except Exception:
+            # Leave no half-finished transaction behind for the next borrower
+            try:
+                conn.rollback()
+            except pymysql.MySQLError:
+                broken = True
+            raise
+        finally:
+            self.release(conn, broken)
+
+    def close(self):
+        with self._cond:
+            while self._idle:
+                conn, _ = self._idle.pop()
+                _close_quietly(conn)
+
+    def snapshot(self):
+        with self._cond:
+            return dict(self.stats, idle=len(self._idle), in_use=self._in_use, max_size=self.max_size)
+
+
+class QueryCache:
+
+    def __init__(self, ttl=CACHE_TTL, max_entries=CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, DataFrame)
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @staticmethod
+    def make_key(query, params=None):
+        # Collapse whitespace so the same SQL written on several lines shares an entry
+        text = " ".join(query.split())
+        if params is None:
+            return (text, None)
+        if isinstance(params, dict):
+            return (text, tuple(sorted(params.items())))
+        return (text, tuple(params))
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry[1]
+
+    def put(self, key, df, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, df)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    # Drop every cached result whose SQL mentions the given text (e.g. a table name)
+    def invalidate(self, text):
+        text = text.lower()
+        with self._lock:
+            for key in [k for k in self._entries if text in k[0].lower()]:
+                del self._entries[key]
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats, entries=len(self._entries), max_entries=self.max_entries, ttl=self.ttl)
+
+
+def _close_quietly(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+pool = ConnectionPool()
+cache = QueryCache()
+
+
+# Run a query on a pooled connection and return the rows as a DataFrame
+def run_query(query, params=None):
+    start = time.perf_counter()
+    with pool.connection() as conn:
+        received = getattr(conn, "bytes_received", 0)
+        with conn.cursor() as cursor:
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+        received = getattr(conn, "bytes_received", 0) - received
+    built = time.perf_counter()
+    df = pd.DataFrame(rows)
+    end = time.perf_counter()
+    instrument.record_query(query, end - start, len(df), received, end - built)
+    return df
+
+
+# Cached read: identical query text + bind parameters within the TTL skip the database
+def fetch_data(query, params=None, ttl=None, use_cache=True):
+    if not use_cache:
+        return run_query(query, params)
+    key = cache.make_key(query, params)
+    df = cache.get(key)
+    if df is None:
+        df = run_query(query, params)
+        cache.put(key, df, ttl)
+    # Callers are free to modify what they get back
+    return df.copy()
+
+
+def execute(query, params=None, many=False):
+    with pool.connection() as conn:
+        with conn.cursor() as cursor:
+            if many:
+                cursor.executemany(query, params)
+            else:
+                cursor.execute(query, params)
+            conn.commit()
+            return cursor.rowcount
+
+
+def stats():
+    return {"pool": pool.snapshot(), "cache": cache.snapshot()}
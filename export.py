@@ -0,0 +1,227 @@
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import pandas as pd
+import pymysql
+
+import analytics
+import db
+import instrument
+import paging
+import partitions
+import search
+from schema import LOGS_TABLE
+
+# Streaming export of filtered logs (the View Logs filters plus the sidebar date range)
+# to CSV or Parquet.
+#
+# Rows come through an unbuffered server-side cursor (SSCursor) on a connection of their
+# own, CHUNK_SIZE at a time, and each chunk is written out before the next one is read,
+# so memory stays flat however many rows match. The query has no ORDER BY: MySQL sends
+# rows as its scan finds them instead of sorting every match first.
+#
+# In the app an export runs in a background thread while the page shows its progress.
+# A download has to sit in Streamlit's memory, so only up to DOWNLOAD_MAX_ROWS rows can
+# be downloaded; bigger exports are written to a new file under EXPORT_DIR (or use the CLI).
+#
+#   python export.py --out stops.parquet --violation Speed --from 2021-01-01 --to 2021-12-31
+
+CHUNK_SIZE = int(os.environ.get("SECURECHECK_EXPORT_CHUNK", "50000"))
+DOWNLOAD_MAX_ROWS = int(os.environ.get("SECURECHECK_DOWNLOAD_MAX_ROWS", "250000"))
+EXPORT_DIR = os.environ.get("SECURECHECK_EXPORT_DIR", os.path.join("data", "exports"))
+FORMATS = ["csv", "parquet"]
+# Seconds MySQL waits on a slow reader (e.g. a big Parquet row group being written)
+# before giving up on the stream; its default is 60
+WRITE_TIMEOUT = 3600
+
+
+# DataFrames of at most chunk_size matching rows, read off an unbuffered cursor
+def iter_chunks(columns=paging.ALL_COLUMNS, conditions=(), params=(), table=LOGS_TABLE, chunk_size=CHUNK_SIZE):
+    # Only known column names ever reach the SQL text
+    columns = [c for c in columns if c in paging.ALL_COLUMNS] or paging.ALL_COLUMNS
+    query = f"SELECT {', '.join(columns)} FROM {table} WHERE {' AND '.join(conditions) or '1=1'}"
+    conn = db.CountingConnection(**dict(db.DB_CONFIG, cursorclass=pymysql.cursors.SSCursor))
+    start = time.perf_counter()
+    rows = 0
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"SET SESSION net_write_timeout = {WRITE_TIMEOUT}")
+        cursor.execute(query, list(params))
+        while True:
+            batch = cursor.fetchmany(chunk_size)
+            if not batch:
+                break
+            rows += len(batch)
+            yield pd.DataFrame(batch, columns=columns)
+    finally:
+        # Closing the connection, not the cursor: an unbuffered cursor would first read
+        # every row still unsent if the export stopped early
+        if conn.open:
+            conn.close()
+        instrument.record_query(query, time.perf_counter() - start, rows, conn.bytes_received, 0.0)
+
+
+# Text for CSV: TIME values arrive as timedeltas, which pandas would write as "0 days 08:15:00"
+def csv_frame(df):
+    if "stop_time" not in df.columns:
+        return df
+    return df.assign(stop_time=df["stop_time"].map(lambda t: str(t).split()[-1] if pd.notnull(t) else ""))
+
+
+# Write the chunks to path (via a .tmp file, renamed when complete); returns the rows
+# written. progress(rows) is called after every chunk.
+def write(chunks, path, fmt, columns, progress=None):
+    rows = 0
+    if fmt == "csv":
+        with open(path + ".tmp", "w", newline="", encoding="utf-8") as f:
+            for chunk in chunks:
+                csv_frame(chunk).to_csv(f, header=rows == 0, index=False)
+                rows += len(chunk)
+                if progress:
+                    progress(rows)
+            if rows == 0:
+                pd.DataFrame(columns=columns).to_csv(f, index=False)
+    else:
+        import pyarrow.parquet as pq
+
+        writer = None
+        try:
+            for chunk in chunks:
+                table = analytics.to_arrow(chunk, list(chunk.columns))
+                if writer is None:
+                    writer = pq.ParquetWriter(path + ".tmp", table.schema)
+                writer.write_table(table)
+                rows += len(chunk)
+                if progress:
+                    progress(rows)
+            if writer is None:
+                pq.write_table(analytics.to_arrow(pd.DataFrame(columns=columns), columns), path + ".tmp")
+        finally:
+            if writer is not None:
+                writer.close()
+    os.replace(path + ".tmp", path)
+    return rows
+
+
+def export(path, fmt="csv", columns=paging.ALL_COLUMNS, conditions=(), params=(), table=LOGS_TABLE,
+           progress=None):
+    columns = [c for c in columns if c in paging.ALL_COLUMNS] or paging.ALL_COLUMNS
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    try:
+        with instrument.label("export"):
+            return write(iter_chunks(columns, conditions, params, table), path, fmt, columns, progress)
+    except BaseException:
+        if os.path.exists(path + ".tmp"):
+            os.remove(path + ".tmp")
+        raise
+
+
+# A new file under EXPORT_DIR for an export saved on the server. name is an optional
+# file name from the page, never a path; the random suffix keeps concurrent exports
+# (and repeated names) from sharing a file. Raises ValueError for an unusable name.
+def server_path(fmt, name=None):
+    stem = "logs-export"
+    if name and name.strip():
+        name = name.strip()
+        if any(c in name for c in ("/", "\\", "\0")) or ".." in name or name.startswith("."):
+            raise ValueError(f"{name!r} is not a plain file name")
+        stem = name[:-len(f".{fmt}")] if name.endswith(f".{fmt}") else name
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    fd, path = tempfile.mkstemp(prefix=f"{stem}-", suffix=f".{fmt}", dir=EXPORT_DIR)
+    os.close(fd)
+    return path
+
+
+# A fresh temporary file for an export that will be downloaded
+def download_path(fmt):
+    fd, path = tempfile.mkstemp(prefix="securecheck-export-", suffix=f".{fmt}")
+    os.close(fd)
+    return path
+
+
+class ExportJob:
+
+    def __init__(self, path, fmt, total=None, download=False):
+        self.path = path
+        self.format = fmt
+        self.total = total         # matching rows, if counted beforehand
+        self.download = download   # path is a temporary file, to be offered as a download
+        self.rows = 0
+        self.state = "running"     # running -> done | failed
+        self.started = time.time()
+        self.finished = None
+        self.error = None
+        self._done = threading.Event()
+
+    # True once finished (done or failed), False if still running after timeout seconds
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    @property
+    def seconds(self):
+        return (self.finished or time.time()) - self.started
+
+    def _set_rows(self, rows):
+        self.rows = rows
+
+
+# Run an export in a background thread; the returned job tracks it
+def start(path, fmt, columns, conditions=(), params=(), table=LOGS_TABLE, total=None, download=False):
+    job = ExportJob(path, fmt, total, download)
+
+    def run():
+        try:
+            job.rows = export(path, fmt, columns, conditions, params, table, job._set_rows)
+        except Exception as e:
+            job.error = e
+            job.finished = time.time()
+            job.state = "failed"
+        else:
+            job.finished = time.time()
+            job.state = "done"
+        finally:
+            job._done.set()
+
+    threading.Thread(target=run, name="export", daemon=True).start()
+    return job
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export filtered logs to CSV or Parquet, streamed from MySQL")
+    parser.add_argument("--out", required=True, help="output file; .parquet selects Parquet unless --format says otherwise")
+    parser.add_argument("--format", choices=FORMATS)
+    parser.add_argument("--vehicle", help="vehicle number filter")
+    parser.add_argument("--vehicle-mode", choices=search.VEHICLE_MODES, default="prefix")
+    parser.add_argument("--violation", help="violation starts with")
+    parser.add_argument("--country", help="country starts with")
+    parser.add_argument("--from", dest="start", help="first stop date (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="end", help="last stop date (YYYY-MM-DD)")
+    parser.add_argument("--columns", nargs="+", choices=paging.ALL_COLUMNS, default=paging.ALL_COLUMNS)
+    parser.add_argument("--table", default=LOGS_TABLE)
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("parquet" if args.out.endswith(".parquet") else "csv")
+    if bool(args.start) != bool(args.end):
+        parser.error("--from and --to go together")
+    conditions, params = search.build_filters(args.vehicle, args.violation, args.country, args.vehicle_mode,
+                                              args.table)
+    dates, date_params = partitions.date_filter((args.start, args.end) if args.start else None)
+
+    started = time.perf_counter()
+    try:
+        rows = export(args.out, fmt, args.columns, conditions + dates, params + date_params, args.table,
+                      progress=lambda n: print(f"\r{n:,} rows", end="", flush=True))
+    except (pymysql.MySQLError, db.PoolTimeout, OSError) as e:
+        print(f"\nError: {e}")
+        return 2
+    seconds = time.perf_counter() - started
+    print(f"\rExported {rows:,} rows to {args.out} in {seconds:.1f}s ({rows / max(seconds, 1e-9):,.0f} rows/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+import pymysql
+
+import db
+from schema import LOGS_TABLE, LOG_COLUMNS, BOOL_COLUMNS, create_schema, insert_sql
+
+# Bulk, resumable loader for traffic stop files into SECURECHECK.logs.
+# Replaces the notebook's iterrows() loop: the source is read in chunks, cleaned the
+# same way the notebook cleans it, and written in batches with one commit per batch.
+#
+#   python ingest.py "traffic_stops.xlsx" --batch-size 5000
+#   python ingest.py stops.parquet --method load-data
+
+CHUNK_SIZE = 100_000
+BATCH_SIZE = 5_000
+
+
+# Read the source file in chunks of DataFrames (Excel, CSV or Parquet)
+def read_chunks(path, chunk_size=CHUNK_SIZE, sheet=0):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        yield from pd.read_csv(path, chunksize=chunk_size)
+    elif ext == ".parquet":
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    elif ext in (".xlsx", ".xlsm"):
+        yield from _read_excel_chunks(path, chunk_size, sheet)
+    else:
+        raise ValueError(f"Unsupported file type: {ext}")
+
+
+# pandas can't read Excel in chunks, so stream the rows with openpyxl in read-only mode
+def _read_excel_chunks(path, chunk_size, sheet):
+    from openpyxl import load_workbook
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[sheet] if isinstance(sheet, int) else wb[sheet]
+        rows = ws.iter_rows(values_only=True)
+        header = next(rows)
+        buffer = []
+        for row in rows:
+            buffer.append(row)
+            if len(buffer) == chunk_size:
+                yield pd.DataFrame(buffer, columns=header)
+                buffer = []
+        if buffer:
+            yield pd.DataFrame(buffer, columns=header)
+    finally:
+        wb.close()
+
+
+# Same cleaning steps as securecheck.ipynb, applied per chunk
+def clean_chunk(df):
+    # find and remove the missing values; columns the table doesn't have are dropped too
+    df = df.dropna(axis=1, how="all").reindex(columns=LOG_COLUMNS)
+    # replace NAN values
+    df = df.fillna({"search_type": "none"})
+    # converting date and time from object to date & time.
+    # Unparseable values become NULL instead of aborting a multi-hour load
+    df["stop_date"] = pd.to_datetime(df["stop_date"], format="%Y-%m-%d", errors="coerce").dt.date
+    df["stop_time"] = pd.to_datetime(df["stop_time"], format="%H:%M:%S", errors="coerce").dt.time
+    df["driver_age"] = pd.to_numeric(df["driver_age"], errors="coerce").astype("Int64")
+    for col in BOOL_COLUMNS:
+        df[col] = df[col].map(_to_bool_int, na_action="ignore").astype("Int64")
+    return df
+
+
+def _to_bool_int(value):
+    if isinstance(value, str):
+        return 1 if value.strip().lower() in ("1", "true", "yes") else 0
+    return int(bool(value))
+
+
+# Plain Python tuples with None for missing values, ready for executemany
+def to_rows(df):
+    df = df.astype(object).where(df.notna(), None)
+    return list(df.itertuples(index=False, name=None))
+
+
+class Loader:
+
+    def __init__(self, table=LOGS_TABLE, method="executemany"):
+        self.table = table
+        self.method = method
+        self.insert = insert_sql(table)
+        self.conn = pymysql.connect(**dict(db.DB_CONFIG, cursorclass=pymysql.cursors.Cursor,
+                                           local_infile=method == "load-data", autocommit=False))
+        with self.conn.cursor() as cursor:
+            create_schema(cursor, table)
+        self.conn.commit()
+
+    def committed_rows(self, source):
+        with self.conn.cursor() as cursor:
+            cursor.execute("SELECT rows_committed FROM SECURECHECK.ingest_progress WHERE source = %s", (source,))
+            row = cursor.fetchone()
+        return row[0] if row else 0
+
+    def reset(self, source):
+        with self.conn.cursor() as cursor:
+            cursor.execute("DELETE FROM SECURECHECK.ingest_progress WHERE source = %s", (source,))
+        self.conn.commit()
+
+    # Insert one batch and advance the progress marker in the same transaction,
+    # so a crash can never leave rows loaded but not recorded (or the other way round)
+    def write_batch(self, source, batch, rows_committed):
+        try:
+            with self.conn.cursor() as cursor:
+                if self.method == "load-data":
+                    self._load_data(cursor, batch)
+                else:
+                    cursor.executemany(self.insert, to_rows(batch))
+                cursor.execute(
+                    "INSERT INTO SECURECHECK.ingest_progress (source, rows_committed) VALUES (%s, %s) "
+                    "ON DUPLICATE KEY UPDATE rows_committed = VALUES(rows_committed)",
+                    (source, rows_committed + len(batch)),
+                )
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+
+    def _load_data(self, cursor, batch):
+        fd, path = tempfile.mkstemp(suffix=".csv")
+        os.close(fd)
+        try:
+            batch.to_csv(path, header=False, index=False, na_rep="\\N", lineterminator="\n")
+            cursor.execute(
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE {self.table} "
+                "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' LINES TERMINATED BY '\\n' "
+                f"({', '.join(LOG_COLUMNS)})",
+                (path,),
+            )
+        finally:
+            os.remove(path)
+
+    def close(self):
+        self.conn.close()
+
+
+# Load a file into the logs table, resuming after the last committed batch
+def ingest(path, table=LOGS_TABLE, batch_size=BATCH_SIZE, chunk_size=CHUNK_SIZE,
+           method="executemany", restart=False, sheet=0, quiet=False):
+    source = f"{os.path.abspath(path)}::{table}"
+    loader = Loader(table, method)
+    try:
+        if restart:
+            loader.reset(source)
+        done = loader.committed_rows(source)
+        if done and not quiet:
+            print(f"Resuming after {done} committed rows")
+
+        seen = 0
+        loaded = 0
+        start = time.perf_counter()
+        for chunk in read_chunks(path, chunk_size, sheet):
+            # Skip whatever an earlier run already committed
+            if seen + len(chunk) <= done:
+                seen += len(chunk)
+                continue
+            if seen < done:
+                chunk = chunk.iloc[done - seen:]
+            seen += len(chunk)
+
+            chunk = clean_chunk(chunk)
+            for offset in range(0, len(chunk), batch_size):
+                batch = chunk.iloc[offset:offset + batch_size]
+                loader.write_batch(source, batch, done + loaded)
+                loaded += len(batch)
+                if not quiet:
+                    elapsed = time.perf_counter() - start
+                    print(f"{done + loaded} rows committed, {loaded / elapsed:,.0f} rows/sec", end="\r")
+
+        elapsed = time.perf_counter() - start
+        rate = loaded / elapsed if elapsed else 0.0
+        if not quiet:
+            print(f"\nLoaded {loaded} rows into {table} in {elapsed:.1f}s ({rate:,.0f} rows/sec)")
+        return {"rows": loaded, "seconds": elapsed, "rows_per_sec": rate}
+    finally:
+        loader.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk load traffic stops into SECURECHECK.logs")
+    parser.add_argument("path", help="Excel (.xlsx), CSV or Parquet file")
+    parser.add_argument("--table", default=LOGS_TABLE)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="rows per transaction")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="rows read from the file at a time")
+    parser.add_argument("--method", choices=["executemany", "load-data"], default="executemany")
+    parser.add_argument("--sheet", default=0, help="Excel sheet name or index")
+    parser.add_argument("--restart", action="store_true", help="ignore saved progress and load from the start")
+    args = parser.parse_args(argv)
+
+    sheet = int(args.sheet) if str(args.sheet).isdigit() else args.sheet
+    ingest(args.path, args.table, args.batch_size, args.chunk_size, args.method, args.restart, sheet)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+import contextvars
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+# Timings for every database query and every page render, kept in process memory.
+#
+# db.run_query reports each query's wall time, rows, bytes read off the socket and the
+# time spent building the DataFrame. Queries are grouped under a label (the analysis
+# name, when the app sets one, otherwise the start of the SQL) and the page that ran
+# them. Queries slower than SLOW_QUERY_MS are appended to the slow-query log.
+#
+# prometheus_text() renders everything in the Prometheus text format. With
+# SECURECHECK_METRICS_FILE set it is rewritten after every page render (for a textfile
+# collector); with SECURECHECK_METRICS_PORT set it is served at /metrics, on localhost
+# unless SECURECHECK_METRICS_HOST says otherwise (the labels carry SQL text and there is
+# no authentication, so expose it only behind something that adds one).
+
+SLOW_QUERY_MS = float(os.environ.get("SECURECHECK_SLOW_QUERY_MS", "500"))
+SLOW_QUERY_LOG = os.environ.get("SECURECHECK_SLOW_QUERY_LOG", os.path.join("logs", "slow_queries.log"))
+METRICS_FILE = os.environ.get("SECURECHECK_METRICS_FILE", "")
+METRICS_PORT = int(os.environ.get("SECURECHECK_METRICS_PORT", "0"))
+METRICS_HOST = os.environ.get("SECURECHECK_METRICS_HOST", "127.0.0.1")
+DEBUG = os.environ.get("SECURECHECK_DEBUG", "") == "1"
+
+SAMPLES = 1000  # recent samples kept per label for the percentiles
+SQL_LABEL_LENGTH = 60
+
+_label = contextvars.ContextVar("query_label", default=None)
+_page = contextvars.ContextVar("page", default="-")
+
+
+class Series:
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.rows = 0
+        self.bytes = 0
+        self.build_seconds = 0.0
+        self.recent = deque(maxlen=SAMPLES)
+
+    def add(self, seconds, rows=0, nbytes=0, build_seconds=0.0):
+        self.count += 1
+        self.seconds += seconds
+        self.rows += rows
+        self.bytes += nbytes
+        self.build_seconds += build_seconds
+        self.recent.append(seconds)
+
+    def summary(self):
+        ms = np.asarray(self.recent) * 1000
+        p50, p95, p99 = np.percentile(ms, [50, 95, 99]) if len(ms) else (0.0, 0.0, 0.0)
+        return {"count": self.count, "p50_ms": float(p50), "p95_ms": float(p95), "p99_ms": float(p99),
+                "max_ms": float(ms.max()) if len(ms) else 0.0, "total_s": self.seconds,
+                "rows": self.rows, "bytes": self.bytes, "df_build_s": self.build_seconds}
+
+
+_lock = threading.Lock()
+_queries = {}  # (page, label) -> Series
+_pages = {}    # page -> Series
+_slow = deque(maxlen=100)
+_slow_log = None
+
+
+def _sql_label(query):
+    return " ".join(query.split())[:SQL_LABEL_LENGTH]
+
+
+# Name the queries run inside the block (e.g. after the analysis they answer)
+@contextmanager
+def label(name):
+    token = _label.set(name)
+    try:
+        yield
+    finally:
+        _label.reset(token)
+
+
+def _slow_logger():
+    global _slow_log
+    if _slow_log is None:
+        _slow_log = logging.getLogger("securecheck.slow_queries")
+        _slow_log.propagate = False
+        os.makedirs(os.path.dirname(SLOW_QUERY_LOG) or ".", exist_ok=True)
+        handler = logging.FileHandler(SLOW_QUERY_LOG)
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        _slow_log.addHandler(handler)
+        _slow_log.setLevel(logging.INFO)
+    return _slow_log
+
+
+def record_query(query, seconds, rows, nbytes, build_seconds):
+    page = _page.get()
+    name = _label.get() or _sql_label(query)
+    with _lock:
+        _queries.setdefault((page, name), Series()).add(seconds, rows, nbytes, build_seconds)
+        slow = seconds * 1000 >= SLOW_QUERY_MS
+        if slow:
+            _slow.append({"at": time.strftime("%H:%M:%S"), "ms": seconds * 1000, "rows": rows,
+                          "bytes": nbytes, "page": page, "label": name})
+    if slow:
+        try:
+            _slow_logger().info("%.1fms rows=%d bytes=%d page=%s label=%s sql=%s", seconds * 1000, rows,
+                                nbytes, page, name, " ".join(query.split()))
+        except OSError:
+            pass  # A read-only disk shouldn't break the query that was being timed
+
+
+# Call at the top of a page render; pass the result to end_page() at the bottom
+def start_page(page):
+    _page.set(page)
+    return time.perf_counter()
+
+
+def end_page(page, started):
+    with _lock:
+        _pages.setdefault(page, Series()).add(time.perf_counter() - started)
+    if METRICS_FILE:
+        write_prometheus(METRICS_FILE)
+
+
+def query_summary():
+    with _lock:
+        return [dict(page=page, label=name, **series.summary()) for (page, name), series in _queries.items()]
+
+
+def page_summary():
+    with _lock:
+        return [dict(page=page, **series.summary()) for page, series in _pages.items()]
+
+
+def slow_queries():
+    with _lock:
+        return list(_slow)
+
+
+def reset():
+    with _lock:
+        _queries.clear()
+        _pages.clear()
+        _slow.clear()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+def _summary_lines(metric, help_text, items):
+    lines = [f"# HELP {metric} {help_text}", f"# TYPE {metric} summary"]
+    for labels, series in items:
+        tags = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+        recent = np.asarray(series.recent)
+        for q in (0.5, 0.95, 0.99):
+            value = np.quantile(recent, q) if len(recent) else 0.0
+            lines.append(f'{metric}{{{tags},quantile="{q}"}} {value:.6f}')
+        lines.append(f"{metric}_sum{{{tags}}} {series.seconds:.6f}")
+        lines.append(f"{metric}_count{{{tags}}} {series.count}")
+    return lines
+
+
+def prometheus_text():
+    with _lock:
+        queries = [({"page": page, "query": name}, s) for (page, name), s in _queries.items()]
+        pages = [({"page": page}, s) for page, s in _pages.items()]
+        lines = _summary_lines("securecheck_query_seconds", "Database query wall time.", queries)
+        for metric, attr, help_text in [
+            ("securecheck_query_rows_total", "rows", "Rows returned by database queries."),
+            ("securecheck_query_bytes_total", "bytes", "Bytes read from the database for queries."),
+            ("securecheck_query_df_build_seconds_total", "build_seconds", "Time spent building DataFrames."),
+        ]:
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+            for labels, s in queries:
+                tags = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+                lines.append(f"{metric}{{{tags}}} {getattr(s, attr)}")
+        lines += _summary_lines("securecheck_page_render_seconds", "Streamlit page render time.", pages)
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # Write then rename, so a scraper never reads half a file
+    with open(path + ".tmp", "w") as f:
+        f.write(prometheus_text())
+    os.replace(path + ".tmp", path)
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path != "/metrics":
+            self.send_error(404)
+            return
+        data = prometheus_text().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+
+
+# Serve /metrics from a background thread; only the first call per process starts it
+def start_metrics_server(port=METRICS_PORT, host=METRICS_HOST):
+    global _server
+    with _lock:
+        if _server is not None or not port:
+            return _server
+        try:
+            _server = ThreadingHTTPServer((host, port), MetricsHandler)
+        except OSError:
+            return None  # Port taken, e.g. by another app process; the file export still works
+    threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return _server
@@ -0,0 +1,148 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import pymysql
+
+import analytics
+import db
+import rollups
+from schema import LOGS_TABLE
+
+# Background execution of the canned analyses under "View Logs".
+#
+# An analysis runs only when asked for, on a small worker pool, so a slow one never
+# blocks the page; while it runs the page shows its progress. Finished results are kept
+# per analysis and date range and shared by every session, so switching back to one is
+# instant. A result belongs to the logs "version" it was computed at (the highest stop
+# id); once new stops are inserted it is marked stale and the next request recomputes it.
+# At most MAX_JOBS results are kept; past that the least recently used finished one is
+# dropped (a running job is never dropped).
+
+WORKERS = int(os.environ.get("SECURECHECK_ANALYSIS_WORKERS", "2"))
+MAX_JOBS = int(os.environ.get("SECURECHECK_ANALYSIS_MAX_JOBS", "16"))
+VERSION_TTL = 2.0  # seconds between checks of the logs high-water mark
+
+
+class Job:
+
+    def __init__(self, name, version, date_range=None):
+        self.name = name
+        self.version = version
+        self.date_range = date_range
+        self.state = "running"   # running -> done | failed
+        self.started = time.time()
+        self.finished = None
+        self.result = None
+        self.error = None
+        self._done = threading.Event()
+
+    # True once finished (done or failed), False if still running after timeout seconds
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    @property
+    def seconds(self):
+        return (self.finished or time.time()) - self.started
+
+
+class AnalysisRunner:
+
+    def __init__(self, compute=analytics.run_analysis, table=LOGS_TABLE, workers=WORKERS, max_jobs=MAX_JOBS):
+        self.compute = compute
+        self.table = table
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analysis")
+        self._jobs = OrderedDict()  # (name, date_range) -> latest Job, least recently used first
+        self._durations = {}  # (name, date_range) -> seconds the last successful run took
+        self._lock = threading.Lock()
+        self._version = None
+        self._version_checked = 0.0
+
+    # Highest stop id in logs, re-read at most every VERSION_TTL seconds
+    def version(self):
+        if time.monotonic() - self._version_checked < VERSION_TTL:
+            return self._version
+        try:
+            high = db.run_query(f"SELECT COALESCE(MAX(id), 0) AS high FROM {self.table}")["high"].iloc[0]
+        except (pymysql.MySQLError, db.PoolTimeout):
+            return self._version
+        with self._lock:
+            if self._version is not None and int(high) != self._version:
+                # Stops arrived from somewhere (this app, ingest.py, another process):
+                # cached answers over logs are out of date too
+                db.cache.invalidate(self.table.split(".")[-1])
+                rollups.mark_stale()
+            self._version = int(high)
+            self._version_checked = time.monotonic()
+        return self._version
+
+    # New stops were written by this process; look at the high-water mark again next time
+    def data_changed(self):
+        self._version_checked = 0.0
+
+    def get(self, name, date_range=None):
+        with self._lock:
+            job = self._jobs.get((name, date_range))
+            if job is not None:
+                self._jobs.move_to_end((name, date_range))
+            return job
+
+    def is_fresh(self, job):
+        return job is not None and job.state == "done" and job.version == self.version()
+
+    # Start the analysis unless it is already running or has a fresh result
+    def request(self, name, date_range=None):
+        version = self.version()
+        with self._lock:
+            job = self._jobs.get((name, date_range))
+            if job is not None and (job.state == "running" or (job.state == "done" and job.version == version)):
+                return job
+            job = Job(name, version, date_range)
+            self._jobs[(name, date_range)] = job
+            self._jobs.move_to_end((name, date_range))
+            self._evict()
+        self._executor.submit(self._run, job)
+        return job
+
+    # Drop the least recently used finished jobs past max_jobs; caller holds _lock
+    def _evict(self):
+        excess = len(self._jobs) - self.max_jobs
+        if excess <= 0:
+            return
+        for key in [key for key, job in self._jobs.items() if job.state != "running"][:excess]:
+            del self._jobs[key]
+            self._durations.pop(key, None)
+
+    def _run(self, job):
+        try:
+            result = self.compute(job.name, job.date_range)
+        except Exception as e:
+            job.error = e
+            job.finished = time.time()
+            job.state = "failed"
+        else:
+            job.result = result
+            job.finished = time.time()
+            with self._lock:
+                self._durations[(job.name, job.date_range)] = job.seconds
+            job.state = "done"
+        finally:
+            job._done.set()
+
+    # Rough completion fraction for a running job, from how long the last run took
+    def progress(self, job):
+        expected = self._durations.get((job.name, job.date_range))
+        if not expected:
+            return None
+        return min(job.seconds / expected, 0.95)
+
+    # Analyses with a finished result for date_range
+    def completed(self, date_range=None):
+        with self._lock:
+            return [name for (name, dates), job in self._jobs.items() if dates == date_range and job.state == "done"]
+
+
+runner = AnalysisRunner()
@@ -0,0 +1,300 @@
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+import pymysql
+
+import db
+import rollups
+from schema import LOGS_TABLE
+
+# Live view of new stops for the Home page and the KPI tiles.
+#
+# The feed starts from the rollups (small tables, whatever the size of logs) and from
+# then on only reads the stops past its id high-water mark,
+#     SELECT ... FROM logs WHERE id > <last id seen> ORDER BY id LIMIT BATCH
+# a primary-key range read whose cost follows the stops that arrived, not the table.
+# They are folded into in-memory counters (stops, arrests, warnings, drug stops, stops
+# per violation) and a short list of the latest arrivals. One feed is shared by every
+# session and polls the database at most once per MIN_POLL seconds, however many
+# dashboards are open; each page refreshes on its own interval (INTERVAL by default).
+#
+# Ids are not committed in order (several writers run at once), so like the rollups the
+# feed keeps the holes it has read past as gaps, re-reads them on every poll, and
+# forgets a gap after rollups.COMMIT_LAG seconds. Tailing the binlog would avoid that,
+# but it needs replication privileges and another driver.
+#
+#   python livefeed.py --interval 2     print new stops and the counters as they arrive
+
+INTERVAL = int(os.environ.get("SECURECHECK_LIVE_INTERVAL", "5"))
+MIN_POLL = 1.0
+BATCH = 5000
+RECENT = 50
+
+FEED_COLUMNS = ["id", "stop_date", "stop_time", "country_name", "vehicle_number", "violation",
+                "stop_outcome", "drugs_related_stop"]
+KPI_NAMES = ["total_stops", "arrests", "warnings", "drug_stops"]
+
+# The rollups count up to their own last_id, less their gaps; the snapshot keeps those
+# and the counts consistent with each other
+GROUPS = {"rollup_outcome": "kpis", "rollup_country_violation": "violations"}
+STATE_SQL = ("SELECT name, last_id FROM SECURECHECK.rollup_state "
+             "WHERE name IN ('rollup_outcome', 'rollup_country_violation')")
+GAPS_SQL = ("SELECT name, first_id, last_id FROM SECURECHECK.rollup_gaps "
+            "WHERE name IN ('rollup_outcome', 'rollup_country_violation')")
+OUTCOME_SQL = "SELECT NULLIF(stop_outcome, '') AS stop_outcome, stops, drug_stops FROM SECURECHECK.rollup_outcome"
+VIOLATION_SQL = ("SELECT NULLIF(violation, '') AS violation, SUM(stops) AS stops "
+                 "FROM SECURECHECK.rollup_country_violation GROUP BY violation")
+
+# Starting point for tables without rollups: one pass, grouped by violation
+SCAN_SQL = """SELECT violation, COUNT(*) AS total_stops,
+              SUM(CASE WHEN stop_outcome LIKE '%%arrest%%' THEN 1 ELSE 0 END) AS arrests,
+              SUM(CASE WHEN stop_outcome LIKE '%%warning%%' THEN 1 ELSE 0 END) AS warnings,
+              SUM(CASE WHEN drugs_related_stop = 1 THEN 1 ELSE 0 END) AS drug_stops
+              FROM {table} WHERE id <= %s GROUP BY violation"""
+
+
+# Same classification as metrics.KPI_SQL: LIKE '%arrest%' under a case-insensitive collation
+def _outcome_counts(outcome, stops=1):
+    text = (outcome or "").lower()
+    return {"arrests": stops if "arrest" in text else 0, "warnings": stops if "warning" in text else 0}
+
+
+class LiveFeed:
+
+    def __init__(self, table=LOGS_TABLE):
+        self.table = table
+        self.high = None          # last id read; None until the starting point is loaded
+        self.polled_at = None     # time.time() of the last poll
+        self.added = 0            # stops read since the feed started
+        self._kpis = dict.fromkeys(KPI_NAMES, 0)
+        self._violations = Counter()
+        self._recent = deque(maxlen=RECENT)
+        # Each group of counters includes every id up to its `since` except those in its
+        # gaps, [(first, last, monotonic expiry)]; the two rollups can differ
+        self._since = {"kpis": 0, "violations": 0}
+        self._gaps = {"kpis": [], "violations": []}
+        self._poll_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._last_poll = 0.0
+
+    def _load(self):
+        if self.table == LOGS_TABLE:
+            self._load_rollups()
+        else:
+            self._load_scan()
+        query = f"SELECT {', '.join(FEED_COLUMNS)} FROM {self.table} WHERE id <= %s ORDER BY id DESC LIMIT %s"
+        with self._state_lock:
+            self._recent.extend(reversed(db.run_query(query, (self.high, RECENT)).to_dict("records")))
+
+    def _load_rollups(self):
+        rollups.refresh(self.table)
+        with db.pool.connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT")
+                try:
+                    cursor.execute(STATE_SQL)
+                    state = {row["name"]: row["last_id"] for row in cursor.fetchall()}
+                    cursor.execute(OUTCOME_SQL)
+                    outcomes = cursor.fetchall()
+                    cursor.execute(VIOLATION_SQL)
+                    violations = cursor.fetchall()
+                    cursor.execute(GAPS_SQL)
+                    gaps = cursor.fetchall()
+                finally:
+                    conn.commit()
+        kpis = dict.fromkeys(KPI_NAMES, 0)
+        for row in outcomes:
+            stops = int(row["stops"])
+            kpis["total_stops"] += stops
+            kpis["drug_stops"] += int(row["drug_stops"])
+            for name, n in _outcome_counts(row["stop_outcome"], stops).items():
+                kpis[name] += n
+        with self._state_lock:
+            self._kpis = kpis
+            self._violations = Counter({row["violation"]: int(row["stops"]) for row in violations})
+            self._since = {GROUPS[name]: last_id for name, last_id in state.items()}
+            expires = time.monotonic() + rollups.COMMIT_LAG
+            self._gaps = {"kpis": [], "violations": []}
+            for row in gaps:
+                self._gaps[GROUPS[row["name"]]].append((row["first_id"], row["last_id"], expires))
+            self.high = min(self._since.values())
+
+    def _load_scan(self):
+        with db.pool.connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT")
+                try:
+                    cursor.execute(f"SELECT COALESCE(MAX(id), 0) AS high FROM {self.table}")
+                    high = int(cursor.fetchone()["high"])
+                    cursor.execute(SCAN_SQL.format(table=self.table), (high,))
+                    groups = cursor.fetchall()
+                    _, holes = rollups.find_islands(cursor, self.table, 1, high) if high else ([], [])
+                finally:
+                    conn.commit()
+        expires = time.monotonic() + rollups.COMMIT_LAG
+        with self._state_lock:
+            self._kpis = {name: sum(int(row[name] or 0) for row in groups) for name in KPI_NAMES}
+            self._violations = Counter({row["violation"]: int(row["total_stops"]) for row in groups})
+            self._since = {"kpis": high, "violations": high}
+            self._gaps = {group: [(a, b, expires) for a, b in holes] for group in self._gaps}
+            self.high = high
+
+    # Whether group's counters still lack stop `id`; one found in a gap splits the gap
+    def _take(self, group, id):
+        if id > self._since[group]:
+            return True
+        gaps = self._gaps[group]
+        for i, (a, b, expires) in enumerate(gaps):
+            if a <= id <= b:
+                gaps[i:i + 1] = [g for g in ((a, id - 1, expires), (id + 1, b, expires)) if g[0] <= g[1]]
+                return True
+        return False
+
+    # Count the rows each group doesn't have yet; returns how many were new
+    def _apply(self, rows):
+        applied = 0
+        with self._state_lock:
+            for row in rows:
+                new = False
+                if self._take("kpis", row["id"]):
+                    self._kpis["total_stops"] += 1
+                    self._kpis["drug_stops"] += 1 if row["drugs_related_stop"] == 1 else 0
+                    for name, n in _outcome_counts(row["stop_outcome"]).items():
+                        self._kpis[name] += n
+                    new = True
+                if self._take("violations", row["id"]):
+                    self._violations[row["violation"]] += 1
+                    new = True
+                if new:
+                    self._recent.append(row)
+                    applied += 1
+            self.added += applied
+        return applied
+
+    # Re-read the gaps that haven't expired; returns the stops found in them
+    def _read_gaps(self):
+        now = time.monotonic()
+        with self._state_lock:
+            for group, gaps in self._gaps.items():
+                self._gaps[group] = [g for g in gaps if g[2] > now]
+            ranges = sorted({(a, b) for gaps in self._gaps.values() for a, b, _ in gaps})
+        if not ranges:
+            return 0
+        where = " OR ".join(["id BETWEEN %s AND %s"] * len(ranges))
+        rows = db.run_query(f"SELECT {', '.join(FEED_COLUMNS)} FROM {self.table} WHERE {where} ORDER BY id",
+                            [i for r in ranges for i in r]).to_dict("records")
+        return self._apply(rows) if rows else 0
+
+    # Count a batch read past the high-water mark, and keep the ids it skipped as gaps
+    def _advance(self, rows):
+        added = self._apply(rows)
+        holes = []
+        last = self.high
+        for row in rows:
+            if row["id"] > last + 1:
+                holes.append((last + 1, row["id"] - 1))
+            last = row["id"]
+        expires = time.monotonic() + rollups.COMMIT_LAG
+        with self._state_lock:
+            for group, since in self._since.items():
+                # Below `since` the group's own gaps (from its rollup) already cover the holes
+                self._gaps[group] += [(max(a, since + 1), b, expires) for a, b in holes if b > since]
+                self._since[group] = max(since, last)
+            self.high = last
+        return added
+
+    # Read every stop past the high-water mark (and any that filled a gap) into the
+    # counters; returns how many
+    def poll(self):
+        with self._poll_lock:
+            return self._poll()
+
+    # Poll unless the feed was polled within MIN_POLL seconds or another session is
+    # polling right now; those sessions show the counters as they are
+    def poll_if_due(self):
+        if self.high is not None and time.monotonic() - self._last_poll < MIN_POLL:
+            return 0
+        if not self._poll_lock.acquire(blocking=False):
+            return 0
+        try:
+            return self._poll()
+        finally:
+            self._poll_lock.release()
+
+    # Caller holds _poll_lock
+    def _poll(self):
+        if self.high is None:
+            self._load()
+        query = (f"SELECT {', '.join(FEED_COLUMNS)} FROM {self.table} "
+                 f"WHERE id > %s ORDER BY id LIMIT {BATCH}")
+        added = self._read_gaps()
+        while True:
+            rows = db.run_query(query, (self.high,)).to_dict("records")
+            if rows:
+                added += self._advance(rows)
+            if len(rows) < BATCH:
+                break
+        self.polled_at = time.time()
+        self._last_poll = time.monotonic()
+        return added
+
+    def kpis(self):
+        with self._state_lock:
+            return dict(self._kpis)
+
+    # Stops per violation, most first (None is a stop without a violation)
+    def violations(self):
+        with self._state_lock:
+            return dict(self._violations.most_common())
+
+    # The latest stops, newest first
+    def recent(self, n=RECENT):
+        with self._state_lock:
+            return list(self._recent)[::-1][:n]
+
+
+_feed = None
+_feed_lock = threading.Lock()
+
+
+# The process-wide feed over the logs table, created on first use
+def get_feed():
+    global _feed
+    with _feed_lock:
+        if _feed is None:
+            _feed = LiveFeed()
+    return _feed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Follow new stops as they are logged")
+    parser.add_argument("--interval", type=float, default=INTERVAL, help="seconds between polls")
+    parser.add_argument("--table", default=LOGS_TABLE)
+    args = parser.parse_args(argv)
+
+    feed = LiveFeed(args.table)
+    try:
+        feed.poll()
+        print(f"From id {feed.high}: {feed.kpis()}")
+        while True:
+            time.sleep(args.interval)
+            start = time.perf_counter()
+            added = feed.poll()
+            if added:
+                for row in feed.recent(added)[::-1]:
+                    print(f"  #{row['id']} {row['stop_date']} {row['country_name']} {row['vehicle_number']} "
+                          f"{row['violation']} -> {row['stop_outcome']}")
+                print(f"+{added} in {(time.perf_counter() - start) * 1000:.1f} ms: {feed.kpis()}")
+    except (pymysql.MySQLError, db.PoolTimeout) as e:
+        print(f"Error: {e}")
+        return 2
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,54 +1,197 @@
+import os
+import time
+run_started = time.perf_counter()
+
 import pymysql
 import pandas as pd
 import streamlit as st
-import matplotlib.pyplot as plt
-import plotly.express as px
 
-# Create MySQL connection using pymysql
-def create_connection():
+import db
+import export
+import instrument
+import jobs
+import livefeed
+import analytics
+import charts
+import metrics
+import model as trained_model
+import paging
+import parallel
+import partitions
+import predictor
+import search
+import snapshot
+import startup
+import writer
+
+# Cold-start timings and warm-up; plotly is imported when a chart is first drawn (see startup.py)
+startup.record("imports", time.perf_counter() - run_started)
+startup.warm_up()
+
+# Fetch data through the configured analytics backend (MySQL pool + query cache, or DuckDB)
+def fetch_data(query, params=None):
     try:
-        sp = pymysql.connect(
-            host="localhost",
-            user="root",
-            password="",
-            database="SECURECHECK",
-            cursorclass=pymysql.cursors.DictCursor  # So we get column names
-        )
-        return sp
-    except pymysql.MySQLError as e:
+        return analytics.get_backend().fetch(query, params)
+    except analytics.QUERY_ERRORS as e:
         st.error(f"Connection Error: {e}")
-        return None
-
-# Fetch data from the database using function
-def fetch_data(query):
-    sp = create_connection()
-    if sp:
-        try:
-            with sp.cursor() as cursor:
-                cursor.execute(query)
-                data = cursor.fetchall()
-                df = pd.DataFrame(data)
-                return df
-        finally:
-            sp.close()
-    else:
         return pd.DataFrame()
 
+# Show logs one page at a time (keyset pagination) with column and page-size controls
+def show_paged_logs(key, conditions=(), params=(), show_count=False):
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        columns = st.multiselect("🧾 Columns", paging.ALL_COLUMNS, default=paging.DEFAULT_COLUMNS, key=f"{key}_columns")
+    with col2:
+        page_size = st.selectbox("Rows per page", paging.PAGE_SIZES, index=1, key=f"{key}_page_size")
+
+    # Start id of every page visited so far; reset when the filters or page size change
+    signature = (tuple(conditions), tuple(params), page_size)
+    if st.session_state.get(f"{key}_signature") != signature:
+        st.session_state[f"{key}_signature"] = signature
+        st.session_state[f"{key}_cursors"] = [None]
+    cursors = st.session_state[f"{key}_cursors"]
+
+    try:
+        total = paging.count_rows(conditions, params) if show_count else None
+        # One row past the page tells whether there is a next one
+        page = paging.fetch_page(columns, conditions, params, cursors[-1], page_size + 1)
+    except (pymysql.MySQLError, db.PoolTimeout) as e:
+        st.error(f"Connection Error: {e}")
+        return
+    has_next = len(page) > page_size
+    page = page.head(page_size)
+
+    if show_count:
+        st.success(f"✅ Showing {total} matching logs")
+    if page.empty:
+        st.warning("⚠️ No matching logs found.")
+    else:
+        if 'stop_time' in page.columns:
+            page['stop_time'] = page['stop_time'].apply(lambda x: str(x).split()[-1] if pd.notnull(x) else '')
+        st.dataframe(page, use_container_width=True)
+
+    prev_col, info_col, next_col = st.columns([1, 2, 1])
+    info_col.caption(f"Page {len(cursors)}")
+    if prev_col.button("⬅️ Previous", disabled=len(cursors) == 1, key=f"{key}_prev"):
+        cursors.pop()
+        st.rerun()
+    if next_col.button("Next ➡️", disabled=not has_next, key=f"{key}_next"):
+        cursors.append(int(page["id"].iloc[-1]))
+        st.rerun()
+
+# Live KPI tiles: each refresh reads only the stops logged since the last poll (see
+# livefeed.py). The deltas count what arrived since this session started watching.
+def show_live_kpis(every):
+    try:
+        feed = livefeed.get_feed()
+        feed.poll_if_due()
+    except (pymysql.MySQLError, db.PoolTimeout) as e:
+        st.error(f"Connection Error: {e}")
+        return None
+    kpi = feed.kpis()
+    start = st.session_state.setdefault("live_start", kpi)
+    tiles = [("🚓 Total Police Stops", "total_stops"), ("🚨 Total Arrests", "arrests"),
+             ("⚠️ Total Warnings", "warnings"), ("💊 Drug Related Stops", "drug_stops")]
+    for col, (label, name) in zip(st.columns(4), tiles):
+        col.metric(label, kpi[name], delta=kpi[name] - start[name] or None)
+    st.caption(f"🔴 Live, all dates: checked at {time.strftime('%H:%M:%S', time.localtime(feed.polled_at))}, "
+               f"refreshing every {every}s")
+    return feed
+
+# Live tiles plus the latest stops and the stops per violation, from the same feed
+def show_live_feed(every):
+    feed = show_live_kpis(every)
+    if feed is None:
+        return
+    left, right = st.columns([3, 2])
+    with left:
+        st.caption("Latest stops")
+        recent = pd.DataFrame(feed.recent(20), columns=livefeed.FEED_COLUMNS)
+        recent['stop_time'] = recent['stop_time'].apply(lambda x: str(x).split()[-1] if pd.notnull(x) else '')
+        st.dataframe(recent, use_container_width=True, hide_index=True)
+    with right:
+        st.caption("Stops by violation")
+        violations = pd.DataFrame(list(feed.violations().items()), columns=['violation', 'counts'])
+        if violations.empty:
+            return
+        px = startup.plotly()
+        fig, _ = charts.category_figure(lambda d: px.bar(d, x='violation', y='counts'),
+                                        violations, 'violation', 'counts')
+        st.plotly_chart(fig, use_container_width=True)
 
-print("All packages loaded successfully!")
 
 # # Streamlit UI
+# # Page config has to be the first Streamlit call
+
+st.set_page_config(page_title="🚓 SecureCheck: Police Post Logs", layout="wide")
+
 # # snow animation
 st.snow()
 
 # # Streamlit App Title
 
-st.set_page_config(page_title="🚓 SecureCheck: Police Post Logs", layout="wide")
 st.title("🚓 SecureCheck: Police Post Log Ledger")
 
 # Sidebar Menu
 
 menu = st.sidebar.selectbox("Go to", ["Home","Data Analytics & Visuals","View Logs","Predict Logs"])
+render_started = instrument.start_page(menu)
+instrument.start_metrics_server()
+
+# Date range for every query below, so MySQL only reads those months' partitions
+# (see partitions.py); the full range means no filter, and the rollups can answer
+date_range = None
+try:
+    first_day, last_day = partitions.date_bounds()
+except analytics.QUERY_ERRORS:
+    first_day = last_day = None
+if first_day is not None:
+    picked = st.sidebar.date_input("📅 Date range", value=(first_day, last_day),
+                                   min_value=first_day, max_value=last_day)
+    if len(picked) == 2 and tuple(picked) != (first_day, last_day):
+        date_range = tuple(picked)
+
+# Live mode for Home and the KPI tiles: they follow new stops on a timer, reading only
+# the rows logged since the last poll (see livefeed.py). Its counters cover all dates.
+live = False
+live_every = livefeed.INTERVAL
+if menu in ("Home", "Data Analytics & Visuals"):
+    live = st.sidebar.toggle("🔴 Live", disabled=date_range is not None,
+                             help="Follow new stops as they are logged (needs the full date range)")
+    # A disabled toggle keeps the value it had
+    live = live and date_range is None
+    if live:
+        live_every = st.sidebar.number_input("Refresh every (seconds)", min_value=1, max_value=300,
+                                             value=livefeed.INTERVAL)
+if not live:
+    st.session_state.pop("live_start", None)
+
+# Pool and cache counters, to check that reruns stop paying connection setup cost
+with st.sidebar.expander("⚙️ Database Stats"):
+    st.json(db.stats())
+    # Size of the shared in-memory logs snapshot (snapshot.py)
+    if st.button("Measure snapshot memory"):
+        report = snapshot.snapshot.memory_report()
+        st.write(f"{report['rows']} rows: {report['bytes'] / 2**20:.1f} MiB "
+                 f"(~{report['object_dtype_bytes'] / 2**20:.1f} MiB as object columns)")
+
+# Query and page timings (instrument.py); hidden unless the URL has ?debug=1
+if instrument.DEBUG or st.query_params.get("debug") == "1":
+    with st.sidebar.expander("🩺 Diagnostics"):
+        st.caption("Page renders")
+        st.dataframe(pd.DataFrame(instrument.page_summary()))
+        st.caption("Queries, slowest p95 first")
+        queries = pd.DataFrame(instrument.query_summary())
+        if not queries.empty:
+            queries = queries.sort_values("p95_ms", ascending=False)
+        st.dataframe(queries)
+        st.caption(f"Slow queries (≥ {instrument.SLOW_QUERY_MS:.0f} ms, logged to {instrument.SLOW_QUERY_LOG})")
+        st.dataframe(pd.DataFrame(instrument.slow_queries()))
+        st.download_button("Prometheus metrics", instrument.prometheus_text(), file_name="securecheck.prom")
+        st.caption(f"Startup (first render budget {startup.STARTUP_BUDGET_MS:.0f} ms)")
+        st.dataframe(pd.DataFrame(startup.report()["phases"]))
+        if st.button("Reset timings"):
+            instrument.reset()
 
 # Home Page
 
@@ -64,12 +207,15 @@ if menu == "Home":
     """)
     st.success("Let's make policing smarter and safer! 🚓")
 
+    if live:
+        st.header("🔴 Live Feed")
+        # Only this part reruns on the timer
+        st.fragment(show_live_feed, run_every=live_every)(live_every)
+
    
 
     st.header("📋Police Logs Overview")
-    query="select * from securecheck.logs"
-    data=fetch_data(query)
-    st.dataframe(data,use_container_width=True)
+    show_paged_logs("home", *partitions.date_filter(date_range))
     st.markdown("---")  
     st.subheader("📝 Description")
     st.markdown("""
@@ -84,95 +230,110 @@ if menu == "Home":
 
 elif menu=='Data Analytics & Visuals':
 
-    # Quick Metrics
-
-    query="select * from securecheck.logs"
-    data=fetch_data(query)
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        total_stops=data.shape[0]
-        st.metric("🚓 Total Police Stops", total_stops)
+    px = startup.plotly()
 
-    with col2:
-            
-        arrests = data[data["stop_outcome"].str.contains("arrest", case=False, na=False)].shape[0]
-        st.metric("🚨 Total Arrests", arrests)
-
-    with col3:
-        warnings = data[data["stop_outcome"].str.contains("Warning", case=False, na=False)].shape[0]
-        st.metric("⚠️ Total Warnings", warnings)
+    # Quick Metrics
 
-    with col4:
-        drug_stop = data[data["drugs_related_stop"] == 1].shape[0]
-        st.metric("💊 Drug Related Stops", drug_stop)
+    # Lay out the tiles and tabs first; each is filled in as soon as its query returns.
+    # Live tiles rerun on their own timer instead
+    if live:
+        st.fragment(show_live_kpis, run_every=live_every)(live_every)
+    else:
+        col1, col2, col3, col4 = st.columns(4)
 
  # Data Visulaization 
 
     st.header("📊 Visual Insights")      
     tab= st.tabs(['Stops By Violations', 'Driver Gender Distribution', 'Drug-Related Stops by Country'])
-    
-    with tab[0]:
-    # SQL Query to fetch violation count
-
-        query = "SELECT violation, COUNT(violation) AS counts FROM securecheck.logs GROUP BY violation"
-        data = fetch_data(query)
-
-        st.subheader("Violation Breakdown (Pie Chart)")
-        st.dataframe(data)
-
-    # Plot pie chart using Plotly
-        fig = px.pie(data, names='violation', values='counts',
-                    color_discrete_sequence=px.colors.sequential.RdPu,
-                    title='Violation Distribution')
-        st.plotly_chart(fig, use_container_width=True)
-
-    
-
-    with tab[1]:
-         
-    # SQL Query to fetch Gender of Driver and its counts
-         
-         st.subheader("Driver Gender Distribution (Donut chart)")
-         query="select driver_gender, count(*) as count from securecheck.logs group by driver_gender"
-         data=fetch_data(query)
-         st.dataframe(data)
 
-
-         # Donut chart using Plotly
-         fig = px.pie(
-            data,
-            names='driver_gender',
-            values='count',
-            hole=0.5,  # This creates the "donut" hole
-            title="Gender Breakdown of Drivers"
-         )
-
-         st.plotly_chart(fig, use_container_width=True)
-
-    
-    with tab[2]:
+    # The four queries run at the same time (see parallel.py)
+    backend = analytics.get_backend()
+    page_queries = {
+        # One aggregate query instead of loading every row (see metrics.py)
+        "kpis": lambda: metrics.kpis(date_range),
+        # SQL Query to fetch violation count
+        "violations": lambda: backend.fetch(partitions.restrict(metrics.CHART_SQL["violations"], date_range)),
+        # SQL Query to fetch Gender of Driver and its counts
+        "genders": lambda: backend.fetch(partitions.restrict(metrics.CHART_SQL["genders"], date_range)),
         # SQL Query to fetch Drug-Related Stops by Country
-
-         st.subheader("Drug-Related Stops by Country(Stacked Bar Chart)")
-         query = "SELECT country_name, drugs_related_stop, count(*) as count from securecheck.logs group by country_name, drugs_related_stop"
-         data = fetch_data(query)
-         st.dataframe(data)
+        "drugs": lambda: backend.fetch(partitions.restrict(metrics.CHART_SQL["drugs"], date_range)),
+    }
+    slots = {"violations": tab[0], "genders": tab[1], "drugs": tab[2]}
+    if live:
+        del page_queries["kpis"]
+    else:
+        slots["kpis"] = col1
+
+    for name, data, error in parallel.run(page_queries):
+        if error is not None:
+            with slots[name]:
+                st.error(f"Connection Error: {error}")
+            continue
+
+        if name == "kpis":
+            kpi = data
+            with col1:
+                st.metric("🚓 Total Police Stops", kpi["total_stops"])
+
+            with col2:
+                st.metric("🚨 Total Arrests", kpi["arrests"])
+
+            with col3:
+                st.metric("⚠️ Total Warnings", kpi["warnings"])
+
+            with col4:
+                st.metric("💊 Drug Related Stops", kpi["drug_stops"])
+
+        elif name == "violations":
+            with tab[0]:
+                st.subheader("Violation Breakdown (Pie Chart)")
+                st.dataframe(data)
+
+            # Plot pie chart using Plotly; long tails folded into one slice (see charts.py)
+                fig, _ = charts.category_figure(
+                    lambda d: px.pie(d, names='violation', values='counts',
+                                     color_discrete_sequence=px.colors.sequential.RdPu,
+                                     title='Violation Distribution'),
+                    data, 'violation', 'counts')
+                st.plotly_chart(fig, use_container_width=True)
+
+        elif name == "genders":
+            with tab[1]:
+                 st.subheader("Driver Gender Distribution (Donut chart)")
+                 st.dataframe(data)
+
+
+                 # Donut chart using Plotly
+                 fig, _ = charts.category_figure(lambda d: px.pie(
+                    d,
+                    names='driver_gender',
+                    values='count',
+                    hole=0.5,  # This creates the "donut" hole
+                    title="Gender Breakdown of Drivers"
+                 ), data, 'driver_gender', 'count')
+
+                 st.plotly_chart(fig, use_container_width=True)
+
+        elif name == "drugs":
+            with tab[2]:
+                 st.subheader("Drug-Related Stops by Country(Stacked Bar Chart)")
+                 st.dataframe(data)
      
-         # Stacked Bar chart using Plotly
-         fig = px.bar(
-             data,
-             x='country_name',
-             y='count',
-             color='drugs_related_stop',
-             barmode='stack',
-             labels={
-                 'count': 'Number of Stops',
-                 'country_name': 'Country',
-                 'drugs_related_stop': 'Drugs Related'
-             },
-             title="Stacked: Drug-Related Stops by Country"
-         )
-         st.plotly_chart(fig, use_container_width=True)
+                 # Stacked Bar chart using Plotly
+                 fig, _ = charts.category_figure(lambda d: px.bar(
+                     d,
+                     x='country_name',
+                     y='count',
+                     color='drugs_related_stop',
+                     barmode='stack',
+                     labels={
+                         'count': 'Number of Stops',
+                         'country_name': 'Country',
+                         'drugs_related_stop': 'Drugs Related'
+                     },
+                     title="Stacked: Drug-Related Stops by Country"
+                 ), data, 'country_name', 'count', by='drugs_related_stop')
+                 st.plotly_chart(fig, use_container_width=True)
 
 # View Logs
 
@@ -185,34 +346,66 @@ elif menu=='View Logs':
     st.write("Use the filters below to narrow down logs:")
 
     vehicle_input = st.text_input("🔍 Search by Vehicle Number")
-    violation_input = st.text_input("🔍 Search by Violation")
-    country_input = st.text_input("🌍 Search by Country")
-
-    # Base query
-    query = "SELECT * FROM securecheck.logs WHERE 1=1"
-
-    # Dynamically add filters
-    if vehicle_input:
-        query += f" AND vehicle_number LIKE '%{vehicle_input}%'"
-
-    if violation_input:
-        query += f" AND violation LIKE '%{violation_input}%'"
-
-    if country_input:
-        query += f" AND country_name LIKE '%{country_input}%'"
-
-    # # Fetch & show
-    df = fetch_data(query)
-
-    if not df.empty:
-        if 'stop_time' in df.columns:
-            df['stop_time'] = df['stop_time'].apply(lambda x: str(x).split()[-1] if pd.notnull(x) else '')
-
-        
-        st.success(f"✅ Showing {len(df)} matching logs")
-        st.dataframe(df)
-    else:
-        st.warning("⚠️ No matching logs found.")
+    vehicle_mode = st.radio("Vehicle number match", search.VEHICLE_MODES, horizontal=True,
+                            format_func=lambda m: {"prefix": "Starts with", "contains": "Contains", "exact": "Exact"}[m])
+    violation_input = st.text_input("🔍 Search by Violation (starts with)")
+    country_input = st.text_input("🌍 Search by Country (starts with)")
+
+    # Bound, index-friendly filters (see search.py)
+    conditions, params = search.build_filters(vehicle_input, violation_input, country_input, vehicle_mode)
+    dates, date_params = partitions.date_filter(date_range)
+
+    # # Fetch & show one page at a time
+    show_paged_logs("view_logs", conditions + dates, params + date_params, show_count=True)
+
+    # Every matching row (shown columns), streamed to a file in the background (see export.py)
+    with st.expander("⬇️ Export matching logs"):
+        export_format = st.radio("Format", export.FORMATS, horizontal=True, format_func=str.upper)
+        to_server = st.radio("Deliver as", ["Download", "File on the server"], horizontal=True) != "Download"
+        # Only a file name: server exports always go to a new file under EXPORT_DIR
+        export_name = st.text_input("File name (optional)", placeholder="logs-export") if to_server else None
+        st.caption(f"Downloads are limited to {export.DOWNLOAD_MAX_ROWS:,} rows; save bigger exports on the server.")
+        if st.button("Export"):
+            try:
+                total = paging.count_rows(conditions + dates, params + date_params)
+            except (pymysql.MySQLError, db.PoolTimeout) as e:
+                st.error(f"Connection Error: {e}")
+                total = None
+            export_path = None
+            if total is not None and not to_server and total > export.DOWNLOAD_MAX_ROWS:
+                st.warning(f"⚠️ {total:,} rows is too many to download; save them as a file on the server instead.")
+            elif total is not None:
+                try:
+                    export_path = (export.server_path(export_format, export_name) if to_server
+                                   else export.download_path(export_format))
+                except (ValueError, OSError) as e:
+                    st.error(f"⚠️ {e}")
+            if export_path is not None:
+                previous = st.session_state.get("export_job")
+                if previous is not None and previous.download and previous.state != "running" and os.path.exists(previous.path):
+                    os.remove(previous.path)
+                st.session_state["export_job"] = export.start(
+                    export_path, export_format,
+                    st.session_state.get("view_logs_columns", paging.DEFAULT_COLUMNS),
+                    conditions + dates, params + date_params, total=total, download=not to_server)
+
+        export_job = st.session_state.get("export_job")
+        if export_job is not None and export_job.state == "running":
+            status = st.empty()
+            while not export_job.wait(0.5):
+                fraction = min(export_job.rows / export_job.total, 1.0) if export_job.total else 0.0
+                status.progress(fraction, text=f"⏳ {export_job.rows:,} rows written… {export_job.seconds:.0f}s")
+            status.empty()
+        if export_job is not None and export_job.state == "failed":
+            st.error(f"Export failed: {export_job.error}")
+        elif export_job is not None:
+            st.success(f"✅ {export_job.rows:,} rows exported in {export_job.seconds:.1f}s")
+            if export_job.download:
+                with open(export_job.path, "rb") as f:
+                    st.download_button(f"Download {export_job.format.upper()}", f,
+                                       file_name=f"securecheck-logs.{export_job.format}")
+            else:
+                st.write(f"Saved to `{os.path.abspath(export_job.path)}`")
     
     st.markdown("---")  
 
@@ -242,220 +435,69 @@ elif menu=='View Logs':
         ]
     )
 
-    query_map = {
-        "Top 10 vehicle_Number involved in Drug-Related Stops": """SELECT vehicle_number, COUNT(*) as COUNT
-                                                                  FROM securecheck.logs WHERE drugs_related_stop = 'TRUE'
-                                                                  GROUP BY vehicle_number
-                                                                  ORDER BY COUNT DESC
-                                                                  LIMIT 10""",
-
-        "Most Frequently Searched Vehicles": """SELECT vehicle_number, COUNT(*) AS search_count
-                                               FROM securecheck.logs
-                                               GROUP BY vehicle_number
-                                               ORDER BY vehicle_number DESC LIMIT 10""",
-        
-        "Driver Age Group with Highest Arrest Rate" : """SELECT CASE
-                                                        when driver_age between 18 and 25 then '18-25'
-                                                        when driver_age between 26 and 35 then '26-35'
-                                                        when driver_age between 36 and 45 then '36-45'
-                                                        when driver_age between 45 and 60 then '45-60'
-                                                        else '60+'
-                                                        end AS age_group,COUNT(*) AS total_driver,
-                                                        sum(case when is_arrested=1 then 1 else 0 end) AS total_arrests,
-                                                        round(sum(case when is_arrested=1 then 1 else 0 end)*100.0/count(*),2) AS arrest_rate_percent 
-                                                        from securecheck.logs GROUP BY age_group
-                                                        ORDER BY arrest_rate_percent desc limit 1
-                                                        """,
-                                            
-        "Gender Distribution of Drivers Stopped in each Country" :"""SELECT country_name, driver_gender, COUNT(*) AS total_gender,
-                                                                    ROUND(100.0 * COUNT(*) / SUM(COUNT(*)) OVER (PARTITION BY country_name), 2) AS gender_percent
-                                                                    FROM securecheck.logs
-                                                                    GROUP BY country_name, driver_gender
-                                                                    ORDER BY country_name, driver_gender""",
-
-        "Race & Gender Combination with Highest Search Rate" :"""SELECT driver_race, driver_gender, COUNT(*) AS total_stops,
-                                                                 SUM(CASE WHEN search_conducted  = 1 THEN 1 ELSE 0 END) AS total_searches,
-                                                                 ROUND(SUM(CASE WHEN search_conducted  = 1 THEN 1 ELSE 0 END) * 100.0 / COUNT(*), 2) AS search_percent_rate
-                                                                 FROM securecheck.logs
-                                                                 WHERE driver_race IS NOT NULL AND driver_gender IS NOT NULL
-                                                                 GROUP BY driver_race, driver_gender
-                                                                 ORDER BY search_percent_rate DESC LIMIT 1""",
-
-       "Time of Day with Most Traffic Stops" :"""SELECT HOUR(stop_time) AS stop_hour, COUNT(*) AS total_stops
-                                                FROM securecheck.logs
-                                                WHERE stop_time IS NOT NULL
-                                                GROUP BY stop_hour 
-                                                ORDER BY total_stops DESC LIMIT 1""",
-
-       "Average Stop Duration for different Violations" : """SELECT violation,
-                                                            AVG(stop_duration) AS average_stop_duration
-                                                            FROM securecheck.logs
-                                                            WHERE stop_duration IS NOT NULL 
-                                                            GROUP BY violation ORDER BY Average_stop_duration DESC""",
-
-        "Night Stops More Likely to Lead to Arrests" : """SELECT 
-                                                         CASE
-                                                         WHEN HOUR(stop_time) BETWEEN 20 AND 23 OR HOUR(stop_time) BETWEEN 0 AND 5 THEN 'Night'
-                                                         ELSE 'Day'
-                                                         END AS time_of_day,
-                                                         COUNT(*) AS total_stops,
-                                                         SUM(CASE WHEN is_arrested = 1 THEN 1 ELSE 0 END) AS total_arrests,
-                                                         ROUND(SUM(CASE WHEN is_arrested = 1 THEN 1 ELSE 0 END) * 100.0 / COUNT(*), 2) AS arrest_rate_percent
-                                                         FROM securecheck.logs
-                                                         WHERE stop_time IS NOT NULL
-                                                         GROUP BY time_of_day
-                                                         ORDER BY arrest_rate_percent DESC""",
-
-        "Violations Most Associated with Searches or Arrests" :"""SELECT violation,
-                                                                 COUNT(*) AS total_stops,
-                                                                 SUM(CASE WHEN is_arrested = 1 THEN 1 ELSE 0 END) AS total_arrests, 
-                                                                 SUM(CASE WHEN search_conducted = TRUE THEN 1 ELSE 0 END) AS total_searches, 
-                                                                 SUM(CASE WHEN is_arrested = 1 OR search_conducted = TRUE THEN 1 ELSE 0 END) AS search_or_arrest_total
-                                                                 FROM securecheck.logs
-                                                                 GROUP BY violation
-                                                                 ORDER BY search_or_arrest_total DESC LIMIT 10""",
-      
-        "Most Common Violations for Young Drivers Under 25" :"""SELECT violation,
-                                                               COUNT(*) AS total_stops
-                                                               FROM securecheck.logs
-                                                               WHERE driver_age < 25
-                                                               GROUP BY violation
-                                                               ORDER BY total_stops DESC LIMIT 10""",
-
-        "Violation Rarely Resulting in Search or Arrest" :"""SELECT violation,
-                                                            COUNT(*) AS total_stops,
-                                                            SUM(CASE WHEN is_arrested = 1 THEN 1 ELSE 0 END) AS total_arrests
-                                                            FROM securecheck.logs
-                                                            GROUP BY violation
-                                                            ORDER BY total_arrests ASC LIMIT 1""",
-                                                               
-        "Countries Report with Highest Drug-Related Stop Rates" :"""SELECT country_name,
-                                                                   COUNT(*) AS total_stops,
-                                                                   SUM(CASE WHEN drugs_related_stop = 1 THEN 1 ELSE 0 END) AS drug_related_stops,
-                                                                   ROUND(SUM(CASE WHEN drugs_related_stop = 1 THEN 1 ELSE 0 END) * 100.0 / COUNT(*), 2) AS drug_stop_rate_percent
-                                                                   FROM securecheck.logs
-                                                                   GROUP BY country_name
-                                                                   ORDER BY drug_stop_rate_percent DESC""",
-
-       "Arrest Rate by Country & Violation" :"""SELECT country_name,
-                                               COUNT(*) AS total_stops,
-                                               violation,
-                                               SUM(CASE WHEN is_arrested = 1 THEN 1 ELSE 0 END) AS total_arrests,
-                                               ROUND(100.0 * SUM(CASE WHEN is_arrested = 1 THEN 1 ELSE 0 END) / COUNT(*), 2) AS total_arrest_percent
-                                               FROM securecheck.logs
-                                               GROUP BY country_name, violation
-                                               ORDER BY country_name""",
- 
-        "Country has the Most Stops with Search Conducted" :"""select country_name, count(*) as total_stops
-                                                              from securecheck.logs
-                                                              group by country_name
-                                                              order by total_stops
-                                                              desc limit 1""",
-
-        "Yearly Breakdown of Stops and Arrests by Country" :"""SELECT country_name,
-                                                              EXTRACT(YEAR FROM stop_date) AS year,
-                                                              total_stops, total_arrests, 
-                                                              ROUND(100.0 * total_arrests / total_stops, 2) AS arrest_rate_percent,
-                                                              RANK() OVER (PARTITION BY year ORDER BY total_arrests DESC) AS arrest_rank_in_year
-
-                                                              FROM (SELECT country_name, stop_date, 
-                                                              COUNT(*) AS total_stops,
-                                                              SUM(CASE WHEN is_arrested = 1 THEN 1 ELSE 0 END) AS total_arrests
-                                                              FROM securecheck.logs
-                                                              WHERE stop_date IS NOT NULL
-                                                              GROUP BY country_name, EXTRACT(YEAR FROM stop_date)) AS yearly_stats""" , 
-
-        "Driver Violation Trends by Age & Race" :"""WITH age_groups AS (SELECT id,
-                                                   CASE
-                                                   WHEN driver_age BETWEEN 18 AND 25 THEN '18-25'
-                                                   WHEN driver_age BETWEEN 26 AND 35 THEN '26-35'
-                                                   WHEN driver_age BETWEEN 36 AND 50 THEN '36-50'
-                                                   ELSE '51+'
-                                                   END AS age_group,
-                                                   driver_race
-                                                   FROM securecheck.logs
-                                                   WHERE driver_age IS NOT NULL AND driver_race IS NOT NULL)
-
-                                                   SELECT 
-                                                   ag.age_group, ag.driver_race, l.violation, COUNT(*) AS total_violations
-                                                   FROM securecheck.logs l
-                                                   JOIN age_groups ag ON l.id = ag.id
-                                                   WHERE l.violation IS NOT NULL
-                                                   GROUP BY ag.age_group, ag.driver_race, l.violation
-                                                   ORDER BY ag.age_group, ag.driver_race, total_violations DESC""",
-
-        "Time Period Analysis of Stops, Number of Stops by Year, Month, Hour of the Day" :"""SELECT
-                                                                                            EXTRACT(YEAR FROM stop_date) AS year,
-                                                                                            EXTRACT(MONTH FROM stop_date) AS month, 
-                                                                                            EXTRACT(HOUR FROM stop_time) AS hour,
-                                                                                            COUNT(*) AS total_stops 
-                                                                                            FROM securecheck.logs
-                                                                                            WHERE stop_date IS NOT NULL AND stop_time IS NOT NULL
-                                                                                            GROUP BY year, month, hour
-                                                                                            ORDER BY year, month, hour""",  
-
-       "Violations with High Search & Arrest Rates" :"""SELECT violation,
-                                                       COUNT(*) AS total_stops,
-                                                       SUM(CASE WHEN search_conducted = 1 THEN 1 ELSE 0 END) AS total_searches,
-                                                       SUM(CASE WHEN is_arrested = 1 THEN 1 ELSE 0 END) AS total_arrests,
-                                                       ROUND(100.0 * SUM(CASE WHEN search_conducted = 1 THEN 1 ELSE 0 END) / COUNT(*), 2) AS search_rate_percent,
-                                                       ROUND(100.0 * SUM(CASE WHEN is_arrested = 1 THEN 1 ELSE 0 END) / COUNT(*), 2) AS arrest_percent_rate,
-                                                       RANK() OVER (ORDER BY SUM(CASE WHEN search_conducted = 1 THEN 1 ELSE 0 END) * 1.0 / COUNT(*) DESC) AS search_rank,
-                                                       RANK() OVER (ORDER BY SUM(CASE WHEN is_arrested = 1 THEN 1 ELSE 0 END) * 1.0 / COUNT(*) DESC) AS arrest_rank
-                                                       FROM securecheck.logs
-                                                       WHERE violation IS NOT NULL
-                                                       GROUP BY violation
-                                                       ORDER BY search_rate_percent DESC, arrest_percent_rate DESC""",
-
-        "Driver Demographics by Country (Age, Gender and Race)" :"""SELECT country_name, driver_gender, driver_race,
-                                                                   CASE 
-                                                                   WHEN driver_age < 20 THEN '<20'
-                                                                   WHEN driver_age BETWEEN 20 AND 29 THEN '20-29'
-                                                                   WHEN driver_age BETWEEN 30 AND 39 THEN '30-39'
-                                                                   WHEN driver_age BETWEEN 40 AND 49 THEN '40-49'
-                                                                   WHEN driver_age BETWEEN 50 AND 59 THEN '50-59'
-                                                                   ELSE '60+'
-                                                                   END AS age_group,
-                                                                   COUNT(*) AS total_drivers
-                                                                   FROM securecheck.logs
-                                                                   WHERE driver_age IS NOT NULL 
-                                                                   AND driver_gender IS NOT NULL 
-                                                                   AND driver_race IS NOT NULL
-                                                                   GROUP BY country_name, driver_gender, driver_race, age_group
-                                                                   ORDER BY country_name, driver_gender, driver_race, age_group""",      
-
-        "Top 5 Violations with Highest Arrest Rates" :"""SELECT violation,
-                                                        COUNT(*) AS total_stops,
-                                                        SUM(CASE WHEN is_arrested = 1 THEN 1 ELSE 0 END) AS total_arrests,
-                                                        ROUND(100.0 * SUM(CASE WHEN is_arrested = 1 THEN 1 ELSE 0 END) / NULLIF(COUNT(*), 0), 2) AS arrest_rate_percent
-                                                        FROM securecheck.logs
-                                                        WHERE is_arrested IS NOT NULL AND violation IS NOT NULL
-                                                        GROUP BY violation
-                                                        
-                                                        ORDER BY arrest_rate_percent DESC LIMIT 5"""
-
-    }
-    
-    result = pd.DataFrame()
-    
+    # Analyses run in the background and are kept until new stops are logged (see jobs.py)
+    runner = jobs.runner
     if st.button("Run Analysis"):
-        query = query_map.get(analysis_option)
-    if query:
-        result = fetch_data(query)
+        runner.request(analysis_option, date_range)
+    job = runner.get(analysis_option, date_range)
+
+    if job is not None and job.state == "running":
+        status = st.empty()
+        while not job.wait(0.5):
+            fraction = runner.progress(job)
+            if fraction is None:
+                status.info(f"⏳ Running… {job.seconds:.0f}s")
+            else:
+                status.progress(fraction, text=f"⏳ Running… {job.seconds:.0f}s")
+        status.empty()
 
      # Display result
-    if not result.empty:
-        st.write(result)
+    if job is None:
+        st.info("Choose an analysis and click \"Run Analysis\".")
+    elif job.state == "failed":
+        st.error(f"Connection Error: {job.error}")
     else:
-        st.warning("No Results Found")
+        result = job.result
+        if not result.empty:
+            st.write(result)
+        else:
+            st.warning("No Results Found")
+
+        # Stops over time, bucketed to fit the chosen years (see charts.py)
+        if analysis_option.startswith("Time Period Analysis") and not result.empty:
+            px = startup.plotly()
+            periods = charts.time_period_frame(result)
+            years = sorted(periods["period"].dt.year.unique())
+            first, last = st.select_slider("Years", years, value=(years[0], years[-1])) if len(years) > 1 else (years[0], years[0])
+            fig, _ = charts.time_figure(
+                lambda d: px.line(d, x='period', y='total_stops', markers=True,
+                                  title=f"Stops per {d.attrs['resolution']}"),
+                periods, 'period', ['total_stops'], f"{first}-01-01", f"{last}-12-31", finest="month")
+            st.plotly_chart(fig, use_container_width=True)
+            by_hour = periods[periods["period"].dt.year.between(first, last)].groupby("hour", as_index=False)["total_stops"].sum()
+            st.plotly_chart(px.bar(by_hour, x='hour', y='total_stops', title="Stops by Hour of the Day"),
+                            use_container_width=True)
+        note = "" if runner.is_fresh(job) else " New stops have been logged since; click \"Run Analysis\" to update."
+        st.caption(f"Computed at {time.strftime('%H:%M:%S', time.localtime(job.finished))} "
+                   f"in {job.seconds:.1f}s.{note}")
+
+    # Finished analyses open instantly when picked from the list above
+    ready = runner.completed(date_range)
+    if ready:
+        st.caption("Ready: " + " · ".join(ready))
 
     st.markdown("---") 
     # Predict Logs
 
 elif menu=="Predict Logs":
                
-            query="select * from securecheck.logs"
-            data=fetch_data(query)
+            # Shared in-memory lookup index; only stops logged since the last visit are read
+            try:
+                model=predictor.get_predictor()
+            except (pymysql.MySQLError, db.PoolTimeout) as e:
+                st.error(f"Connection Error: {e}")
+                model=predictor.predictor
+            stop_model=trained_model.load_model()
             st.markdown("---")
             st.markdown("Designed by SecureCheck to empower law enforcement efforts.")
             st.header("🔍 Custom Natural Language Filter")
@@ -475,31 +517,31 @@ elif menu=="Predict Logs":
                 driver_age=st.number_input("👨‍✈️ Driver Age", min_value=16, max_value=100, value=20)
                 driver_race=st.selectbox("👤 Driver Race", ["Asian", "Black", "White", "Hispanic", "Other"])
                 search_type=st.selectbox("📝 Search Type", ["Vehicle Search", "Frisk", "None"])
-                stop_duration=st.selectbox("⏱️ Stop Duration",data["stop_duration"].dropna().unique())
+                stop_duration=st.selectbox("⏱️ Stop Duration",sorted(model.durations))
                 driver_gender=st.radio("🚻 Driver Gender",["Male","Female"])
                 st.write(driver_gender)
                 drugs_related_stop=st.radio("💊 Drug Related?",["0","1"])
                 st.write(drugs_related_stop)
                 search_conducted=st.radio("🔎 Search Conducted?", ["0","1"])
                 st.write(drugs_related_stop)
+                save_stop=st.checkbox("💾 Save this stop to the logs", value=True)
                 submitted=st.form_submit_button("✅ Predict Stop Outcome & Violation")
 
                 
             if submitted:
-                filtered_data=data[
-                    (data["driver_gender"]== driver_gender)&
-                    (data["driver_age"]== driver_age)&
-                    (data["search_conducted"]==int(search_conducted))&
-                    (data["stop_duration"]==stop_duration)&
-                    (data["drugs_related_stop"]==drugs_related_stop)
-                ]
+                predicted_outcome, predicted_violation, matched_on, support = model.predict(
+                    driver_gender, driver_age, search_conducted, stop_duration, drugs_related_stop)
+                # A trained model (python model.py train) takes precedence over the lookup index
+                if stop_model is not None:
+                    predicted_outcome, predicted_violation = stop_model.predict_one(
+                        driver_gender=driver_gender, driver_age=driver_age, driver_race=driver_race,
+                        country_name=country_name, search_conducted=search_conducted, search_type=search_type,
+                        stop_duration=stop_duration, drugs_related_stop=drugs_related_stop)
+                    matched_on = f"trained model, {stop_model.rows} training stops"
          # Predict Stop_Outcome
 
-                if not filtered_data.empty:
-                    predicted_outcome=filtered_data["stop_outcome"].mode()[0]
-                    predicted_violation=filtered_data["violation"].mode()[0]
-                else:
-                    predicted_outcome="Warning"  # Default
+                if predicted_outcome is None:
+                    predicted_outcome="Warning"  # Default, only while no stops are logged
                     predicted_violation="Speeding" # Default
 
          # Natural Language Summary
@@ -519,6 +561,33 @@ elif menu=="Predict Logs":
                             📝 A **{driver_age}**-year-old **{driver_gender}** driver in **{country_name}** was stopped for **{predicted_violation}** at {stop_time.strftime('%I:%M %p')} on {stop_date}.
                             **{search_text}**, received a **{predicted_outcome}** and **{drug_text}**.
                             """ )        
+                if stop_model is not None:
+                    st.caption(f"Predicted by the {matched_on}.")
+                elif support:
+                    st.caption(f"Based on {support} past stops ({matched_on}).")
+
+         # Log the stop: queued and written in batches by writer.py
+
+                if save_stop:
+                    new_stop={"vehicle_number": vehicle_number, "stop_date": stop_date, "stop_time": stop_time,
+                              "country_name": country_name, "driver_gender": driver_gender, "driver_age": driver_age,
+                              "driver_race": driver_race, "search_conducted": search_conducted,
+                              # Stored as 'none', like the notebook's fillna
+                              "search_type": search_type.lower() if search_type == "None" else search_type,
+                              "stop_duration": stop_duration, "drugs_related_stop": drugs_related_stop}
+                    try:
+                        writer.get_writer().submit(new_stop).result(timeout=5)
+                        st.success("✅ Stop logged.")
+                    except writer.QueueFull:
+                        st.warning("⚠️ Too many stops are being logged right now, please submit again in a moment.")
+                    except TimeoutError:
+                        st.info("Stop queued; it will appear in the logs shortly.")
+                    except (pymysql.MySQLError, db.PoolTimeout) as e:
+                        st.error(f"Connection Error: {e}")
                 st.markdown("---")  
 
-    
\ No newline at end of file
+    
+# Render time of the page that just ran (instrument.py)
+instrument.end_page(menu, render_started)
+# Time to first render for this process, reported once (startup.py)
+startup.first_render(time.perf_counter() - run_started)
\ No newline at end of file
@@ -0,0 +1,64 @@
+import pymysql
+
+import db
+import partitions
+import rollups
+from schema import LOGS_TABLE
+
+# The four quick-metrics tiles on "Data Analytics & Visuals".
+# They used to load every row and count them in pandas; now a single aggregate query
+# does the counting, preferably over rollup_outcome (one row per distinct stop_outcome)
+# and otherwise over the logs table in one pass.
+
+# "arrest" / "warning" matching follows the old str.contains(..., case=False): the
+# default MySQL collation is case-insensitive, so LIKE behaves the same.
+KPI_SQL = """SELECT COUNT(*) AS total_stops,
+             SUM(CASE WHEN stop_outcome LIKE '%%arrest%%' THEN 1 ELSE 0 END) AS arrests,
+             SUM(CASE WHEN stop_outcome LIKE '%%warning%%' THEN 1 ELSE 0 END) AS warnings,
+             SUM(CASE WHEN drugs_related_stop = 1 THEN 1 ELSE 0 END) AS drug_stops
+             FROM {table}"""
+
+KPI_ROLLUP_SQL = """SELECT SUM(stops) AS total_stops,
+                    SUM(CASE WHEN stop_outcome LIKE '%%arrest%%' THEN stops ELSE 0 END) AS arrests,
+                    SUM(CASE WHEN stop_outcome LIKE '%%warning%%' THEN stops ELSE 0 END) AS warnings,
+                    SUM(drug_stops) AS drug_stops
+                    FROM SECURECHECK.rollup_outcome"""
+
+KPI_NAMES = ["total_stops", "arrests", "warnings", "drug_stops"]
+
+# The three chart queries on the same page, by tab; startup.py runs the same text to
+# warm the query cache
+CHART_SQL = {
+    # violation counts
+    "violations": "SELECT violation, COUNT(violation) AS counts FROM securecheck.logs GROUP BY violation",
+    # gender of driver and its counts
+    "genders": "select driver_gender, count(*) as count from securecheck.logs group by driver_gender",
+    # drug-related stops by country
+    "drugs": "SELECT country_name, drugs_related_stop, count(*) as count from securecheck.logs "
+             "group by country_name, drugs_related_stop",
+}
+
+
+def _as_counts(df):
+    if df.empty:
+        return dict.fromkeys(KPI_NAMES, 0)
+    row = df.iloc[0]
+    return {name: int(row[name] or 0) for name in KPI_NAMES}
+
+
+# One pass over the logs table, no rows returned
+def scan_kpis(table=LOGS_TABLE):
+    # %% because the query goes through the driver's parameter formatting
+    return _as_counts(db.fetch_data(KPI_SQL.format(table=table), ()))
+
+
+# date_range limits the counts to those days (see partitions.py); the rollup only has
+# all-time totals, so a range always scans, pruned to its months' partitions
+def kpis(date_range=None):
+    if date_range:
+        return scan_kpis(partitions.source(date_range))
+    try:
+        rollups.refresh_if_due()
+        return _as_counts(db.fetch_data(KPI_ROLLUP_SQL, ()))
+    except pymysql.MySQLError:
+        return scan_kpis()
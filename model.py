@@ -0,0 +1,281 @@
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+import db
+import predictor
+from schema import LOGS_TABLE
+
+# Trained stop_outcome / violation classifier for "Predict Logs".
+#
+# A categorical naive Bayes over the form's fields: trained offline from the logs table,
+# saved as JSON (vocabularies + log-probability tables, no pickles), loaded once per
+# process and scored in vectorized form, a whole batch at a time.
+#
+#   python model.py train                      fit on all of logs and save
+#   python model.py evaluate                   hold-out accuracy and latency vs. the mode heuristic
+#   python model.py score stops.csv -o out.csv batch-score a CSV of stops
+
+MODEL_PATH = os.environ.get("SECURECHECK_MODEL_PATH", os.path.join("models", "stop_model.json"))
+
+FEATURES = ["driver_gender", "age_group", "driver_race", "country_name",
+            "search_conducted", "search_type", "stop_duration", "drugs_related_stop"]
+TARGETS = ["stop_outcome", "violation"]
+SOURCE_COLUMNS = ["driver_gender", "driver_age", "driver_race", "country_name",
+                  "search_conducted", "search_type", "stop_duration", "drugs_related_stop"]
+
+ALPHA = 1.0  # Laplace smoothing
+CHUNK_SIZE = 200_000
+
+
+# Raw stop columns -> the string categories the model is trained on
+def prepare_features(df):
+    out = pd.DataFrame(index=df.index)
+    out["driver_gender"] = df["driver_gender"].astype("string").str.strip().str[:1].str.upper()
+    ages = pd.to_numeric(df["driver_age"], errors="coerce")
+    out["age_group"] = pd.cut(ages, predictor.AGE_BINS, right=False, labels=predictor.AGE_LABELS).astype("string")
+    for col in ("driver_race", "country_name", "stop_duration"):
+        out[col] = df[col].astype("string").str.strip()
+    out["search_type"] = df["search_type"].astype("string").str.strip().str.lower()
+    for col in ("search_conducted", "drugs_related_stop"):
+        out[col] = pd.to_numeric(df[col], errors="coerce").astype("Int64").astype("string")
+    return out.fillna("<missing>")
+
+
+class StopModel:
+
+    def __init__(self, vocab, targets, rows=0, trained_at=None):
+        self.vocab = vocab        # feature -> list of known values
+        self.targets = targets    # target -> {"classes", "class_counts", "counts"}
+        self.rows = rows
+        self.trained_at = trained_at
+        self._compile()
+
+    def _compile(self):
+        # Log-probability tables with one extra column per feature for unseen values
+        self._codes = {f: {v: i for i, v in enumerate(values)} for f, values in self.vocab.items()}
+        self._tables = {}
+        for target, t in self.targets.items():
+            class_counts = np.asarray(t["class_counts"], dtype=float)
+            log_prior = np.log(class_counts / class_counts.sum())
+            log_lik = {}
+            for f in FEATURES:
+                counts = np.asarray(t["counts"][f], dtype=float)
+                counts = np.hstack([counts, np.zeros((len(class_counts), 1))])
+                log_lik[f] = np.log((counts + ALPHA) / (class_counts[:, None] + ALPHA * counts.shape[1]))
+            self._tables[target] = (np.asarray(t["classes"], dtype=object), log_prior, log_lik)
+
+    def encode(self, features):
+        return {f: features[f].map(self._codes[f]).fillna(len(self.vocab[f])).astype(int).to_numpy()
+                for f in FEATURES}
+
+    # Vectorized scoring: one predicted class per row for every target
+    def predict(self, df):
+        codes = self.encode(prepare_features(df))
+        out = pd.DataFrame(index=df.index)
+        for target, (classes, log_prior, log_lik) in self._tables.items():
+            scores = np.tile(log_prior, (len(df), 1))
+            for f in FEATURES:
+                scores += log_lik[f][:, codes[f]].T
+            out[f"predicted_{target}"] = classes[scores.argmax(axis=1)]
+        return out
+
+    def predict_one(self, **stop):
+        row = self.predict(pd.DataFrame([{c: stop.get(c) for c in SOURCE_COLUMNS}])).iloc[0]
+        return row["predicted_stop_outcome"], row["predicted_violation"]
+
+    def to_dict(self):
+        return {"features": FEATURES, "vocab": self.vocab, "targets": self.targets,
+                "rows": self.rows, "trained_at": self.trained_at}
+
+    def save(self, path=MODEL_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=MODEL_PATH):
+        with open(path) as f:
+            data = json.load(f)
+        if data["features"] != FEATURES:
+            raise ValueError(f"{path} was trained on different features: {data['features']}")
+        return cls(data["vocab"], data["targets"], data.get("rows", 0), data.get("trained_at"))
+
+
+# Accumulates per-class counts chunk by chunk, so training never holds the whole table
+class Trainer:
+
+    def __init__(self):
+        self.rows = 0
+        self.counts = {t: {} for t in TARGETS}  # target -> {(feature, value, class): n}
+        self.class_counts = {t: {} for t in TARGETS}
+
+    def add(self, df):
+        df = df.dropna(subset=TARGETS, how="all")
+        features = prepare_features(df)
+        for target in TARGETS:
+            labels = df[target].astype("string")
+            keep = labels.notna()
+            for cls, n in labels[keep].value_counts().items():
+                self.class_counts[target][cls] = self.class_counts[target].get(cls, 0) + int(n)
+            for f in FEATURES:
+                grouped = pd.DataFrame({"v": features.loc[keep, f], "c": labels[keep]}).value_counts()
+                for (value, cls), n in grouped.items():
+                    key = (f, value, cls)
+                    self.counts[target][key] = self.counts[target].get(key, 0) + int(n)
+        self.rows += len(df)
+
+    def build(self):
+        vocab = {f: sorted({v for t in TARGETS for (ff, v, _) in self.counts[t] if ff == f}) for f in FEATURES}
+        targets = {}
+        for target in TARGETS:
+            classes = sorted(self.class_counts[target])
+            class_index = {c: i for i, c in enumerate(classes)}
+            counts = {f: np.zeros((len(classes), len(vocab[f])), dtype=np.int64) for f in FEATURES}
+            value_index = {f: {v: i for i, v in enumerate(vocab[f])} for f in FEATURES}
+            for (f, value, cls), n in self.counts[target].items():
+                counts[f][class_index[cls], value_index[f][value]] = n
+            targets[target] = {"classes": classes,
+                               "class_counts": [self.class_counts[target][c] for c in classes],
+                               "counts": {f: counts[f].tolist() for f in FEATURES}}
+        return StopModel(vocab, targets, self.rows, datetime.now(timezone.utc).isoformat(timespec="seconds"))
+
+
+# Stream the logs table in id order; `where` restricts rows (e.g. a train/test split)
+def iter_logs(table=LOGS_TABLE, where="1=1", columns=None):
+    columns = ", ".join(["id"] + (columns or SOURCE_COLUMNS + TARGETS))
+    last_id = 0
+    while True:
+        chunk = db.run_query(f"SELECT {columns} FROM {table} WHERE id > %s AND {where} ORDER BY id LIMIT %s",
+                             (last_id, CHUNK_SIZE))
+        if chunk.empty:
+            return
+        yield chunk
+        last_id = int(chunk["id"].iloc[-1])
+
+
+def train(table=LOGS_TABLE, where="1=1"):
+    trainer = Trainer()
+    for chunk in iter_logs(table, where):
+        trainer.add(chunk)
+    return trainer.build()
+
+
+# Loaded once per process; call load_model.cache_clear() after retraining
+@lru_cache(maxsize=1)
+def load_model(path=MODEL_PATH):
+    if not os.path.exists(path):
+        return None
+    return StopModel.load(path)
+
+
+# Share of the stops with a known answer that were predicted right; no prediction counts as wrong
+def _accuracy(guesses, truth):
+    known = truth.notna()
+    if not known.any():
+        return float("nan")
+    right = pd.Series(guesses, index=truth.index, dtype="string") == truth
+    return float(right.fillna(False)[known].mean())
+
+
+def evaluate(table=LOGS_TABLE, holdout=5):
+    # Every holdout-th stop is held out; both approaches learn from the rest
+    train_where = f"MOD(id, {int(holdout)}) <> 0"
+    test_where = f"MOD(id, {int(holdout)}) = 0"
+
+    start = time.perf_counter()
+    model = train(table, train_where)
+    train_seconds = time.perf_counter() - start
+
+    heuristic = predictor.Predictor()
+    for chunk in iter_logs(table, train_where, predictor.FEATURES + predictor.TARGETS):
+        heuristic.add(chunk)
+
+    test = pd.concat(list(iter_logs(table, test_where)), ignore_index=True)
+    start = time.perf_counter()
+    predicted = model.predict(test)
+    batch_seconds = time.perf_counter() - start
+
+    sample = test.head(1000)
+    start = time.perf_counter()
+    for r in sample.itertuples():
+        heuristic.predict(r.driver_gender, r.driver_age, r.search_conducted, r.stop_duration, r.drugs_related_stop)
+    mode_seconds = time.perf_counter() - start
+    # Both are scored on every test stop; the lookup depends only on the features, so it
+    # runs once per distinct combination
+    combos = test[predictor.FEATURES].drop_duplicates()
+    answers = [heuristic.predict(*r) for r in combos.itertuples(index=False)]
+    for i, target in enumerate(TARGETS):
+        combos[f"mode_{target}"] = pd.Series([a[i] for a in answers], index=combos.index, dtype="string")
+    mode = test[predictor.FEATURES].merge(combos, on=predictor.FEATURES, how="left")
+    start = time.perf_counter()
+    for _, r in sample.head(100).iterrows():
+        model.predict_one(**r.to_dict())
+    single_seconds = time.perf_counter() - start
+
+    report = {"train_rows": model.rows, "test_rows": len(test), "train_seconds": train_seconds}
+    for i, target in enumerate(TARGETS):
+        truth = test[target].astype("string")
+        report[f"model_{target}_accuracy"] = _accuracy(predicted[f"predicted_{target}"].values, truth)
+        report[f"mode_{target}_accuracy"] = _accuracy(mode[f"mode_{target}"].values, truth)
+    report["model_batch_ms_per_1k"] = batch_seconds / max(len(test), 1) * 1e6
+    report["model_single_ms"] = single_seconds / max(min(len(sample), 100), 1) * 1000
+    report["mode_single_ms"] = mode_seconds / max(len(sample), 1) * 1000
+    return report
+
+
+# Score a CSV of stops chunk by chunk, appending predicted_* columns
+def score_csv(path, out_path, model, chunk_size=CHUNK_SIZE):
+    rows = 0
+    start = time.perf_counter()
+    for i, chunk in enumerate(pd.read_csv(path, chunksize=chunk_size)):
+        scored = pd.concat([chunk, model.predict(chunk)], axis=1)
+        scored.to_csv(out_path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+        rows += len(chunk)
+    return rows, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train, evaluate and batch-score the stop outcome model")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("train")
+    p.add_argument("--table", default=LOGS_TABLE)
+    p.add_argument("--out", default=MODEL_PATH)
+    p = sub.add_parser("evaluate")
+    p.add_argument("--table", default=LOGS_TABLE)
+    p.add_argument("--holdout", type=int, default=5, help="hold out every n-th stop for testing")
+    p = sub.add_parser("score")
+    p.add_argument("path")
+    p.add_argument("-o", "--out", required=True)
+    p.add_argument("--model", default=MODEL_PATH)
+    args = parser.parse_args(argv)
+
+    if args.command == "train":
+        start = time.perf_counter()
+        model = train(args.table)
+        model.save(args.out)
+        print(f"Trained on {model.rows} stops in {time.perf_counter() - start:.1f}s -> {args.out}")
+    elif args.command == "evaluate":
+        for key, value in evaluate(args.table, args.holdout).items():
+            print(f"{key:<32}{value:.4f}" if isinstance(value, float) else f"{key:<32}{value}")
+    else:
+        model = load_model(args.model)
+        if model is None:
+            print(f"No model at {args.model}; run 'python model.py train' first")
+            return 1
+        rows, seconds = score_csv(args.path, args.out, model)
+        print(f"Scored {rows} stops in {seconds:.1f}s ({rows / max(seconds, 1e-9):,.0f} rows/sec) -> {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+import db
+from schema import LOGS_TABLE, LOG_COLUMNS
+
+# Keyset (id-based) pagination over the logs table.
+# A page is "the next page_size rows with id > last id seen", which the id index (the
+# primary key, or idx_id once logs is partitioned) answers with a short range scan
+# however deep the page is, unlike LIMIT/OFFSET.
+
+ALL_COLUMNS = ["id"] + LOG_COLUMNS
+DEFAULT_COLUMNS = ["id", "stop_date", "stop_time", "country_name", "vehicle_number",
+                   "violation", "stop_outcome", "stop_duration"]
+PAGE_SIZES = [25, 50, 100, 500]
+
+
+def _projection(columns):
+    # Only known column names ever reach the SQL text; id is always needed for the cursor
+    columns = [c for c in columns if c in ALL_COLUMNS] or DEFAULT_COLUMNS
+    if "id" not in columns:
+        columns = ["id"] + columns
+    return columns
+
+
+def _where(conditions):
+    return " AND ".join(conditions) if conditions else "1=1"
+
+
+# One page of logs, in id order, starting after after_id
+def fetch_page(columns=DEFAULT_COLUMNS, conditions=(), params=(), after_id=None, page_size=50,
+               table=LOGS_TABLE):
+    columns = _projection(columns)
+    conditions = list(conditions)
+    params = list(params)
+    if after_id is not None:
+        conditions.append("id > %s")
+        params.append(after_id)
+    query = (f"SELECT {', '.join(columns)} FROM {table} WHERE {_where(conditions)} "
+             f"ORDER BY id LIMIT %s")
+    return db.fetch_data(query, params + [int(page_size)])
+
+
+# Total matching rows, for the "Showing N matching logs" banner
+def count_rows(conditions=(), params=(), table=LOGS_TABLE):
+    df = db.fetch_data(f"SELECT COUNT(*) AS total FROM {table} WHERE {_where(conditions)}", list(params))
+    return int(df["total"].iloc[0]) if not df.empty else 0
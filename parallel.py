@@ -0,0 +1,48 @@
+import contextvars
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# Run a page's independent queries at the same time.
+#
+# One thread pool is shared by every session in the process; each page additionally
+# keeps at most PAGE_CONCURRENCY of its own queries in flight, so one page can't take
+# every pooled connection. Results come back in completion order, so the caller can
+# draw each chart as soon as its data is in, and the page waits about as long as its
+# slowest query instead of the sum of all of them.
+#
+# Worker threads only fetch; drawing stays on the Streamlit script thread.
+
+WORKERS = int(os.environ.get("SECURECHECK_QUERY_WORKERS", "8"))
+PAGE_CONCURRENCY = int(os.environ.get("SECURECHECK_PAGE_CONCURRENCY", "4"))
+QUERY_TIMEOUT = float(os.environ.get("SECURECHECK_QUERY_TIMEOUT", "30"))
+
+_executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="page-query")
+
+
+# tasks: {name: function}. Yields (name, result, error) as each task finishes; a task
+# still running `timeout` seconds after it was started is reported as a TimeoutError.
+# The query itself can't be interrupted, so it finishes in the background and its
+# connection goes back to the pool then.
+def run(tasks, limit=PAGE_CONCURRENCY, timeout=QUERY_TIMEOUT):
+    pending = list(tasks.items())
+    running = {}  # future -> (name, started)
+    while pending or running:
+        while pending and len(running) < limit:
+            name, fn = pending.pop(0)
+            # Carry the caller's context along (e.g. instrument's page and query labels)
+            future = _executor.submit(contextvars.copy_context().run, fn)
+            running[future] = (name, time.monotonic())
+        next_deadline = min(started for _, started in running.values()) + timeout
+        done, _ = wait(running, timeout=max(0.0, next_deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+        for future in done:
+            name, _ = running.pop(future)
+            try:
+                yield name, future.result(), None
+            except Exception as e:
+                yield name, None, e
+        now = time.monotonic()
+        for future, (name, started) in list(running.items()):
+            if now - started >= timeout:
+                del running[future]
+                yield name, None, TimeoutError(f"{name} took longer than {timeout:g}s")
@@ -0,0 +1,347 @@
+import argparse
+import gzip
+import os
+import re
+import sys
+import time
+from datetime import date
+
+import pandas as pd
+import pymysql
+
+import db
+import rollups
+from analyses import for_table
+from schema import LOGS_TABLE, LOG_COLUMNS
+
+# Monthly partitions for the logs table, and the date-range filter that lets MySQL read
+# only the months a page asks for.
+#
+# `partition` repartitions logs BY RANGE COLUMNS(stop_date), one partition per month,
+# plus
+#   p_undated  stops without a stop_date (NULL sorts below every range)
+#   pmax       anything past the last month, until `extend` splits it up
+# A query whose WHERE clause bounds stop_date only touches the matching partitions;
+# EXPLAIN lists them in its `partitions` column.
+#
+# The months come from the data, so partition after loading the stops, or pass --since
+# with the first month to expect. Anything older than the first month lands in it;
+# `split` breaks it up into months afterwards.
+#
+# Every unique key of a partitioned table has to contain the partitioning column, and
+# stop_date may be NULL, so the primary key on id becomes a plain index (AUTO_INCREMENT
+# still hands out the ids). Partitioned tables can't have FULLTEXT indexes either: the
+# n-gram plate index from migration 004 is dropped and "contains" plate search falls
+# back to LIKE (see search.py), bounded by the date range.
+#
+#   python partitions.py partition                     after the load: its months
+#   python partitions.py partition --since 2020-01-01  before it: from that month
+#   python partitions.py split --since 2019-01-01      older stops piled into the first month
+#   python partitions.py list                          rows and size per partition
+#   python partitions.py extend --months 3             add partitions for the coming months
+#   python partitions.py archive --before 2021-01-01   export old months to CSV, then drop them
+#   python partitions.py drop --before 2021-01-01 --yes
+
+FUTURE_MONTHS = int(os.environ.get("SECURECHECK_FUTURE_PARTITIONS", "3"))
+ARCHIVE_DIR = os.environ.get("SECURECHECK_ARCHIVE_DIR", os.path.join("data", "archive"))
+EXPORT_CHUNK = 200_000
+
+UNDATED = "p_undated"
+LAST = "pmax"
+EARLIEST = date(1000, 1, 1)  # smallest DATE MySQL supports
+
+
+def _day(value):
+    return pd.Timestamp(value).date()
+
+
+def _add_months(day, months):
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+# First day of every month from first's month through last's month
+def month_starts(first, last):
+    month = _add_months(first, 0)
+    while month <= last:
+        yield month
+        month = _add_months(month, 1)
+
+
+def _definitions(months):
+    return [f"PARTITION p{m:%Y%m} VALUES LESS THAN ('{_add_months(m, 1).isoformat()}')" for m in months]
+
+
+# --- Date ranges -------------------------------------------------------------------
+# A date range is (first day, last day), both included; None means every date.
+
+# (conditions, params) for paging.fetch_page / count_rows
+def date_filter(date_range):
+    if not date_range:
+        return [], []
+    start, end = date_range
+    return ["stop_date BETWEEN %s AND %s"], [_day(start), _day(end)]
+
+
+def _subquery(date_range, table, hints=""):
+    # Inlined rather than bound, so the text also works in queries run without params;
+    # both dates went through _day, so only ISO dates reach the SQL
+    start, end = (_day(d).isoformat() for d in date_range)
+    return f"(SELECT * FROM {table}{hints} WHERE stop_date BETWEEN '{start}' AND '{end}')"
+
+
+# What to put after FROM to read only date_range of table
+def source(date_range, table=LOGS_TABLE):
+    return f"{_subquery(date_range, table)} AS logs" if date_range else table
+
+
+_NOT_ALIASES = {"WHERE", "GROUP", "ORDER", "LIMIT", "HAVING", "WINDOW", "UNION", "JOIN", "INNER",
+                "LEFT", "RIGHT", "CROSS", "NATURAL", "STRAIGHT_JOIN", "ON", "USING",
+                "FORCE", "USE", "IGNORE", "PARTITION", "FOR", "LOCK"}
+# securecheck.logs [PARTITION (...)] [[AS] alias] [USE|FORCE|IGNORE INDEX|KEY [FOR ...] (...)]...
+_LOGS = re.compile(
+    r"securecheck\.logs\b"
+    r"(?P<partition>\s+PARTITION\s*\([^)]*\))?"
+    rf"(?:\s+(?:AS\s+)?(?!(?:{'|'.join(_NOT_ALIASES)})\b)(?P<alias>\w+))?"
+    r"(?P<hints>(?:\s+(?:USE|FORCE|IGNORE)\s+(?:INDEX|KEY)(?:\s+FOR\s+(?:JOIN|ORDER\s+BY|GROUP\s+BY))?"
+    r"\s*\([^)]*\))*)",
+    re.IGNORECASE)
+
+
+# Rewrite a query over securecheck.logs (the canned analyses, the Data Analytics charts)
+# to read only date_range of table. MySQL merges the derived table into the outer query,
+# so the stop_date range still prunes partitions. A derived table takes no PARTITION
+# clause or index hints, so those move inside it.
+def restrict(query, date_range, table=LOGS_TABLE):
+    if not date_range:
+        return query if table == LOGS_TABLE else for_table(query, table)
+
+    def replace(m):
+        derived = _subquery(date_range, table, (m.group("partition") or "") + m.group("hints"))
+        return f"{derived} AS {m.group('alias') or 'logs'}"
+
+    return _LOGS.sub(replace, query)
+
+
+# First and last stop_date in table, read off the stop_datetime index (migration 005)
+# when the table has it; (None, None) while it is empty
+def date_bounds(table=LOGS_TABLE):
+    try:
+        df = db.fetch_data(f"SELECT DATE(MIN(stop_datetime)) AS first, DATE(MAX(stop_datetime)) AS last FROM {table}")
+    except pymysql.MySQLError:
+        df = db.fetch_data(f"SELECT MIN(stop_date) AS first, MAX(stop_date) AS last FROM {table}")
+    row = df.iloc[0]
+    return (None, None) if pd.isna(row["first"]) else (_day(row["first"]), _day(row["last"]))
+
+
+# --- Partition maintenance ---------------------------------------------------------
+
+def _values(row):
+    return list(row.values()) if isinstance(row, dict) else list(row)
+
+
+_PARTITIONED_SQL = """SELECT COUNT(*) AS n FROM information_schema.PARTITIONS
+                      WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL"""
+
+
+def is_partitioned(table=LOGS_TABLE):
+    return bool(db.run_query(_PARTITIONED_SQL, tuple(table.split(".")))["n"].iloc[0])
+
+
+# Partition table by month, from its earliest stop (or `since`, if earlier) through
+# FUTURE_MONTHS past today (or past its latest stop, if that is later). An empty table
+# needs `since`: its months can't be guessed, and the whole load would otherwise end up
+# in a single partition.
+def partition_table(cursor, table=LOGS_TABLE, since=None):
+    schema_name, name = table.split(".")
+    cursor.execute(_PARTITIONED_SQL, (schema_name, name))
+    if _values(cursor.fetchone())[0]:
+        raise RuntimeError(f"{table} is already partitioned; see `list`, `extend` and `split`")
+    cursor.execute(f"SELECT MIN(stop_date), MAX(stop_date) FROM {table}")
+    first, last = _values(cursor.fetchone())
+    if since is not None:
+        first = min(first, _day(since)) if first else _day(since)
+    if first is None:
+        raise RuntimeError(f"{table} is empty; load it first, or pass --since with its first month")
+    today = date.today()
+    months = month_starts(first, _add_months(max(last or today, today), FUTURE_MONTHS))
+
+    cursor.execute("""SELECT DISTINCT INDEX_NAME FROM information_schema.STATISTICS
+                      WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND INDEX_TYPE = 'FULLTEXT'""",
+                   (schema_name, name))
+    for (index,) in (_values(row) for row in cursor.fetchall()):
+        cursor.execute(f"ALTER TABLE {table} DROP INDEX {index}")
+    cursor.execute(f"ALTER TABLE {table} DROP PRIMARY KEY, ADD INDEX idx_id (id)")
+
+    parts = ([f"PARTITION {UNDATED} VALUES LESS THAN ('{EARLIEST.isoformat()}')"] + _definitions(months)
+             + [f"PARTITION {LAST} VALUES LESS THAN (MAXVALUE)"])
+    cursor.execute(f"ALTER TABLE {table} PARTITION BY RANGE COLUMNS(stop_date) ({', '.join(parts)})")
+
+
+# One row per partition, in order: name, upper bound (exclusive), approximate rows, bytes
+def list_partitions(table=LOGS_TABLE):
+    schema_name, name = table.split(".")
+    df = db.run_query("""SELECT PARTITION_NAME AS name, PARTITION_DESCRIPTION AS below,
+                         TABLE_ROWS AS approx_rows, DATA_LENGTH + INDEX_LENGTH AS bytes
+                         FROM information_schema.PARTITIONS
+                         WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s
+                         ORDER BY PARTITION_ORDINAL_POSITION""", (schema_name, name))
+    if df.empty or df["name"].isna().all():
+        raise RuntimeError(f"{table} is not partitioned; run python partitions.py partition first")
+    return df
+
+
+# '2021-02-01' (quoted, as information_schema shows it) -> date; MAXVALUE -> None
+def _bound(description):
+    value = str(description).strip("'")
+    return None if value == "MAXVALUE" else _day(value)
+
+
+# Split pmax into monthly partitions up to `months` months past today (or past the
+# latest stop, if that is later), so new stops don't pile up in it; returns the
+# partitions added
+def extend(table=LOGS_TABLE, months=FUTURE_MONTHS):
+    parts = list_partitions(table)
+    covered = max(b for b in map(_bound, parts["below"]) if b is not None)
+    last = db.run_query(f"SELECT MAX(stop_date) AS last FROM {table}")["last"].iloc[0]
+    until = max(_day(last), date.today()) if pd.notna(last) else date.today()
+    new = list(month_starts(covered, _add_months(until, months)))
+    if not new:
+        return []
+    definitions = _definitions(new) + [f"PARTITION {LAST} VALUES LESS THAN (MAXVALUE)"]
+    db.execute(f"ALTER TABLE {table} REORGANIZE PARTITION {LAST} INTO ({', '.join(definitions)})")
+    return [f"p{m:%Y%m}" for m in new]
+
+
+# Split the first monthly partition into one per month from `since`'s month, for stops
+# older than the table's partitioning (a backfill, or partitioning with a late --since);
+# returns the partitions added
+def split(table=LOGS_TABLE, since=None):
+    parts = list_partitions(table)
+    monthly = [(name, _bound(below)) for name, below in zip(parts["name"], parts["below"])
+               if name not in (UNDATED, LAST)]
+    if not monthly:
+        raise RuntimeError(f"{table} has no monthly partitions to split")
+    first, below = monthly[0]
+    # The last new partition keeps the old upper bound (and name), so the ranges still meet
+    new = list(month_starts(_day(since), _add_months(below, -1)))
+    if len(new) < 2:
+        return []
+    db.execute(f"ALTER TABLE {table} REORGANIZE PARTITION {first} INTO ({', '.join(_definitions(new))})")
+    db.cache.invalidate(table.split(".")[-1])
+    return [f"p{m:%Y%m}" for m in new[:-1]]
+
+
+# Monthly partitions holding nothing on or after `before`
+def old_partitions(table, before):
+    before = _day(before)
+    parts = list_partitions(table)
+    return [name for name, below in zip(parts["name"], parts["below"])
+            if name not in (UNDATED, LAST) and _bound(below) is not None and _bound(below) <= before]
+
+
+# Copy one partition to <out_dir>/<table>/<partition>.csv.gz; returns (path, rows)
+def export_partition(table, name, out_dir=ARCHIVE_DIR):
+    out_dir = os.path.join(out_dir, table)
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, f"{name}.csv.gz")
+    columns = ["id"] + LOG_COLUMNS
+    last_id = 0
+    rows = 0
+    with gzip.open(path + ".tmp", "wt", newline="") as f:
+        while True:
+            chunk = db.run_query(f"SELECT {', '.join(columns)} FROM {table} PARTITION ({name}) "
+                                 "WHERE id > %s ORDER BY id LIMIT %s", (last_id, EXPORT_CHUNK))
+            if chunk.empty:
+                break
+            chunk["stop_time"] = chunk["stop_time"].map(lambda t: str(t).split()[-1] if pd.notnull(t) else "")
+            chunk.to_csv(f, header=rows == 0, index=False)
+            rows += len(chunk)
+            last_id = int(chunk["id"].iloc[-1])
+            if len(chunk) < EXPORT_CHUNK:
+                break
+        if rows == 0:
+            pd.DataFrame(columns=columns).to_csv(f, index=False)
+    # Only a complete file gets the final name, and only then is the partition dropped
+    os.replace(path + ".tmp", path)
+    return path, rows
+
+
+# Drop the monthly partitions before `before`, exporting each one first unless
+# export=False; returns [(partition, archive path or None, rows)]
+def archive(table=LOGS_TABLE, before=None, out_dir=ARCHIVE_DIR, export=True):
+    done = []
+    for name in old_partitions(table, before):
+        path, rows = export_partition(table, name, out_dir) if export else (None, None)
+        db.execute(f"ALTER TABLE {table} DROP PARTITION {name}")
+        done.append((name, path, rows))
+    if done:
+        db.cache.invalidate(table.split(".")[-1])
+        # The rollups still count the dropped stops
+        if table == LOGS_TABLE:
+            rollups.rebuild(table)
+    return done
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Manage the monthly partitions of the logs table")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("partition", help="partition the table by month (drops its FULLTEXT indexes)")
+    p.add_argument("--table", default=LOGS_TABLE)
+    p.add_argument("--since", type=_day, help="first month to cover; required while the table is empty")
+    p = sub.add_parser("split", help="split the first month for stops older than it")
+    p.add_argument("--table", default=LOGS_TABLE)
+    p.add_argument("--since", type=_day, required=True, help="first month to cover")
+    p = sub.add_parser("list")
+    p.add_argument("--table", default=LOGS_TABLE)
+    p = sub.add_parser("extend")
+    p.add_argument("--table", default=LOGS_TABLE)
+    p.add_argument("--months", type=int, default=FUTURE_MONTHS, help="months past today to cover")
+    p = sub.add_parser("archive")
+    p.add_argument("--table", default=LOGS_TABLE)
+    p.add_argument("--before", type=_day, required=True, help="drop months that end on or before this date")
+    p.add_argument("--out", default=ARCHIVE_DIR)
+    p = sub.add_parser("drop")
+    p.add_argument("--table", default=LOGS_TABLE)
+    p.add_argument("--before", type=_day, required=True, help="drop months that end on or before this date")
+    p.add_argument("--yes", action="store_true", help="really drop, without exporting")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        if args.command == "partition":
+            with db.pool.connection() as conn:
+                with conn.cursor() as cursor:
+                    partition_table(cursor, args.table, args.since)
+            db.cache.invalidate(args.table.split(".")[-1])
+            print(f"Partitioned {args.table} into {len(list_partitions(args.table))} partitions")
+        elif args.command == "split":
+            added = split(args.table, args.since)
+            print(f"Added {len(added)} partitions: {', '.join(added) or '-'}")
+        elif args.command == "list":
+            parts = list_partitions(args.table)
+            print(f"{'partition':<12}{'below':<14}{'rows':>12}{'MiB':>10}")
+            for r in parts.itertuples():
+                print(f"{r.name:<12}{str(r.below).strip(chr(39)):<14}{r.approx_rows:>12}{r.bytes / 2**20:>10.1f}")
+        elif args.command == "extend":
+            added = extend(args.table, args.months)
+            print(f"Added {len(added)} partitions: {', '.join(added) or '-'}")
+        elif args.command == "archive":
+            for name, path, rows in archive(args.table, args.before, args.out):
+                print(f"{name}: {rows} rows -> {path}")
+        else:
+            if not args.yes:
+                names = old_partitions(args.table, args.before)
+                print(f"Would drop {len(names)} partitions: {', '.join(names) or '-'} (pass --yes to drop them)")
+                return 1
+            dropped = archive(args.table, args.before, export=False)
+            print(f"Dropped {len(dropped)} partitions")
+    except (pymysql.MySQLError, db.PoolTimeout, RuntimeError) as e:
+        print(f"Error: {e}")
+        return 2
+    print(f"Done in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+import snapshot
+
+# In-memory lookup index for the "Predict Logs" form.
+#
+# For every combination of the form's features the index keeps how often each
+# stop_outcome and violation occurred, so a prediction is a dict lookup instead of a
+# boolean mask over the whole table. When the exact combination has never been seen the
+# lookup falls back to coarser keys (age -> age group, then fewer features) before
+# ending at the distribution over all stops.
+#
+# The index is built once per process from the shared logs snapshot, and afterwards
+# only the rows that reached the snapshot since are added (LogsSnapshot.rows_since,
+# which includes stops committed late, below ids already indexed).
+
+TARGETS = ["stop_outcome", "violation"]
+FEATURES = ["driver_gender", "driver_age", "search_conducted", "stop_duration", "drugs_related_stop"]
+
+# (description, key columns), most specific first
+LEVELS = [
+    ("exact match", ["driver_gender", "driver_age", "search_conducted", "stop_duration", "drugs_related_stop"]),
+    ("same age group", ["driver_gender", "age_group", "search_conducted", "stop_duration", "drugs_related_stop"]),
+    ("same age group, any duration", ["driver_gender", "age_group", "search_conducted", "drugs_related_stop"]),
+    ("same search & drug flags", ["search_conducted", "drugs_related_stop"]),
+    ("all stops", []),
+]
+
+AGE_BINS = [0, 20, 30, 40, 50, 60, np.inf]
+AGE_LABELS = ["<20", "20-29", "30-39", "40-49", "50-59", "60+"]
+
+REFRESH_INTERVAL = 10.0
+
+
+def _prepare(df):
+    df = df.copy()
+    # The form offers "Male"/"Female" while the source data may hold "M"/"F"
+    df["driver_gender"] = df["driver_gender"].str.strip().str[:1].str.upper()
+    df["driver_age"] = pd.to_numeric(df["driver_age"], errors="coerce").astype("Int64")
+    df["age_group"] = pd.cut(df["driver_age"].astype(float), AGE_BINS, right=False, labels=AGE_LABELS).astype(object)
+    for col in ("search_conducted", "drugs_related_stop"):
+        df[col] = pd.to_numeric(df[col], errors="coerce").astype("Int64")
+    # Plain Python values (None for missing) so form input and index keys compare equal
+    return df.astype(object).where(df.notna(), None)
+
+
+def _missing(value):
+    return value is None or (isinstance(value, float) and np.isnan(value))
+
+
+# groupby hands back NaN for missing keys; store them as None like the prepared input
+def _key(value):
+    value = value if isinstance(value, tuple) else (value,)
+    return tuple(None if _missing(v) else v for v in value)
+
+
+def _mode(counter):
+    # Same tie-break as pandas Series.mode()[0]: highest count, then smallest value
+    return min(counter, key=lambda v: (-counter[v], str(v)))
+
+
+class Predictor:
+
+    def __init__(self, source=None):
+        # Rows come from the shared compact snapshot of the logs table (snapshot.py)
+        self.source = source or snapshot.snapshot
+        self.seen = 0  # snapshot rows already indexed
+        self.rows = 0
+        self.durations = set()
+        # level description -> key tuple -> target column -> Counter
+        self._index = {name: {} for name, _ in LEVELS}
+        self._lock = threading.Lock()
+        self._last_refresh = 0.0
+
+    def add(self, df):
+        df = _prepare(df)
+        with self._lock:
+            for name, columns in LEVELS:
+                level = self._index[name]
+                for target in TARGETS:
+                    counts = df.groupby(columns + [target], dropna=False, sort=False).size()
+                    for key, n in counts.items():
+                        key = _key(key)
+                        entry = level.setdefault(key[:-1], {t: Counter() for t in TARGETS})
+                        if key[-1] is not None:
+                            entry[target][key[-1]] += int(n)
+            self.durations.update(d for d in df["stop_duration"] if d is not None)
+            self.rows += len(df)
+
+    # Index only the stops that reached the snapshot since the last refresh
+    def refresh(self):
+        self.source.refresh_if_due()
+        new, seen = self.source.rows_since(self.seen)
+        if len(new):
+            self.add(new[["id"] + FEATURES + TARGETS])
+        self.seen = seen
+        self._last_refresh = time.monotonic()
+
+    def refresh_if_due(self):
+        if time.monotonic() - self._last_refresh >= REFRESH_INTERVAL:
+            self.refresh()
+
+    def mark_stale(self):
+        self._last_refresh = 0.0
+
+    # Returns (outcome, violation, level description, number of matching stops)
+    def predict(self, driver_gender, driver_age, search_conducted, stop_duration, drugs_related_stop):
+        row = _prepare(pd.DataFrame([{
+            "driver_gender": driver_gender, "driver_age": driver_age, "search_conducted": search_conducted,
+            "stop_duration": stop_duration, "drugs_related_stop": drugs_related_stop,
+        }])).iloc[0]
+        with self._lock:
+            for name, columns in LEVELS:
+                entry = self._index[name].get(tuple(row[c] for c in columns))
+                if entry and entry["stop_outcome"] and entry["violation"]:
+                    support = sum(entry["stop_outcome"].values())
+                    return _mode(entry["stop_outcome"]), _mode(entry["violation"]), name, support
+        return None, None, None, 0
+
+
+predictor = Predictor()
+_init_lock = threading.Lock()
+
+
+# The shared, process-wide predictor with any new stops folded in
+def get_predictor():
+    with _init_lock:
+        predictor.refresh_if_due()
+    return predictor
@@ -0,0 +1,486 @@
+import argparse
+import os
+import sys
+import threading
+import time
+
+import db
+from analyses import QUERY_MAP, compare_results
+from schema import LOGS_TABLE
+
+# Pre-aggregated summary tables for the canned analyses in analyses.QUERY_MAP.
+#
+# Each rollup groups the logs by a few dimensions and keeps additive counters, so new
+# stops are folded in with INSERT ... SELECT ... ON DUPLICATE KEY UPDATE counter = counter + new
+# over only the rows past the last id processed (kept in SECURECHECK.rollup_state).
+# Ages are stored exactly rather than bucketed, so every age-group CASE in the analyses
+# can be answered from the same table.
+#
+# Unique keys can't merge NULLs, so NULL dimensions are stored as '' (strings) or -1
+# (numbers) and turned back into NULL when read.
+#
+# Ids are not committed in order: the stop-logging queue, `python writer.py serve` and
+# ingest.py write at the same time, so a lower id can show up after a higher one was
+# folded in. Each refresh therefore folds only the runs of consecutive ids it can see
+# and records the holes between them in SECURECHECK.rollup_gaps; later refreshes fold
+# whatever has filled a hole. A hole still empty after COMMIT_LAG seconds belongs to a
+# rolled-back insert or an unused auto-increment value, and is forgotten.
+#
+#   python rollups.py refresh      fold in new stops
+#   python rollups.py rebuild      recompute everything from logs
+#   python rollups.py check        compare every rollup answer with the raw query
+
+MEASURES = {
+    "stops": "COUNT(*)",
+    "arrests": "SUM(CASE WHEN is_arrested = 1 THEN 1 ELSE 0 END)",
+    "searches": "SUM(CASE WHEN search_conducted = 1 THEN 1 ELSE 0 END)",
+    "search_or_arrest": "SUM(CASE WHEN is_arrested = 1 OR search_conducted = 1 THEN 1 ELSE 0 END)",
+    "drug_stops": "SUM(CASE WHEN drugs_related_stop = 1 THEN 1 ELSE 0 END)",
+    "young_stops": "SUM(CASE WHEN driver_age < 25 THEN 1 ELSE 0 END)",
+    "arrest_known": "SUM(CASE WHEN is_arrested IS NOT NULL THEN 1 ELSE 0 END)",
+    # stop_duration is a VARCHAR bucket ('0-15 Min', '16-30 Min', '30+ Min'). The raw
+    # analysis averages it with AVG(stop_duration), which MySQL reads as the leading number,
+    # i.e. the bucket's lower bound (0, 16, 30), and 0 when there is none. The same number
+    # is parsed explicitly here: an implicit conversion inside INSERT ... SELECT is an
+    # error under strict mode. Sum and count are kept so the average can be rebuilt.
+    "duration_sum": "COALESCE(SUM(COALESCE(CAST(REGEXP_SUBSTR(TRIM(stop_duration), '^[0-9]+') AS UNSIGNED), 0)), 0)",
+    "duration_count": "COUNT(stop_duration)",
+}
+
+# name -> (dimensions as (column, type, expression over logs), measures)
+ROLLUPS = {
+    "rollup_vehicle": (
+        [("vehicle_number", "VARCHAR(50)", "COALESCE(vehicle_number, '')")],
+        ["stops", "drug_stops"],
+    ),
+    "rollup_country_violation": (
+        [("country_name", "VARCHAR(50)", "COALESCE(country_name, '')"),
+         ("violation", "VARCHAR(100)", "COALESCE(violation, '')")],
+        ["stops", "arrests", "searches", "search_or_arrest", "drug_stops", "young_stops",
+         "arrest_known", "duration_sum", "duration_count"],
+    ),
+    "rollup_time": (
+        [("country_name", "VARCHAR(50)", "COALESCE(country_name, '')"),
+         ("stop_year", "SMALLINT", "COALESCE(YEAR(stop_date), -1)"),
+         ("stop_month", "TINYINT", "COALESCE(MONTH(stop_date), -1)"),
+         ("stop_hour", "TINYINT", "COALESCE(HOUR(stop_time), -1)")],
+        ["stops", "arrests"],
+    ),
+    "rollup_demographics": (
+        [("country_name", "VARCHAR(50)", "COALESCE(country_name, '')"),
+         ("driver_gender", "VARCHAR(10)", "COALESCE(driver_gender, '')"),
+         ("driver_race", "VARCHAR(50)", "COALESCE(driver_race, '')"),
+         ("driver_age", "INT", "COALESCE(driver_age, -1)")],
+        ["stops", "arrests", "searches"],
+    ),
+    # Feeds the quick-metrics tiles (metrics.py), which classify stops by stop_outcome text
+    "rollup_outcome": (
+        [("stop_outcome", "VARCHAR(100)", "COALESCE(stop_outcome, '')")],
+        ["stops", "drug_stops"],
+    ),
+    "rollup_age_race_violation": (
+        [("driver_age", "INT", "COALESCE(driver_age, -1)"),
+         ("driver_race", "VARCHAR(50)", "COALESCE(driver_race, '')"),
+         ("violation", "VARCHAR(100)", "COALESCE(violation, '')")],
+        ["stops"],
+    ),
+}
+
+ROLLUP_STATE_DDL = """CREATE TABLE IF NOT EXISTS SECURECHECK.rollup_state (
+name VARCHAR(64) PRIMARY KEY,
+last_id BIGINT NOT NULL)
+"""
+
+# Ids up to rollup_state.last_id that weren't there when it was folded in
+ROLLUP_GAPS_DDL = """CREATE TABLE IF NOT EXISTS SECURECHECK.rollup_gaps (
+name VARCHAR(64) NOT NULL,
+first_id BIGINT NOT NULL,
+last_id BIGINT NOT NULL,
+found_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+PRIMARY KEY (name, first_id))
+"""
+
+# Runs of consecutive ids present in a table between two ids (both included)
+ISLANDS_SQL = """SELECT MIN(id) AS first_id, MAX(id) AS last_id FROM (
+    SELECT id, id - CAST(ROW_NUMBER() OVER (ORDER BY id) AS SIGNED) AS island
+    FROM {table} WHERE id BETWEEN %s AND %s) AS ids
+    GROUP BY island ORDER BY first_id"""
+
+# Seconds any writer's transaction may stay open: ids missing for longer are never coming
+COMMIT_LAG = int(os.environ.get("SECURECHECK_COMMIT_LAG", "60"))
+
+# Same answers as analyses.QUERY_MAP, read from the rollups
+ROLLUP_QUERIES = {
+    "Top 10 vehicle_Number involved in Drug-Related Stops": """
+        SELECT NULLIF(vehicle_number, '') AS vehicle_number, drug_stops AS COUNT
+        FROM SECURECHECK.rollup_vehicle WHERE drug_stops > 0
+        ORDER BY COUNT DESC LIMIT 10""",
+
+    "Most Frequently Searched Vehicles": """
+        SELECT NULLIF(vehicle_number, '') AS vehicle_number, stops AS search_count
+        FROM SECURECHECK.rollup_vehicle
+        ORDER BY vehicle_number DESC LIMIT 10""",
+
+    "Driver Age Group with Highest Arrest Rate": """
+        SELECT CASE
+        WHEN NULLIF(driver_age, -1) BETWEEN 18 AND 25 THEN '18-25'
+        WHEN NULLIF(driver_age, -1) BETWEEN 26 AND 35 THEN '26-35'
+        WHEN NULLIF(driver_age, -1) BETWEEN 36 AND 45 THEN '36-45'
+        WHEN NULLIF(driver_age, -1) BETWEEN 45 AND 60 THEN '45-60'
+        ELSE '60+'
+        END AS age_group, SUM(stops) AS total_driver,
+        SUM(arrests) AS total_arrests,
+        ROUND(SUM(arrests) * 100.0 / SUM(stops), 2) AS arrest_rate_percent
+        FROM SECURECHECK.rollup_demographics GROUP BY age_group
+        ORDER BY arrest_rate_percent DESC LIMIT 1""",
+
+    "Gender Distribution of Drivers Stopped in each Country": """
+        SELECT NULLIF(country_name, '') AS country_name, NULLIF(driver_gender, '') AS driver_gender,
+        SUM(stops) AS total_gender,
+        ROUND(100.0 * SUM(stops) / SUM(SUM(stops)) OVER (PARTITION BY country_name), 2) AS gender_percent
+        FROM SECURECHECK.rollup_demographics
+        GROUP BY country_name, driver_gender
+        ORDER BY country_name, driver_gender""",
+
+    "Race & Gender Combination with Highest Search Rate": """
+        SELECT driver_race, driver_gender, SUM(stops) AS total_stops,
+        SUM(searches) AS total_searches,
+        ROUND(SUM(searches) * 100.0 / SUM(stops), 2) AS search_percent_rate
+        FROM SECURECHECK.rollup_demographics
+        WHERE driver_race <> '' AND driver_gender <> ''
+        GROUP BY driver_race, driver_gender
+        ORDER BY search_percent_rate DESC LIMIT 1""",
+
+    "Time of Day with Most Traffic Stops": """
+        SELECT stop_hour, SUM(stops) AS total_stops
+        FROM SECURECHECK.rollup_time
+        WHERE stop_hour <> -1
+        GROUP BY stop_hour
+        ORDER BY total_stops DESC LIMIT 1""",
+
+    "Average Stop Duration for different Violations": """
+        SELECT NULLIF(violation, '') AS violation,
+        SUM(duration_sum) / SUM(duration_count) AS average_stop_duration
+        FROM SECURECHECK.rollup_country_violation
+        GROUP BY violation HAVING SUM(duration_count) > 0
+        ORDER BY average_stop_duration DESC""",
+
+    "Night Stops More Likely to Lead to Arrests": """
+        SELECT CASE
+        WHEN stop_hour BETWEEN 20 AND 23 OR stop_hour BETWEEN 0 AND 5 THEN 'Night'
+        ELSE 'Day'
+        END AS time_of_day,
+        SUM(stops) AS total_stops,
+        SUM(arrests) AS total_arrests,
+        ROUND(SUM(arrests) * 100.0 / SUM(stops), 2) AS arrest_rate_percent
+        FROM SECURECHECK.rollup_time
+        WHERE stop_hour <> -1
+        GROUP BY time_of_day
+        ORDER BY arrest_rate_percent DESC""",
+
+    "Violations Most Associated with Searches or Arrests": """
+        SELECT NULLIF(violation, '') AS violation,
+        SUM(stops) AS total_stops,
+        SUM(arrests) AS total_arrests,
+        SUM(searches) AS total_searches,
+        SUM(search_or_arrest) AS search_or_arrest_total
+        FROM SECURECHECK.rollup_country_violation
+        GROUP BY violation
+        ORDER BY search_or_arrest_total DESC LIMIT 10""",
+
+    "Most Common Violations for Young Drivers Under 25": """
+        SELECT NULLIF(violation, '') AS violation,
+        SUM(young_stops) AS total_stops
+        FROM SECURECHECK.rollup_country_violation
+        GROUP BY violation HAVING SUM(young_stops) > 0
+        ORDER BY total_stops DESC LIMIT 10""",
+
+    "Violation Rarely Resulting in Search or Arrest": """
+        SELECT NULLIF(violation, '') AS violation,
+        SUM(stops) AS total_stops,
+        SUM(arrests) AS total_arrests
+        FROM SECURECHECK.rollup_country_violation
+        GROUP BY violation
+        ORDER BY total_arrests ASC LIMIT 1""",
+
+    "Countries Report with Highest Drug-Related Stop Rates": """
+        SELECT NULLIF(country_name, '') AS country_name,
+        SUM(stops) AS total_stops,
+        SUM(drug_stops) AS drug_related_stops,
+        ROUND(SUM(drug_stops) * 100.0 / SUM(stops), 2) AS drug_stop_rate_percent
+        FROM SECURECHECK.rollup_country_violation
+        GROUP BY country_name
+        ORDER BY drug_stop_rate_percent DESC""",
+
+    "Arrest Rate by Country & Violation": """
+        SELECT NULLIF(country_name, '') AS country_name,
+        SUM(stops) AS total_stops,
+        NULLIF(violation, '') AS violation,
+        SUM(arrests) AS total_arrests,
+        ROUND(100.0 * SUM(arrests) / SUM(stops), 2) AS total_arrest_percent
+        FROM SECURECHECK.rollup_country_violation
+        GROUP BY country_name, violation
+        ORDER BY country_name""",
+
+    "Country has the Most Stops with Search Conducted": """
+        SELECT NULLIF(country_name, '') AS country_name, SUM(stops) AS total_stops
+        FROM SECURECHECK.rollup_country_violation
+        GROUP BY country_name
+        ORDER BY total_stops DESC LIMIT 1""",
+
+    "Yearly Breakdown of Stops and Arrests by Country": """
+        SELECT country_name, year,
+        total_stops, total_arrests,
+        ROUND(100.0 * total_arrests / total_stops, 2) AS arrest_rate_percent,
+        RANK() OVER (PARTITION BY year ORDER BY total_arrests DESC) AS arrest_rank_in_year
+        FROM (SELECT NULLIF(country_name, '') AS country_name, stop_year AS year,
+        SUM(stops) AS total_stops,
+        SUM(arrests) AS total_arrests
+        FROM SECURECHECK.rollup_time
+        WHERE stop_year <> -1
+        GROUP BY country_name, stop_year) AS yearly_stats""",
+
+    "Driver Violation Trends by Age & Race": """
+        SELECT CASE
+        WHEN driver_age BETWEEN 18 AND 25 THEN '18-25'
+        WHEN driver_age BETWEEN 26 AND 35 THEN '26-35'
+        WHEN driver_age BETWEEN 36 AND 50 THEN '36-50'
+        ELSE '51+'
+        END AS age_group,
+        driver_race, violation, SUM(stops) AS total_violations
+        FROM SECURECHECK.rollup_age_race_violation
+        WHERE driver_age <> -1 AND driver_race <> '' AND violation <> ''
+        GROUP BY age_group, driver_race, violation
+        ORDER BY age_group, driver_race, total_violations DESC""",
+
+    "Time Period Analysis of Stops, Number of Stops by Year, Month, Hour of the Day": """
+        SELECT stop_year AS year, stop_month AS month, stop_hour AS hour,
+        SUM(stops) AS total_stops
+        FROM SECURECHECK.rollup_time
+        WHERE stop_year <> -1 AND stop_hour <> -1
+        GROUP BY stop_year, stop_month, stop_hour
+        ORDER BY year, month, hour""",
+
+    "Violations with High Search & Arrest Rates": """
+        SELECT violation,
+        SUM(stops) AS total_stops,
+        SUM(searches) AS total_searches,
+        SUM(arrests) AS total_arrests,
+        ROUND(100.0 * SUM(searches) / SUM(stops), 2) AS search_rate_percent,
+        ROUND(100.0 * SUM(arrests) / SUM(stops), 2) AS arrest_percent_rate,
+        RANK() OVER (ORDER BY SUM(searches) * 1.0 / SUM(stops) DESC) AS search_rank,
+        RANK() OVER (ORDER BY SUM(arrests) * 1.0 / SUM(stops) DESC) AS arrest_rank
+        FROM SECURECHECK.rollup_country_violation
+        WHERE violation <> ''
+        GROUP BY violation
+        ORDER BY search_rate_percent DESC, arrest_percent_rate DESC""",
+
+    "Driver Demographics by Country (Age, Gender and Race)": """
+        SELECT NULLIF(country_name, '') AS country_name, driver_gender, driver_race,
+        CASE
+        WHEN driver_age < 20 THEN '<20'
+        WHEN driver_age BETWEEN 20 AND 29 THEN '20-29'
+        WHEN driver_age BETWEEN 30 AND 39 THEN '30-39'
+        WHEN driver_age BETWEEN 40 AND 49 THEN '40-49'
+        WHEN driver_age BETWEEN 50 AND 59 THEN '50-59'
+        ELSE '60+'
+        END AS age_group,
+        SUM(stops) AS total_drivers
+        FROM SECURECHECK.rollup_demographics
+        WHERE driver_age <> -1 AND driver_gender <> '' AND driver_race <> ''
+        GROUP BY country_name, driver_gender, driver_race, age_group
+        ORDER BY country_name, driver_gender, driver_race, age_group""",
+
+    "Top 5 Violations with Highest Arrest Rates": """
+        SELECT violation,
+        SUM(arrest_known) AS total_stops,
+        SUM(arrests) AS total_arrests,
+        ROUND(100.0 * SUM(arrests) / NULLIF(SUM(arrest_known), 0), 2) AS arrest_rate_percent
+        FROM SECURECHECK.rollup_country_violation
+        WHERE violation <> ''
+        GROUP BY violation HAVING SUM(arrest_known) > 0
+        ORDER BY arrest_rate_percent DESC LIMIT 5""",
+}
+
+# The app folds in new stops at most this often (seconds) before answering from a rollup
+REFRESH_INTERVAL = 5.0
+
+_refresh_lock = threading.Lock()
+_last_refresh = 0.0
+_created = False
+
+
+def ddl(name):
+    dims, measures = ROLLUPS[name]
+    columns = [f"{col} {typ} NOT NULL" for col, typ, _ in dims]
+    columns += [f"{m} {'DOUBLE' if m == 'duration_sum' else 'BIGINT'} NOT NULL" for m in measures]
+    key = ", ".join(col for col, _, _ in dims)
+    return f"CREATE TABLE IF NOT EXISTS SECURECHECK.{name} (\n{', '.join(columns)},\nPRIMARY KEY ({key}))"
+
+
+def _upsert_sql(name, table):
+    dims, measures = ROLLUPS[name]
+    columns = [col for col, _, _ in dims] + measures
+    select = [expr for _, _, expr in dims] + [MEASURES[m] for m in measures]
+    group_by = ", ".join(str(i + 1) for i in range(len(dims)))
+    update = ", ".join(f"{m} = {m} + VALUES({m})" for m in measures)
+    return (f"INSERT INTO SECURECHECK.{name} ({', '.join(columns)}) "
+            f"SELECT {', '.join(select)} FROM {table} WHERE id BETWEEN %s AND %s GROUP BY {group_by} "
+            f"ON DUPLICATE KEY UPDATE {update}")
+
+
+def create_rollups(cursor):
+    cursor.execute(ROLLUP_STATE_DDL)
+    cursor.execute(ROLLUP_GAPS_DDL)
+    for name in ROLLUPS:
+        cursor.execute(ddl(name))
+        cursor.execute("INSERT IGNORE INTO SECURECHECK.rollup_state (name, last_id) VALUES (%s, 0)", (name,))
+
+
+# Runs of consecutive ids between first and last (both included), as one consistent
+# read, and the holes around them: [(first, last)], [(first, last)]
+def find_islands(cursor, table, first, last):
+    cursor.execute(ISLANDS_SQL.format(table=table), (first, last))
+    islands = [(row["first_id"], row["last_id"]) for row in cursor.fetchall()]
+    holes = []
+    expect = first
+    for a, b in islands:
+        if a > expect:
+            holes.append((expect, a - 1))
+        expect = b + 1
+    if expect <= last:
+        holes.append((expect, last))
+    return islands, holes
+
+
+# Fold the stops with ids in first..last into rollup `name`; returns (rows folded, holes).
+# A run has no missing ids, so folding it by id range can't pick up a late row twice.
+def _fold(cursor, name, table, first, last):
+    islands, holes = find_islands(cursor, table, first, last)
+    for a, b in islands:
+        cursor.execute(_upsert_sql(name, table), (a, b))
+    return sum(b - a + 1 for a, b in islands), holes
+
+
+# Fold every stop logged since the last refresh into each rollup; returns the rows added
+def refresh(table=LOGS_TABLE):
+    global _created
+    added = 0
+    with db.pool.connection() as conn:
+        with conn.cursor() as cursor:
+            if not _created:
+                create_rollups(cursor)
+                _created = True
+            cursor.execute(f"SELECT COALESCE(MAX(id), 0) AS high FROM {table}")
+            high = cursor.fetchone()["high"]
+            for name in ROLLUPS:
+                conn.begin()
+                # Lock the state row so two refreshers can't fold the same ids in twice
+                cursor.execute("SELECT last_id FROM SECURECHECK.rollup_state WHERE name = %s FOR UPDATE", (name,))
+                last_id = cursor.fetchone()["last_id"]
+                folded = 0
+                # Holes left by earlier refreshes: fold what has arrived in them since
+                cursor.execute("SELECT first_id, last_id, found_at FROM SECURECHECK.rollup_gaps "
+                               "WHERE name = %s ORDER BY first_id", (name,))
+                for gap in cursor.fetchall():
+                    n, holes = _fold(cursor, name, table, gap["first_id"], gap["last_id"])
+                    if n:
+                        folded += n
+                        cursor.execute("DELETE FROM SECURECHECK.rollup_gaps WHERE name = %s AND first_id = %s",
+                                       (name, gap["first_id"]))
+                        cursor.executemany("INSERT INTO SECURECHECK.rollup_gaps (name, first_id, last_id, found_at) "
+                                           "VALUES (%s, %s, %s, %s)",
+                                           [(name, a, b, gap["found_at"]) for a, b in holes])
+                cursor.execute("DELETE FROM SECURECHECK.rollup_gaps "
+                               "WHERE name = %s AND found_at < NOW() - INTERVAL %s SECOND", (name, COMMIT_LAG))
+                if last_id < high:
+                    n, holes = _fold(cursor, name, table, last_id + 1, high)
+                    folded += n
+                    cursor.executemany("INSERT INTO SECURECHECK.rollup_gaps (name, first_id, last_id) "
+                                       "VALUES (%s, %s, %s)", [(name, a, b) for a, b in holes])
+                    cursor.execute("UPDATE SECURECHECK.rollup_state SET last_id = %s WHERE name = %s", (high, name))
+                added = max(added, folded)
+                conn.commit()
+    if added:
+        db.cache.invalidate("rollup_")
+    return added
+
+
+def rebuild(table=LOGS_TABLE):
+    with db.pool.connection() as conn:
+        with conn.cursor() as cursor:
+            for name in ROLLUPS:
+                cursor.execute(f"DROP TABLE IF EXISTS SECURECHECK.{name}")
+            cursor.execute("DELETE FROM SECURECHECK.rollup_state WHERE name LIKE 'rollup\\_%'")
+            cursor.execute("DROP TABLE IF EXISTS SECURECHECK.rollup_gaps")
+            create_rollups(cursor)
+    return refresh(table)
+
+
+def refresh_if_due():
+    global _last_refresh
+    if time.monotonic() - _last_refresh < REFRESH_INTERVAL:
+        return
+    # Only one session refreshes at a time; the others read the rollups as they are
+    if not _refresh_lock.acquire(blocking=False):
+        return
+    try:
+        refresh()
+        _last_refresh = time.monotonic()
+    finally:
+        _refresh_lock.release()
+
+
+# New stops were written: fold them in on the next read instead of waiting out the interval
+def mark_stale():
+    global _last_refresh
+    _last_refresh = 0.0
+
+
+# Answer a canned analysis from its rollup
+def fetch(name):
+    refresh_if_due()
+    return db.fetch_data(ROLLUP_QUERIES[name])
+
+
+# Run every analysis both ways and report whether the rollup answer matches the raw query
+def check(table=LOGS_TABLE):
+    refresh(table)
+    results = []
+    for name, raw_sql in QUERY_MAP.items():
+        try:
+            start = time.perf_counter()
+            raw = db.run_query(raw_sql)
+            raw_time = time.perf_counter() - start
+            start = time.perf_counter()
+            rolled = db.run_query(ROLLUP_QUERIES[name])
+            rollup_time = time.perf_counter() - start
+        except Exception as e:
+            results.append({"analysis": name, "status": f"error: {e}", "raw_ms": None, "rollup_ms": None})
+            continue
+        status = compare_results(name, raw, rolled)
+        results.append({"analysis": name, "status": status,
+                        "raw_ms": raw_time * 1000, "rollup_ms": rollup_time * 1000})
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintain and verify the analysis rollup tables")
+    parser.add_argument("command", choices=["refresh", "rebuild", "check"])
+    args = parser.parse_args(argv)
+
+    if args.command == "refresh":
+        print(f"Folded in {refresh()} new stops")
+    elif args.command == "rebuild":
+        print(f"Rebuilt rollups from {rebuild()} stops")
+    else:
+        results = check()
+        for r in results:
+            timing = "" if r["raw_ms"] is None else f"{r['raw_ms']:9.1f} ms raw {r['rollup_ms']:8.1f} ms rollup"
+            print(f"{r['status']:<14}{timing:<38}{r['analysis']}")
+        return 1 if any(r["status"] not in ("match", "match (ties)") for r in results) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+# SECURECHECK database schema, shared by the app, the ingestion tool and the benchmarks.
+# The logs DDL is the one from securecheck.ipynb.
+
+LOGS_TABLE = "SECURECHECK.logs"
+
+# Columns of the logs table, in insert order (everything except the id)
+LOG_COLUMNS = [
+    "stop_date", "stop_time", "country_name", "driver_gender", "driver_age",
+    "driver_race", "violation_raw", "violation", "search_conducted", "search_type",
+    "stop_outcome", "is_arrested", "stop_duration", "drugs_related_stop", "vehicle_number",
+]
+
+BOOL_COLUMNS = ["search_conducted", "is_arrested", "drugs_related_stop"]
+
+LOGS_DDL = """CREATE TABLE IF NOT EXISTS {table} (
+id INT AUTO_INCREMENT PRIMARY KEY,
+stop_date DATE,
+stop_time TIME,
+country_name VARCHAR(50),
+driver_gender VARCHAR(10),
+driver_age INT,
+driver_race VARCHAR(50),
+violation_raw VARCHAR(100),
+violation VARCHAR(100),
+search_conducted BOOLEAN,
+search_type VARCHAR(100),
+stop_outcome VARCHAR(100),
+is_arrested BOOLEAN,
+stop_duration VARCHAR(50),
+drugs_related_stop BOOLEAN,
+vehicle_number VARCHAR(50))
+"""
+
+# Bookkeeping for resumable loads: rows committed so far per source file
+INGEST_PROGRESS_DDL = """CREATE TABLE IF NOT EXISTS SECURECHECK.ingest_progress (
+source VARCHAR(255) PRIMARY KEY,
+rows_committed BIGINT NOT NULL,
+updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP)
+"""
+
+# Schema changes applied after the table exists, in order. Each one runs once per table
+# and is recorded in SECURECHECK.schema_migrations.
+SCHEMA_MIGRATIONS_DDL = """CREATE TABLE IF NOT EXISTS SECURECHECK.schema_migrations (
+name VARCHAR(200) PRIMARY KEY,
+applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)
+"""
+
+MIGRATIONS = [
+    # Secondary indexes for the View Logs filters (exact and prefix matches)
+    ("001_index_vehicle_number", "ALTER TABLE {table} ADD INDEX idx_vehicle_number (vehicle_number)"),
+    ("002_index_violation", "ALTER TABLE {table} ADD INDEX idx_violation (violation)"),
+    ("003_index_country_violation", "ALTER TABLE {table} ADD INDEX idx_country_violation (country_name, violation)"),
+    # n-gram full-text index so substring search on plates doesn't scan the table
+    ("004_fulltext_vehicle_number",
+     "ALTER TABLE {table} ADD FULLTEXT INDEX ft_vehicle_number (vehicle_number) WITH PARSER ngram"),
+    # Date and time in one indexed column, for time-window queries and quick MIN/MAX dates
+    ("005_stop_datetime",
+     "ALTER TABLE {table} ADD COLUMN stop_datetime DATETIME "
+     "AS (TIMESTAMP(stop_date, COALESCE(stop_time, '00:00:00'))) VIRTUAL, "
+     "ADD INDEX idx_stop_datetime (stop_datetime)"),
+]
+
+
+def insert_sql(table=LOGS_TABLE):
+    placeholders = ", ".join(["%s"] * len(LOG_COLUMNS))
+    return f"INSERT INTO {table} ({', '.join(LOG_COLUMNS)}) VALUES ({placeholders})"
+
+
+# Create the database and tables if they are missing
+def create_schema(cursor, table=LOGS_TABLE):
+    cursor.execute("CREATE DATABASE IF NOT EXISTS SECURECHECK")
+    cursor.execute(LOGS_DDL.format(table=table))
+    cursor.execute(INGEST_PROGRESS_DDL)
+    cursor.execute(SCHEMA_MIGRATIONS_DDL)
+
+
+# Apply any migrations this table hasn't had yet, stopping after `until` if given;
+# returns the names applied. Callers that made the table themselves (the notebook)
+# haven't run create_schema(), so the bookkeeping table is created here too.
+def migrate(cursor, table=LOGS_TABLE, until=None):
+    cursor.execute(SCHEMA_MIGRATIONS_DDL)
+    cursor.execute("SELECT name FROM SECURECHECK.schema_migrations")
+    done = {row[0] if isinstance(row, tuple) else row["name"] for row in cursor.fetchall()}
+    applied = []
+    for name, ddl in MIGRATIONS:
+        key = f"{table}:{name}"
+        if key not in done:
+            cursor.execute(ddl.format(table=table))
+            cursor.execute("INSERT INTO SECURECHECK.schema_migrations (name) VALUES (%s)", (key,))
+            applied.append(name)
+        if name == until:
+            break
+    return applied
+
+
+if __name__ == "__main__":
+    import sys
+    import pymysql
+    import db
+
+    table = sys.argv[1] if len(sys.argv) > 1 else LOGS_TABLE
+    sp = pymysql.connect(**dict(db.DB_CONFIG, cursorclass=pymysql.cursors.Cursor))
+    try:
+        with sp.cursor() as cursor:
+            create_schema(cursor, table)
+            applied = migrate(cursor, table)
+        sp.commit()
+    finally:
+        sp.close()
+    print(f"Applied {len(applied)} migration(s) to {table}: {', '.join(applied) or 'none'}")
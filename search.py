@@ -0,0 +1,122 @@
+import argparse
+import itertools
+import sys
+
+import pymysql
+
+import db
+import partitions
+from schema import LOGS_TABLE
+
+# Filter builder for the View Logs search boxes.
+# Every value is a bound parameter, and each filter is written so MySQL can answer it
+# from an index (see the migrations in schema.py):
+#   - exact:    column = %s                    -> B-tree lookup
+#   - prefix:   column LIKE 'abc%'             -> B-tree range scan
+#   - contains: MATCH ... AGAINST on the n-gram full-text index (plates only),
+#               re-checked with LIKE '%abc%' so the result is a true substring match;
+#               a partitioned logs table has no full-text index (see partitions.py),
+#               so there it is LIKE '%abc%' alone, kept short by the date range
+
+VEHICLE_MODES = ["prefix", "contains", "exact"]
+
+# Terms shorter than the server's ngram_token_size (2 by default) can't use the n-gram index
+NGRAM_TOKEN_SIZE = 2
+
+
+def escape_like(value):
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+# Whether table still has the n-gram index on vehicle_number (checked once an hour)
+def has_fulltext(table=LOGS_TABLE):
+    schema_name, name = table.split(".")
+    df = db.fetch_data("""SELECT COUNT(*) AS n FROM information_schema.STATISTICS
+                          WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND INDEX_TYPE = 'FULLTEXT'""",
+                       (schema_name, name), ttl=3600)
+    return bool(df["n"].iloc[0])
+
+
+def _match(column, value, mode, table=LOGS_TABLE):
+    value = value.strip()
+    if mode == "exact":
+        return [f"{column} = %s"], [value]
+    if mode == "contains" and column == "vehicle_number":
+        if len(value) >= NGRAM_TOKEN_SIZE and has_fulltext(table):
+            phrase = '"' + value.replace('"', "") + '"'
+            return ([f"MATCH({column}) AGAINST (%s IN BOOLEAN MODE)", f"{column} LIKE %s"],
+                    [phrase, f"%{escape_like(value)}%"])
+        return [f"{column} LIKE %s"], [f"%{escape_like(value)}%"]
+    return [f"{column} LIKE %s"], [f"{escape_like(value)}%"]
+
+
+# Turn the search box values into (conditions, params) for paging.fetch_page / count_rows
+def build_filters(vehicle=None, violation=None, country=None, vehicle_mode="prefix", table=LOGS_TABLE):
+    conditions = []
+    params = []
+    for column, value, mode in (("vehicle_number", vehicle, vehicle_mode),
+                                ("violation", violation, "prefix"),
+                                ("country_name", country, "prefix")):
+        if value and value.strip():
+            c, p = _match(column, value, mode, table)
+            conditions += c
+            params += p
+    return conditions, params
+
+
+# EXPLAIN the count query for every filter combination and report which index it uses.
+# On a partitioned table (no full-text index) a plate "contains" search on its own is a
+# scan by design, bounded by the page's date range: reported, but not a failure.
+def explain_filters(table=LOGS_TABLE):
+    scan_allowed = partitions.is_partitioned(table)
+    sample = db.run_query(f"SELECT vehicle_number, violation, country_name FROM {table} "
+                          "WHERE vehicle_number IS NOT NULL LIMIT 1")
+    if sample.empty:
+        raise RuntimeError(f"{table} is empty; load some data before checking the plans")
+    row = sample.iloc[0]
+    values = {"vehicle": row["vehicle_number"][:4], "violation": row["violation"][:3],
+              "country": row["country_name"][:2]}
+
+    results = []
+    for size in range(1, 4):
+        for fields in itertools.combinations(["vehicle", "violation", "country"], size):
+            modes = VEHICLE_MODES if "vehicle" in fields else ["prefix"]
+            for mode in modes:
+                conditions, params = build_filters(**{f: values[f] for f in fields}, vehicle_mode=mode, table=table)
+                query = f"EXPLAIN SELECT COUNT(*) FROM {table} WHERE {' AND '.join(conditions)}"
+                plan = db.run_query(query, params)
+                first = plan.iloc[0]
+                label = " + ".join(f"{f}({mode})" if f == "vehicle" else f for f in fields)
+                uses_index = bool(first.get("key")) and first.get("type") != "ALL"
+                expected_scan = scan_allowed and mode == "contains" and "vehicle" in fields
+                results.append({"filters": label, "type": first.get("type"), "key": first.get("key"),
+                                "rows": first.get("rows"), "uses_index": uses_index,
+                                "expected_scan": not uses_index and expected_scan})
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check that every View Logs filter uses an index")
+    parser.add_argument("--table", default=LOGS_TABLE)
+    args = parser.parse_args(argv)
+
+    try:
+        results = explain_filters(args.table)
+    except (pymysql.MySQLError, RuntimeError) as e:
+        print(f"Error: {e}")
+        return 2
+
+    print(f"{'filters':<45}{'type':<10}{'key':<24}{'rows':>10}")
+    for r in results:
+        flag = ("" if r["uses_index"] else "  (substring scan: partitioned, no full-text index)"
+                if r["expected_scan"] else "  <-- full scan")
+        print(f"{r['filters']:<45}{str(r['type']):<10}{str(r['key']):<24}{str(r['rows']):>10}{flag}")
+    failed = [r for r in results if not r["uses_index"] and not r["expected_scan"]]
+    scans = sum(r["expected_scan"] for r in results)
+    print(f"{len(results) - len(failed) - scans}/{len(results)} filter combinations use an index"
+          + (f", {scans} plate substring scans expected on a partitioned table" if scans else ""))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import db
+import rollups
+from schema import LOGS_TABLE, LOG_COLUMNS, BOOL_COLUMNS
+
+# Process-wide, compact in-memory copy of the logs table.
+#
+# pymysql hands rows back as dicts of Python objects, and a DataFrame built from them is
+# object dtype throughout. Here the low-cardinality text columns become categoricals, the
+# flags nullable booleans and the ages small nullable ints, which cuts memory several-fold.
+# The snapshot is loaded once and then topped up with only the rows past the highest id
+# it holds, never reloaded. New rows are kept as separate parts behind the first load
+# rather than concatenated onto it each time (which would copy the whole table per
+# refresh); past MAX_PARTS the newer parts are merged with each other, and into the first
+# only once they are as big as it is, or when the whole frame is asked for.
+#
+# Ids are not committed in order, so like the rollups (rollups.py) the snapshot keeps the
+# holes it read past as gaps, re-reads them on every refresh and forgets a gap after
+# rollups.COMMIT_LAG seconds. Rows are therefore held in the order they arrived, not by
+# id; rows_since() hands a reader (the Predict Logs index) whatever arrived after it last
+# looked.
+
+CATEGORY_COLUMNS = ["country_name", "driver_gender", "driver_race", "violation_raw", "violation",
+                    "search_type", "stop_outcome", "stop_duration"]
+
+CHUNK_SIZE = 200_000
+REFRESH_INTERVAL = 10.0
+MAX_PARTS = 16
+
+
+# Object-dtype rows from the database -> compact dtypes
+def compact(df):
+    df = df.copy()
+    df["id"] = pd.to_numeric(df["id"]).astype("int32")
+    df["stop_date"] = pd.to_datetime(df["stop_date"], errors="coerce")
+    try:
+        # pymysql returns TIME columns as timedeltas
+        df["stop_time"] = pd.to_timedelta(df["stop_time"], errors="coerce")
+    except TypeError:
+        # datetime.time values (e.g. straight from ingest.clean_chunk)
+        df["stop_time"] = pd.to_timedelta(df["stop_time"].astype(str), errors="coerce")
+    ages = pd.to_numeric(df["driver_age"], errors="coerce")
+    df["driver_age"] = ages.astype("Int8" if ages.dropna().between(-128, 127).all() else "Int16")
+    for col in BOOL_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors="coerce").astype("Int8").astype("boolean")
+    for col in CATEGORY_COLUMNS:
+        df[col] = df[col].astype("category")
+    df["vehicle_number"] = df["vehicle_number"].astype("string")
+    return df
+
+
+# One frame from several compact ones. Each side keeps its own categories until here, so
+# they are widened to the union first (otherwise concat falls back to object columns);
+# a frame that already has them is passed through without a copy.
+def _concat(frames):
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return pd.DataFrame()
+    if len(frames) == 1:
+        return frames[0]
+    changes = [{} for _ in frames]
+    for col in CATEGORY_COLUMNS:
+        merged = frames[0][col].cat.categories
+        for f in frames[1:]:
+            merged = merged.append(f[col].cat.categories.difference(merged))
+        for f, change in zip(frames, changes):
+            if not f[col].cat.categories.equals(merged):
+                change[col] = f[col].cat.set_categories(merged)
+    if len({str(f["driver_age"].dtype) for f in frames}) > 1:
+        for f, change in zip(frames, changes):
+            change["driver_age"] = f["driver_age"].astype("Int16")
+    return pd.concat([f.assign(**change) if change else f for f, change in zip(frames, changes)],
+                     ignore_index=True)
+
+
+# The ids in first..last (both included) missing from the sorted ids: [(first, last)]
+def _holes(ids, first, last):
+    bounds = np.concatenate([[first - 1], np.asarray(ids, dtype="int64"), [last + 1]])
+    jumps = np.flatnonzero(np.diff(bounds) > 1)
+    return [(int(bounds[j]) + 1, int(bounds[j + 1]) - 1) for j in jumps]
+
+
+class LogsSnapshot:
+
+    def __init__(self, table=LOGS_TABLE):
+        self.table = table
+        self._parts = []  # compact frames in arrival order; the first is the initial load
+        self.last_id = 0
+        self._gaps = []   # ids read past but not seen yet: [(first, last, monotonic expiry)]
+        self.loaded_at = None
+        self._lock = threading.Lock()
+        self._last_refresh = 0.0
+
+    # Rows that have arrived in the gaps that haven't expired, and the gaps still open
+    def _read_gaps(self, columns):
+        now = time.monotonic()
+        gaps = [g for g in self._gaps if g[2] > now]
+        if not gaps:
+            return None, []
+        where = " OR ".join(["id BETWEEN %s AND %s"] * len(gaps))
+        rows = db.run_query(f"SELECT {columns} FROM {self.table} WHERE {where} ORDER BY id",
+                            [i for a, b, _ in gaps for i in (a, b)])
+        if rows.empty:
+            return None, gaps
+        ids = rows["id"].astype("int64").to_numpy()
+        still_open = []
+        for a, b, expires in gaps:
+            inside = ids[np.searchsorted(ids, a):np.searchsorted(ids, b, side="right")]
+            still_open += [(x, y, expires) for x, y in _holes(inside, a, b)]
+        return compact(rows), still_open
+
+    # Fetch and append the rows past last_id, and any that filled a gap; returns just
+    # those new rows (compact)
+    def refresh(self):
+        with self._lock:
+            columns = ", ".join(["id"] + LOG_COLUMNS)
+            filled, gaps = self._read_gaps(columns)
+            parts = [filled] if filled is not None else []
+            last_id = self.last_id
+            while True:
+                chunk = db.run_query(f"SELECT {columns} FROM {self.table} WHERE id > %s ORDER BY id LIMIT %s",
+                                     (last_id, CHUNK_SIZE))
+                if chunk.empty:
+                    break
+                parts.append(compact(chunk))
+                ids = chunk["id"].astype("int64").to_numpy()
+                expires = time.monotonic() + rollups.COMMIT_LAG
+                gaps += [(a, b, expires) for a, b in _holes(ids, last_id + 1, int(ids[-1]))]
+                last_id = int(ids[-1])
+                if len(chunk) < CHUNK_SIZE:
+                    break
+            self._gaps = gaps
+            new = _concat(parts)
+            if not new.empty:
+                self._parts.append(new)
+                self.last_id = last_id
+                if len(self._parts) > MAX_PARTS:
+                    tail = _concat(self._parts[1:])
+                    self._parts[1:] = [tail]
+                    if len(tail) >= len(self._parts[0]):
+                        self._parts = [_concat(self._parts)]
+            self.loaded_at = time.time()
+            self._last_refresh = time.monotonic()
+            return new
+
+    # All the rows as one frame, in arrival order; merges the parts (a full copy), so meant
+    # for occasional use
+    @property
+    def frame(self):
+        with self._lock:
+            if not self._parts:
+                return None
+            if len(self._parts) > 1:
+                self._parts = [_concat(self._parts)]
+            return self._parts[0]
+
+    def refresh_if_due(self):
+        if time.monotonic() - self._last_refresh >= REFRESH_INTERVAL:
+            return self.refresh()
+        return pd.DataFrame()
+
+    # New stops were written: pick them up on the next refresh_if_due()
+    def mark_stale(self):
+        self._last_refresh = 0.0
+
+    # The rows that arrived after the first `seen`, and how many have arrived in all: a
+    # reader passes the count back next time to get only what is new since. Merging parts
+    # keeps their order, so the positions stay valid.
+    def rows_since(self, seen):
+        parts = list(self._parts)
+        tail = []
+        position = 0
+        for part in parts:
+            if position + len(part) > seen:
+                tail.append(part.iloc[max(seen - position, 0):])
+            position += len(part)
+        return _concat(tail), position
+
+    # Bytes per column now, and what the same rows cost as plain object columns
+    def memory_report(self, sample_rows=100_000):
+        parts = list(self._parts)
+        rows = sum(len(p) for p in parts)
+        if not rows:
+            return {"rows": 0, "bytes": 0, "object_dtype_bytes": 0, "columns": {}}
+        # Summed over the parts, so measuring doesn't merge them
+        columns = sum(p.memory_usage(deep=True, index=False) for p in parts)
+        sample = parts[0].head(sample_rows)
+        # Estimate from a sample: converting all of a big table to objects would defeat the point
+        object_bytes = sample.astype(object).memory_usage(deep=True, index=False).sum() * rows / len(sample)
+        return {"rows": rows, "last_id": self.last_id, "bytes": int(columns.sum()),
+                "object_dtype_bytes": int(object_bytes),
+                "columns": {col: int(n) for col, n in columns.items()}}
+
+
+snapshot = LogsSnapshot()
+
+
+# The shared snapshot with any newly logged stops appended
+def get_snapshot():
+    snapshot.refresh_if_due()
+    return snapshot
@@ -0,0 +1,176 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# Cold start of the Streamlit app: what it costs, and paying it before the first user does.
+#
+# - plotly is imported the first time a chart is drawn (plotly()), not when main.py loads
+# - warm_up() opens pooled connections and runs the Data Analytics page's queries (the
+#   KPI tiles and the violation / gender / country aggregates) in a background thread,
+#   so the rollups, MySQL's buffer pool and the query cache are warm before anyone asks.
+#   main.py starts it on its first run; `python startup.py serve` starts it before the
+#   Streamlit server, so it is done before the first session connects.
+# - each phase is timed once per process. When the first page render ends the phases
+#   are printed to the console and written to STARTUP_REPORT, and the first render is
+#   checked against STARTUP_BUDGET_MS.
+#
+#   python startup.py serve [streamlit options]   warm up, then run the app
+#   python startup.py report                      last report; exit 1 if over budget
+
+STARTUP_BUDGET_MS = float(os.environ.get("SECURECHECK_STARTUP_BUDGET_MS", "3000"))
+STARTUP_REPORT = os.environ.get("SECURECHECK_STARTUP_REPORT", os.path.join("logs", "startup.json"))
+WARM_CONNECTIONS = int(os.environ.get("SECURECHECK_WARM_CONNECTIONS", "4"))
+
+STARTED = time.perf_counter()
+
+_phases = {}  # name -> {"phase", "ms", "at_ms" (end, since STARTED), "error"}
+_lock = threading.Lock()
+_warm_thread = None
+_reported = False
+
+
+# Keep the first timing of each phase; later runs of the same step are warm
+def record(name, seconds, error=None):
+    with _lock:
+        if name not in _phases:
+            _phases[name] = {"phase": name, "ms": seconds * 1000,
+                             "at_ms": (time.perf_counter() - STARTED) * 1000, "error": error}
+
+
+@contextmanager
+def phase(name):
+    start = time.perf_counter()
+    error = None
+    try:
+        yield
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        record(name, time.perf_counter() - start, error)
+
+
+def plotly():
+    with phase("import plotly"):
+        import plotly.express as px
+    return px
+
+
+def _warm():
+    # Imported here, not at the top: main.py imports this module before its own imports,
+    # and those are what the "imports" phase measures
+    import analytics
+    import db
+    import metrics
+
+    try:
+        with phase("warm-up"):
+            with phase("warm-up: connections"):
+                conns = []
+                try:
+                    for _ in range(min(WARM_CONNECTIONS, db.POOL_SIZE)):
+                        conns.append(db.pool.acquire())
+                finally:
+                    for conn in conns:
+                        db.pool.release(conn)
+            with phase("warm-up: kpis"):
+                metrics.kpis()
+            backend = analytics.get_backend()
+            for name, sql in metrics.CHART_SQL.items():
+                with phase(f"warm-up: {name}"):
+                    backend.fetch(sql)
+    except analytics.QUERY_ERRORS:
+        pass  # Recorded in the report; the pages retry and show the error themselves
+    if _reported:
+        _write(report())
+
+
+# Start the warm-up once per process; returns its thread
+def warm_up():
+    global _warm_thread
+    with _lock:
+        if _warm_thread is None:
+            _warm_thread = threading.Thread(target=_warm, name="warm-up", daemon=True)
+            _warm_thread.start()
+    return _warm_thread
+
+
+def report():
+    with _lock:
+        phases = sorted((dict(p) for p in _phases.values()), key=lambda p: p["at_ms"])
+    first = next((p["ms"] for p in phases if p["phase"] == "first render"), None)
+    return {"phases": phases, "budget_ms": STARTUP_BUDGET_MS, "first_render_ms": first,
+            "over_budget": first is not None and first > STARTUP_BUDGET_MS}
+
+
+def _write(data):
+    try:
+        os.makedirs(os.path.dirname(STARTUP_REPORT) or ".", exist_ok=True)
+        with open(STARTUP_REPORT + ".tmp", "w") as f:
+            json.dump(dict(data, written_at=time.time()), f, indent=1)
+        os.replace(STARTUP_REPORT + ".tmp", STARTUP_REPORT)
+    except OSError:
+        pass  # The console line still has it
+
+
+# The first page render in this process has finished, `seconds` after its script run began
+def first_render(seconds):
+    global _reported
+    record("first render", seconds)
+    with _lock:
+        if _reported:
+            return
+        _reported = True
+    data = report()
+    # Sub-steps ("warm-up: kpis") are in the file; the console gets the top-level phases
+    phases = ", ".join(f"{p['phase']} {p['ms']:.0f} ms" for p in data["phases"] if ":" not in p["phase"])
+    flag = "  OVER BUDGET" if data["over_budget"] else ""
+    print(f"Startup: {phases} (budget {STARTUP_BUDGET_MS:.0f} ms){flag}", flush=True)
+    _write(data)
+
+
+def serve(streamlit_args):
+    warm_up()
+    from streamlit.web import cli
+
+    main_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+    sys.argv = ["streamlit", "run", main_script] + streamlit_args
+    return cli.main()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Warm-up and cold-start report for the SecureCheck app")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("serve", help="warm up, then start the Streamlit app")
+    p.add_argument("streamlit_args", nargs=argparse.REMAINDER, help="passed on to streamlit run")
+    sub.add_parser("report", help=f"show {STARTUP_REPORT}")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        return serve(args.streamlit_args)
+    try:
+        with open(STARTUP_REPORT) as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"No startup report: {e}")
+        return 2
+    print(f"{'phase':<28}{'ms':>10}{'done at ms':>12}")
+    for p in data["phases"]:
+        error = f"  {p['error']}" if p["error"] else ""
+        print(f"{p['phase']:<28}{p['ms']:>10.0f}{p['at_ms']:>12.0f}{error}")
+    # Checked against today's budget, which may be stricter than when it was written
+    first = data["first_render_ms"]
+    print(f"First render: {'-' if first is None else f'{first:.0f} ms'} (budget {STARTUP_BUDGET_MS:.0f} ms)")
+    return 1 if first is not None and first > STARTUP_BUDGET_MS else 0
+
+
+if __name__ == "__main__":
+    # Run through the importable module, so main.py (which does `import startup`)
+    # shares the warm-up thread and the timings instead of getting a second copy
+    import startup
+
+    sys.exit(startup.main())
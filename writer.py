@@ -0,0 +1,344 @@
+import argparse
+import atexit
+import hmac
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from datetime import date, datetime, time as dtime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import pymysql
+
+import db
+import ingest
+import jobs
+import predictor
+import rollups
+import snapshot
+from schema import LOGS_TABLE, LOG_COLUMNS, insert_sql
+
+# Write path for newly logged stops (the "Predict Logs" form, check-post clients).
+#
+# Callers put stops on a bounded in-process queue and return at once; one background
+# thread drains the queue and writes the stops to SECURECHECK.logs in batched
+# transactions. A batch is flushed when it reaches BATCH_SIZE stops or when its oldest
+# stop has waited FLUSH_INTERVAL seconds, whichever comes first. When the queue is full,
+# submit() waits up to ENQUEUE_TIMEOUT and then raises QueueFull, so callers feel the
+# backpressure instead of the process growing without bound.
+#
+# Each submit() returns a Future that resolves once the stop is committed (or fails).
+# After every commit the query cache, rollups, snapshot and Predict Logs index are told
+# about the new rows. Stops still queued when the process dies are lost; callers that
+# need a guarantee wait on the Future.
+#
+# The HTTP endpoint only listens on localhost unless told otherwise, and every request
+# must carry the shared token (Authorization: Bearer <SECURECHECK_WRITER_TOKEN>).
+#
+#   python writer.py serve --port 8502        HTTP endpoint for check posts (POST /stops)
+
+MAX_QUEUE = int(os.environ.get("SECURECHECK_WRITE_QUEUE", "10000"))
+BATCH_SIZE = int(os.environ.get("SECURECHECK_WRITE_BATCH", "500"))
+FLUSH_INTERVAL = float(os.environ.get("SECURECHECK_WRITE_FLUSH_INTERVAL", "0.2"))
+ENQUEUE_TIMEOUT = 1.0
+WRITER_TOKEN = os.environ.get("SECURECHECK_WRITER_TOKEN")
+MAX_BODY_BYTES = int(os.environ.get("SECURECHECK_WRITER_MAX_BODY", str(1024 * 1024)))
+
+_STOP = object()
+
+
+class QueueFull(Exception):
+    pass
+
+
+def _check_format(name, value, fmt, types):
+    if value is None or isinstance(value, types):
+        return
+    try:
+        datetime.strptime(value, fmt)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must look like {datetime(2024, 1, 31, 8, 5, 0).strftime(fmt)}, "
+                         f"got {value!r}") from None
+
+
+# A stop as a dict of logs columns. Unknown fields and values ingest.clean_chunk would
+# quietly turn into NULL (dates, times, ages) are rejected up front, not at flush time.
+def normalize_stop(stop):
+    unknown = set(stop) - set(LOG_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown stop fields: {', '.join(sorted(unknown))}")
+    stop = {col: stop.get(col) for col in LOG_COLUMNS}
+    _check_format("stop_date", stop["stop_date"], "%Y-%m-%d", date)
+    _check_format("stop_time", stop["stop_time"], "%H:%M:%S", dtime)
+    age = stop["driver_age"]
+    if age is not None:
+        try:
+            valid = not isinstance(age, bool) and int(age) == float(age) and 0 <= int(age) <= 120
+        except (TypeError, ValueError):
+            valid = False
+        if not valid:
+            raise ValueError(f"driver_age must be a whole number from 0 to 120, got {age!r}")
+        stop["driver_age"] = int(age)
+    # The form offers "Male"/"Female" while the table holds "M"/"F"
+    if isinstance(stop["driver_gender"], str) and stop["driver_gender"].strip():
+        stop["driver_gender"] = stop["driver_gender"].strip()[0].upper()
+    return stop
+
+
+class StopWriter:
+
+    def __init__(self, table=LOGS_TABLE, max_queue=MAX_QUEUE, batch_size=BATCH_SIZE,
+                 flush_interval=FLUSH_INTERVAL):
+        self.table = table
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.insert = insert_sql(table)
+        self.hooks = []  # called with the number of rows after every commit
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self.stats = {"submitted": 0, "written": 0, "failed": 0, "rejected": 0,
+                      "batches": 0, "flush_time": 0.0, "last_batch": 0}
+        self._thread = threading.Thread(target=self._run, name="stop-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, stop, timeout=ENQUEUE_TIMEOUT):
+        future = Future()
+        try:
+            self._queue.put((normalize_stop(stop), future), timeout=timeout)
+        except queue.Full:
+            self._count("rejected")
+            raise QueueFull(f"Write queue full ({self._queue.maxsize} stops waiting)") from None
+        self._count("submitted")
+        return future
+
+    def submit_many(self, stops, timeout=ENQUEUE_TIMEOUT):
+        return [self.submit(stop, timeout) for stop in stops]
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self.stats[name] += n
+
+    def _run(self):
+        batch = []
+        deadline = None
+        while True:
+            timeout = None if not batch else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                if batch:
+                    self._flush(batch)
+                return
+            if item is not None:
+                batch.append(item)
+                if len(batch) == 1:
+                    deadline = time.monotonic() + self.flush_interval
+            if batch and (len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                self._flush(batch)
+                batch = []
+
+    def _write(self, rows):
+        # One retry on a fresh connection if the pooled one died under us
+        for attempt in range(2):
+            try:
+                with db.pool.connection() as conn:
+                    conn.begin()
+                    with conn.cursor() as cursor:
+                        cursor.executemany(self.insert, rows)
+                    conn.commit()
+                return
+            except pymysql.err.OperationalError:
+                if attempt:
+                    raise
+
+    def _flush(self, batch):
+        start = time.perf_counter()
+        stops, futures = zip(*batch)
+        written = 0
+        try:
+            rows = ingest.to_rows(ingest.clean_chunk(pd.DataFrame(list(stops))))
+        except (ValueError, TypeError) as e:
+            rows = stops
+            for future in futures:
+                future.set_exception(e)
+        else:
+            written = self._write_batch(rows, futures)
+        with self._lock:
+            self.stats["written"] += written
+            self.stats["failed"] += len(rows) - written
+            self.stats["batches"] += 1
+            self.stats["flush_time"] += time.perf_counter() - start
+            self.stats["last_batch"] = len(rows)
+        if written:
+            for hook in self.hooks:
+                try:
+                    hook(written)
+                except Exception:
+                    pass  # The rows are committed; a reader catching up late is not fatal
+
+    # Returns the number of rows committed
+    def _write_batch(self, rows, futures):
+        written = 0
+        try:
+            self._write(rows)
+            written = len(rows)
+            for future in futures:
+                future.set_result(True)
+        except (pymysql.DataError, pymysql.IntegrityError):
+            # One bad stop shouldn't sink the rest of the batch: write them one by one
+            for row, future in zip(rows, futures):
+                try:
+                    self._write([row])
+                    written += 1
+                    future.set_result(True)
+                except (pymysql.MySQLError, db.PoolTimeout) as e:
+                    future.set_exception(e)
+        except (pymysql.MySQLError, db.PoolTimeout) as e:
+            for future in futures:
+                future.set_exception(e)
+        return written
+
+    # Stop accepting work and write whatever is still queued
+    def close(self, timeout=10.0):
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.stats, queued=self._queue.qsize(), max_queue=self._queue.maxsize,
+                        batch_size=self.batch_size, flush_interval=self.flush_interval)
+
+
+# Everything that keeps its own view of logs hears about the new rows
+def _notify_readers(table):
+    name = table.split(".")[-1]
+
+    def hook(rows):
+        db.cache.invalidate(name)
+        if table == LOGS_TABLE:
+            jobs.runner.data_changed()
+            rollups.mark_stale()
+            snapshot.snapshot.mark_stale()
+            predictor.predictor.mark_stale()
+    return hook
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+# The process-wide writer, started on first use
+def get_writer():
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = StopWriter()
+            _writer.hooks.append(_notify_readers(_writer.table))
+            atexit.register(_writer.close)
+        return _writer
+
+
+class StopHandler(BaseHTTPRequestHandler):
+    token = WRITER_TOKEN
+
+    # Whether the request carries the shared token; replies 401 if not
+    def _authorized(self):
+        sent = self.headers.get("Authorization", "")
+        if self.token and hmac.compare_digest(sent.encode(), f"Bearer {self.token}".encode()):
+            return True
+        self._reply(401, {"error": "missing or wrong token"}, {"WWW-Authenticate": "Bearer"})
+        return False
+
+    # Accepts one stop (JSON object) or a list of them; 202 once queued, 503 when full,
+    # 400 if any stop is bad (none queued), 413 past MAX_BODY_BYTES
+    def do_POST(self):
+        if self.path != "/stops":
+            self.send_error(404)
+            return
+        if not self._authorized():
+            return
+        try:
+            length = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            self._reply(411, {"error": "Content-Length required"})
+            return
+        if length < 0:
+            # rfile.read(-1) would read until the client hangs up, past the cap below
+            self.close_connection = True
+            self._reply(400, {"error": "negative Content-Length"})
+            return
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True
+            self._reply(413, {"error": f"body over {MAX_BODY_BYTES} bytes"})
+            return
+        queued = 0
+        try:
+            body = json.loads(self.rfile.read(length))
+            # Check every stop first, so a 400 means none of them was queued
+            stops = [normalize_stop(stop) for stop in (body if isinstance(body, list) else [body])]
+            for stop in stops:
+                get_writer().submit(stop)
+                queued += 1
+        except QueueFull as e:
+            # The client resends from the first stop that wasn't queued
+            self._reply(503, {"error": str(e), "queued": queued}, {"Retry-After": "1"})
+        except (ValueError, TypeError, AttributeError) as e:
+            self._reply(400, {"error": str(e), "queued": queued})
+        else:
+            self._reply(202, {"queued": queued})
+
+    def do_GET(self):
+        if self.path != "/stats":
+            self.send_error(404)
+            return
+        if not self._authorized():
+            return
+        self._reply(200, get_writer().snapshot())
+
+    def _reply(self, status, payload, headers=None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Queued, batched writer for newly logged stops")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("serve")
+    p.add_argument("--host", default="127.0.0.1", help="0.0.0.0 to accept check posts from other machines")
+    p.add_argument("--port", type=int, default=8502)
+    p.add_argument("--token", default=WRITER_TOKEN, help="shared token (default: $SECURECHECK_WRITER_TOKEN)")
+    args = parser.parse_args(argv)
+
+    if not args.token:
+        parser.error("a shared token is required: set SECURECHECK_WRITER_TOKEN or pass --token")
+    StopHandler.token = args.token
+    server = ThreadingHTTPServer((args.host, args.port), StopHandler)
+    print(f"Accepting stops on http://{args.host}:{args.port}/stops")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        get_writer().close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())